@@ -19,8 +19,15 @@ from src.notification import NotificationService
 from src.enums import ReportType
 from src.core.pipeline import StockAnalysisPipeline
 from src.core.market_review import run_market_review
+from src.core.services import get_pipeline_services
 
 
+def _create_pipeline(config: Config) -> StockAnalysisPipeline:
+    """全局配置复用共享服务容器中的已初始化实例；自定义配置则新建"""
+    if config is get_config():
+        return get_pipeline_services().create_pipeline()
+    return StockAnalysisPipeline(config=config)
+
 
 def analyze_stock(
     stock_code: str,
@@ -44,7 +51,7 @@ def analyze_stock(
         config = get_config()
     
     # 创建分析流水线
-    pipeline = StockAnalysisPipeline(config=config)
+    pipeline = _create_pipeline(config)
     
     # 使用通知服务（如果提供）
     if notifier:
@@ -110,7 +117,7 @@ def perform_market_review(
         config = get_config()
     
     # 创建分析流水线以获取analyzer和search_service
-    pipeline = StockAnalysisPipeline(config=config)
+    pipeline = _create_pipeline(config)
     
     # 使用提供的通知服务或创建新的
     review_notifier = notifier or pipeline.notifier
@@ -90,6 +90,13 @@ class AnalyzeCommand(BotCommand):
             
             if result.get("success"):
                 task_id = result.get("task_id", "")
+                if result.get("from_cache") or result.get("coalesced_with"):
+                    return BotResponse.markdown_response(
+                        f"✅ **{result.get('message')}**\n\n"
+                        f"• 股票代码: `{code}`\n"
+                        f"• 报告类型: {ReportType.from_str(report_type).display_name}\n\n"
+                        f"结果将推送到当前会话。"
+                    )
                 return BotResponse.markdown_response(
                     f"✅ **分析任务已提交**\n\n"
                     f"• 股票代码: `{code}`\n"
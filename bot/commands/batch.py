@@ -98,13 +98,10 @@ class BatchCommand(BotCommand):
     def _run_batch_analysis(self, stock_list: List[str], message: BotMessage) -> None:
         """后台执行批量分析"""
         try:
-            from src.config import get_config
-            from main import StockAnalysisPipeline
+            from src.core.services import get_pipeline_services
             
-            config = get_config()
-            
-            # 创建分析管道
-            pipeline = StockAnalysisPipeline(config=config)
+            # 创建分析管道（复用已初始化的数据源 / AI / 搜索服务）
+            pipeline = get_pipeline_services().create_pipeline()
             
             # 执行分析（会自动推送汇总报告）
             results = pipeline.run(
@@ -72,28 +72,20 @@ class MarketCommand(BotCommand):
     def _run_market_review(self, message: BotMessage) -> None:
         """后台执行大盘复盘"""
         try:
-            from src.config import get_config
-            from src.notification import NotificationService
+            from src.core.services import get_pipeline_services
             from src.market_analyzer import MarketAnalyzer
-            from src.search_service import SearchService
-            from src.analyzer import GeminiAnalyzer
 
-            config = get_config()
-            notifier = NotificationService(source_message=message)
+            services = get_pipeline_services()
+            config = services.config
+            notifier = services.create_notifier(source_message=message)
 
-            # 初始化搜索服务
+            # 搜索服务（共享实例）
             search_service = None
             if config.bocha_api_keys or config.tavily_api_keys or config.serpapi_keys:
-                search_service = SearchService(
-                    bocha_keys=config.bocha_api_keys,
-                    tavily_keys=config.tavily_api_keys,
-                    serpapi_keys=config.serpapi_keys
-                )
-
-            # 初始化 AI 分析器
-            analyzer = None
-            if config.gemini_api_key or config.openai_api_key:
-                analyzer = GeminiAnalyzer()
+                search_service = services.search_service
+
+            # AI 分析器（共享实例）
+            analyzer = services.analyzer if services.has_llm else None
 
             # 执行复盘
             market_analyzer = MarketAnalyzer(
@@ -81,6 +81,13 @@ class StatusCommand(BotCommand):
         status["notify_telegram"] = bool(config.telegram_bot_token and config.telegram_chat_id)
         status["notify_email"] = bool(config.email_sender and config.email_password)
         
+        # 实时行情缓存 / 熔断统计
+        try:
+            from data_provider.realtime_types import get_cache_registry
+            status["cache_stats"] = get_cache_registry().get_stats()
+        except Exception:
+            status["cache_stats"] = None
+        
         return status
     
     def _format_status(self, status: dict, platform: str) -> str:
@@ -126,6 +133,15 @@ class StatusCommand(BotCommand):
             f"• 邮件: {icon(status['notify_email'])}",
         ])
         
+        cache_stats = status.get('cache_stats')
+        if cache_stats and (cache_stats['caches'] or cache_stats['breakers']):
+            lines.extend(["", "**🗄️ 行情缓存 / 熔断**"])
+            for name, stats in cache_stats['caches'].items():
+                lines.append(f"• {name}: 命中 {stats['hits']} / 未命中 {stats['misses']} (TTL {stats['ttl']:.0f}s)")
+            for name, stats in cache_stats['breakers'].items():
+                trips = sum(stats['trips'].values())
+                lines.append(f"• 熔断器 {name}: 累计熔断 {trips} 次")
+        
         # AI 服务总体状态
         ai_available = status['ai_gemini'] or status['ai_openai']
         if ai_available:
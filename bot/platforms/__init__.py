@@ -41,6 +41,7 @@ try:
         FeishuStreamClient,
         FeishuStreamHandler,
         FeishuReplyClient,
+        get_feishu_reply_client,
         get_feishu_stream_client,
         start_feishu_stream_background,
         FEISHU_SDK_AVAILABLE,
@@ -50,6 +51,7 @@ except ImportError:
     FeishuStreamClient = None
     FeishuStreamHandler = None
     FeishuReplyClient = None
+    get_feishu_reply_client = None
     get_feishu_stream_client = lambda: None
     start_feishu_stream_background = lambda: False
 
@@ -67,6 +69,7 @@ __all__ = [
     'FeishuStreamClient',
     'FeishuStreamHandler',
     'FeishuReplyClient',
+    'get_feishu_reply_client',
     'get_feishu_stream_client',
     'start_feishu_stream_background',
     'FEISHU_SDK_AVAILABLE',
@@ -263,7 +263,7 @@ class DingtalkPlatform(BotPlatform):
             logger.warning("[DingTalk] 没有可用的 sessionWebhook")
             return False
         
-        import requests
+        from src.http_client import get_http_session
         
         try:
             # 构建消息
@@ -291,7 +291,7 @@ class DingtalkPlatform(BotPlatform):
                 }
             
             # 发送请求
-            resp = requests.post(
+            resp = get_http_session('bot').post(
                 session_webhook,
                 json=payload,
                 timeout=10
@@ -25,7 +25,7 @@ import json
 import logging
 import threading
 from datetime import datetime
-from typing import Optional, Callable
+from typing import Dict, Optional, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -487,7 +487,7 @@ class FeishuStreamClient:
     def _create_event_handler(self) -> 'lark.EventDispatcherHandler':
         """创建事件分发处理器"""
         # 创建回复客户端
-        self._reply_client = FeishuReplyClient(self._app_id, self._app_secret)
+        self._reply_client = get_feishu_reply_client(self._app_id, self._app_secret)
 
         # 创建消息处理器
         handler = FeishuStreamHandler(
@@ -586,6 +586,25 @@ class FeishuStreamClient:
 # 全局客户端实例
 _stream_client: Optional[FeishuStreamClient] = None
 
+# 按应用缓存的回复客户端
+_reply_clients: Dict[Tuple[str, str], FeishuReplyClient] = {}
+_reply_clients_lock = threading.Lock()
+
+
+def get_feishu_reply_client(app_id: str, app_secret: str) -> FeishuReplyClient:
+    """
+    获取共享的回复客户端（按应用缓存）
+    
+    复用同一个 lark Client，避免每次推送都重新构建客户端并获取 tenant_access_token
+    """
+    key = (app_id, app_secret)
+    with _reply_clients_lock:
+        client = _reply_clients.get(key)
+        if client is None:
+            client = FeishuReplyClient(app_id, app_secret)
+            _reply_clients[key] = client
+        return client
+
 
 def get_feishu_stream_client() -> Optional[FeishuStreamClient]:
     """获取全局 Stream 客户端实例"""
@@ -40,9 +40,10 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
 from .realtime_types import (
-    UnifiedRealtimeQuote, ChipDistribution, RealtimeSource,
-    get_realtime_circuit_breaker, get_chip_circuit_breaker,
+    UnifiedRealtimeQuote, ChipDistribution, RealtimeSource, RealtimeSnapshotStore,
+    get_realtime_circuit_breaker, get_chip_circuit_breaker, get_cache_registry,
     safe_float, safe_int  # 使用统一的类型转换函数
 )
 
@@ -64,24 +65,57 @@ USER_AGENTS = [
 ]
 
 
-# 缓存实时行情数据（避免重复请求）
-# TTL 设为 20 分钟 (1200秒)：
-# - 批量分析场景：通常 30 只股票在 5 分钟内分析完，20 分钟足够覆盖
-# - 实时性要求：股票分析不需要秒级实时数据，20 分钟延迟可接受
-# - 防封禁：减少 API 调用频率
-_realtime_cache: Dict[str, Any] = {
-    'data': None,
-    'timestamp': 0,
-    'ttl': 1200  # 20分钟缓存有效期
+# 东财全量行情列名映射（UnifiedRealtimeQuote 字段 -> 候选列名）
+_EM_SPOT_COLUMNS = {
+    'name': ('名称',),
+    'price': ('最新价',),
+    'change_pct': ('涨跌幅',),
+    'change_amount': ('涨跌额',),
+    'volume': ('成交量',),
+    'amount': ('成交额',),
+    'volume_ratio': ('量比',),
+    'turnover_rate': ('换手率',),
+    'amplitude': ('振幅',),
+    'open_price': ('今开',),
+    'high': ('最高',),
+    'low': ('最低',),
+    'pe_ratio': ('市盈率-动态',),
+    'pb_ratio': ('市净率',),
+    'total_mv': ('总市值',),
+    'circ_mv': ('流通市值',),
+    'change_60d': ('60日涨跌幅',),
+    'high_52w': ('52周最高',),
+    'low_52w': ('52周最低',),
 }
 
-# ETF 实时行情缓存
-_etf_realtime_cache: Dict[str, Any] = {
-    'data': None,
-    'timestamp': 0,
-    'ttl': 1200  # 20分钟缓存有效期
+_ETF_SPOT_COLUMNS = {
+    k: v for k, v in _EM_SPOT_COLUMNS.items()
+    if k not in ('pe_ratio', 'pb_ratio', 'change_60d')
 }
 
+_HK_SPOT_COLUMNS = {
+    **{k: v for k, v in _EM_SPOT_COLUMNS.items()
+       if k not in ('open_price', 'high', 'low', 'change_60d')},
+    'pe_ratio': ('市盈率',),
+}
+
+
+# 全量行情快照缓存（由缓存注册表统一创建，TTL 取自 REALTIME_CACHE_TTL，可按名称覆盖）
+# 快照入库时建立代码索引，后续每只股票查询为 O(1)
+def _get_realtime_cache() -> RealtimeSnapshotStore:
+    """A股实时行情快照（ak.stock_zh_a_spot_em）"""
+    return get_cache_registry().snapshot_store('akshare_em', RealtimeSource.AKSHARE_EM, _EM_SPOT_COLUMNS)
+
+
+def _get_etf_realtime_cache() -> RealtimeSnapshotStore:
+    """ETF 实时行情快照（ak.fund_etf_spot_em）"""
+    return get_cache_registry().snapshot_store('akshare_etf', RealtimeSource.AKSHARE_EM, _ETF_SPOT_COLUMNS)
+
+
+def _get_hk_realtime_cache() -> RealtimeSnapshotStore:
+    """港股实时行情快照（ak.stock_hk_spot_em）"""
+    return get_cache_registry().snapshot_store('akshare_hk', RealtimeSource.AKSHARE_EM, _HK_SPOT_COLUMNS)
+
 
 def _is_etf_code(stock_code: str) -> bool:
     """
@@ -165,7 +199,7 @@ class AkshareFetcher(BaseFetcher):
     数据来源：东方财富网爬虫
     
     关键策略：
-    - 每次请求前随机休眠 2.0-5.0 秒
+    - 按上游端点共享令牌桶限速（默认间隔 2.0-5.0 秒）
     - 随机 User-Agent 轮换
     - 失败后指数退避重试（最多3次）
     """
@@ -173,17 +207,13 @@ class AkshareFetcher(BaseFetcher):
     name = "AkshareFetcher"
     priority = 1
     
-    def __init__(self, sleep_min: float = 2.0, sleep_max: float = 5.0):
+    def __init__(self):
         """
         初始化 AkshareFetcher
         
-        Args:
-            sleep_min: 最小休眠时间（秒）
-            sleep_max: 最大休眠时间（秒）
+        请求间隔由按上游共享的令牌桶控制（AKSHARE_SLEEP_MIN/MAX），
+        多线程共用同一 Fetcher 时也不会超出限速。
         """
-        self.sleep_min = sleep_min
-        self.sleep_max = sleep_max
-        self._last_request_time: Optional[float] = None
     
     def _set_random_user_agent(self) -> None:
         """
@@ -201,26 +231,18 @@ class AkshareFetcher(BaseFetcher):
         except Exception as e:
             logger.debug(f"设置 User-Agent 失败: {e}")
     
-    def _enforce_rate_limit(self) -> None:
+    def _enforce_rate_limit(self, endpoint: str = 'eastmoney') -> None:
         """
         强制执行速率限制
         
         策略：
-        1. 检查距离上次请求的时间间隔
-        2. 如果间隔不足，补充休眠时间
-        3. 然后再执行随机 jitter 休眠
+        1. 按上游端点（eastmoney / sina / tencent）获取进程内共享的令牌桶
+        2. 按先后顺序排队等待放行，间隔带随机 jitter（防封禁）
+        
+        Args:
+            endpoint: 上游端点名称
         """
-        if self._last_request_time is not None:
-            elapsed = time.time() - self._last_request_time
-            min_interval = self.sleep_min
-            if elapsed < min_interval:
-                additional_sleep = min_interval - elapsed
-                logger.debug(f"补充休眠 {additional_sleep:.2f} 秒")
-                time.sleep(additional_sleep)
-        
-        # 执行随机 jitter 休眠
-        self.random_sleep(self.sleep_min, self.sleep_max)
-        self._last_request_time = time.time()
+        get_rate_limiter(endpoint).acquire()
     
     @retry(
         stop=stop_after_attempt(3),  # 最多重试3次
@@ -518,90 +540,27 @@ class AkshareFetcher(BaseFetcher):
         优点：数据最全，含量比、换手率、市盈率、市净率、总市值、流通市值等
         缺点：全量拉取，数据量大，容易超时/限流
         """
-        import akshare as ak
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_em"
+        cache = _get_realtime_cache()
         
         try:
-            # 检查缓存
-            current_time = time.time()
-            if (_realtime_cache['data'] is not None and 
-                current_time - _realtime_cache['timestamp'] < _realtime_cache['ttl']):
-                df = _realtime_cache['data']
-                cache_age = int(current_time - _realtime_cache['timestamp'])
-                logger.debug(f"[缓存命中] A股实时行情(东财) - 缓存年龄 {cache_age}s/{_realtime_cache['ttl']}s")
+            # 检查缓存，过期则触发全量刷新
+            if cache.ensure_fresh(self._load_stock_spot_em):
+                logger.debug(f"[缓存命中] A股实时行情(东财) - 缓存年龄 {int(cache.age())}s/{cache.ttl}s")
             else:
-                # 触发全量刷新
-                logger.info(f"[缓存未命中] 触发全量刷新 A股实时行情(东财)")
-                last_error: Optional[Exception] = None
-                df = None
-                for attempt in range(1, 3):
-                    try:
-                        # 防封禁策略
-                        self._set_random_user_agent()
-                        self._enforce_rate_limit()
-
-                        logger.info(f"[API调用] ak.stock_zh_a_spot_em() 获取A股实时行情... (attempt {attempt}/2)")
-                        import time as _time
-                        api_start = _time.time()
+                logger.info(f"[缓存更新] A股实时行情(东财) 缓存已刷新，索引 {len(cache)} 只，TTL={cache.ttl}s")
 
-                        df = ak.stock_zh_a_spot_em()
-
-                        api_elapsed = _time.time() - api_start
-                        logger.info(f"[API返回] ak.stock_zh_a_spot_em 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
-                        circuit_breaker.record_success(source_key)
-                        break
-                    except Exception as e:
-                        last_error = e
-                        logger.warning(f"[API错误] ak.stock_zh_a_spot_em 获取失败 (attempt {attempt}/2): {e}")
-                        time.sleep(min(2 ** attempt, 5))
-
-                # 更新缓存：成功缓存数据；失败也缓存空数据，避免同一轮任务对同一接口反复请求
-                if df is None:
-                    logger.error(f"[API错误] ak.stock_zh_a_spot_em 最终失败: {last_error}")
-                    circuit_breaker.record_failure(source_key, str(last_error))
-                    df = pd.DataFrame()
-                _realtime_cache['data'] = df
-                _realtime_cache['timestamp'] = current_time
-                logger.info(f"[缓存更新] A股实时行情(东财) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
-
-            if df is None or df.empty:
+            if cache.is_empty():
                 logger.warning(f"[实时行情] A股实时行情数据为空，跳过 {stock_code}")
                 return None
             
-            # 查找指定股票
-            row = df[df['代码'] == stock_code]
-            if row.empty:
+            # 查找指定股票（代码索引 O(1) 查询）
+            quote = cache.get(stock_code)
+            if quote is None:
                 logger.warning(f"[API返回] 未找到股票 {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get('名称', '')),
-                source=RealtimeSource.AKSHARE_EM,
-                price=safe_float(row.get('最新价')),
-                change_pct=safe_float(row.get('涨跌幅')),
-                change_amount=safe_float(row.get('涨跌额')),
-                volume=safe_int(row.get('成交量')),
-                amount=safe_float(row.get('成交额')),
-                volume_ratio=safe_float(row.get('量比')),
-                turnover_rate=safe_float(row.get('换手率')),
-                amplitude=safe_float(row.get('振幅')),
-                open_price=safe_float(row.get('今开')),
-                high=safe_float(row.get('最高')),
-                low=safe_float(row.get('最低')),
-                pe_ratio=safe_float(row.get('市盈率-动态')),
-                pb_ratio=safe_float(row.get('市净率')),
-                total_mv=safe_float(row.get('总市值')),
-                circ_mv=safe_float(row.get('流通市值')),
-                change_60d=safe_float(row.get('60日涨跌幅')),
-                high_52w=safe_float(row.get('52周最高')),
-                low_52w=safe_float(row.get('52周最低')),
-            )
-            
             logger.info(f"[实时行情-东财] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"量比={quote.volume_ratio}, 换手率={quote.turnover_rate}%")
             return quote
@@ -611,6 +570,43 @@ class AkshareFetcher(BaseFetcher):
             circuit_breaker.record_failure(source_key, str(e))
             return None
     
+    def _load_stock_spot_em(self) -> pd.DataFrame:
+        """
+        全量拉取 A股实时行情（东财），供快照缓存刷新使用
+        
+        失败时返回空 DataFrame：空快照同样会被缓存，避免同一轮任务对同一接口反复请求
+        """
+        import akshare as ak
+        circuit_breaker = get_realtime_circuit_breaker()
+        source_key = "akshare_em"
+        
+        logger.info(f"[缓存未命中] 触发全量刷新 A股实时行情(东财)")
+        last_error: Optional[Exception] = None
+        for attempt in range(1, 3):
+            try:
+                # 防封禁策略
+                self._set_random_user_agent()
+                self._enforce_rate_limit()
+
+                logger.info(f"[API调用] ak.stock_zh_a_spot_em() 获取A股实时行情... (attempt {attempt}/2)")
+                import time as _time
+                api_start = _time.time()
+
+                df = ak.stock_zh_a_spot_em()
+
+                api_elapsed = _time.time() - api_start
+                logger.info(f"[API返回] ak.stock_zh_a_spot_em 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
+                circuit_breaker.record_success(source_key)
+                return df
+            except Exception as e:
+                last_error = e
+                logger.warning(f"[API错误] ak.stock_zh_a_spot_em 获取失败 (attempt {attempt}/2): {e}")
+                time.sleep(min(2 ** attempt, 5))
+
+        logger.error(f"[API错误] ak.stock_zh_a_spot_em 最终失败: {last_error}")
+        circuit_breaker.record_failure(source_key, str(last_error))
+        return pd.DataFrame()
+    
     def _get_stock_realtime_quote_sina(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取普通 A 股实时行情数据（新浪财经数据源）
@@ -641,7 +637,7 @@ class AkshareFetcher(BaseFetcher):
             
             logger.info(f"[API调用] 新浪财经接口获取 {stock_code} 实时行情...")
             
-            self._enforce_rate_limit()
+            self._enforce_rate_limit('sina')
             response = requests.get(url, headers=headers, timeout=10)
             response.encoding = 'gbk'
             
@@ -739,7 +735,7 @@ class AkshareFetcher(BaseFetcher):
             
             logger.info(f"[API调用] 腾讯财经接口获取 {stock_code} 实时行情...")
             
-            self._enforce_rate_limit()
+            self._enforce_rate_limit('tencent')
             response = requests.get(url, headers=headers, timeout=10)
             response.encoding = 'gbk'
             
@@ -813,83 +809,25 @@ class AkshareFetcher(BaseFetcher):
         Returns:
             UnifiedRealtimeQuote 对象，获取失败返回 None
         """
-        import akshare as ak
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_etf"
+        cache = _get_etf_realtime_cache()
         
         try:
-            # 检查缓存
-            current_time = time.time()
-            if (_etf_realtime_cache['data'] is not None and 
-                current_time - _etf_realtime_cache['timestamp'] < _etf_realtime_cache['ttl']):
-                df = _etf_realtime_cache['data']
+            # 检查缓存，过期则触发全量刷新
+            if cache.ensure_fresh(self._load_etf_spot_em):
                 logger.debug(f"[缓存命中] 使用缓存的ETF实时行情数据")
-            else:
-                last_error: Optional[Exception] = None
-                df = None
-                for attempt in range(1, 3):
-                    try:
-                        # 防封禁策略
-                        self._set_random_user_agent()
-                        self._enforce_rate_limit()
-
-                        logger.info(f"[API调用] ak.fund_etf_spot_em() 获取ETF实时行情... (attempt {attempt}/2)")
-                        import time as _time
-                        api_start = _time.time()
 
-                        df = ak.fund_etf_spot_em()
-
-                        api_elapsed = _time.time() - api_start
-                        logger.info(f"[API返回] ak.fund_etf_spot_em 成功: 返回 {len(df)} 只ETF, 耗时 {api_elapsed:.2f}s")
-                        circuit_breaker.record_success(source_key)
-                        break
-                    except Exception as e:
-                        last_error = e
-                        logger.warning(f"[API错误] ak.fund_etf_spot_em 获取失败 (attempt {attempt}/2): {e}")
-                        time.sleep(min(2 ** attempt, 5))
-
-                if df is None:
-                    logger.error(f"[API错误] ak.fund_etf_spot_em 最终失败: {last_error}")
-                    circuit_breaker.record_failure(source_key, str(last_error))
-                    df = pd.DataFrame()
-                _etf_realtime_cache['data'] = df
-                _etf_realtime_cache['timestamp'] = current_time
-
-            if df is None or df.empty:
+            if cache.is_empty():
                 logger.warning(f"[实时行情] ETF实时行情数据为空，跳过 {stock_code}")
                 return None
             
             # 查找指定 ETF
-            row = df[df['代码'] == stock_code]
-            if row.empty:
+            quote = cache.get(stock_code)
+            if quote is None:
                 logger.warning(f"[API返回] 未找到 ETF {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            # ETF 行情数据构建
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get('名称', '')),
-                source=RealtimeSource.AKSHARE_EM,
-                price=safe_float(row.get('最新价')),
-                change_pct=safe_float(row.get('涨跌幅')),
-                change_amount=safe_float(row.get('涨跌额')),
-                volume=safe_int(row.get('成交量')),
-                amount=safe_float(row.get('成交额')),
-                volume_ratio=safe_float(row.get('量比')),
-                turnover_rate=safe_float(row.get('换手率')),
-                amplitude=safe_float(row.get('振幅')),
-                open_price=safe_float(row.get('今开')),
-                high=safe_float(row.get('最高')),
-                low=safe_float(row.get('最低')),
-                total_mv=safe_float(row.get('总市值')),
-                circ_mv=safe_float(row.get('流通市值')),
-                high_52w=safe_float(row.get('52周最高')),
-                low_52w=safe_float(row.get('52周最低')),
-            )
-            
             logger.info(f"[ETF实时行情] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"换手率={quote.turnover_rate}%")
             return quote
@@ -899,6 +837,38 @@ class AkshareFetcher(BaseFetcher):
             circuit_breaker.record_failure(source_key, str(e))
             return None
     
+    def _load_etf_spot_em(self) -> pd.DataFrame:
+        """全量拉取 ETF 实时行情，失败时返回空 DataFrame"""
+        import akshare as ak
+        circuit_breaker = get_realtime_circuit_breaker()
+        source_key = "akshare_etf"
+        
+        last_error: Optional[Exception] = None
+        for attempt in range(1, 3):
+            try:
+                # 防封禁策略
+                self._set_random_user_agent()
+                self._enforce_rate_limit()
+
+                logger.info(f"[API调用] ak.fund_etf_spot_em() 获取ETF实时行情... (attempt {attempt}/2)")
+                import time as _time
+                api_start = _time.time()
+
+                df = ak.fund_etf_spot_em()
+
+                api_elapsed = _time.time() - api_start
+                logger.info(f"[API返回] ak.fund_etf_spot_em 成功: 返回 {len(df)} 只ETF, 耗时 {api_elapsed:.2f}s")
+                circuit_breaker.record_success(source_key)
+                return df
+            except Exception as e:
+                last_error = e
+                logger.warning(f"[API错误] ak.fund_etf_spot_em 获取失败 (attempt {attempt}/2): {e}")
+                time.sleep(min(2 ** attempt, 5))
+
+        logger.error(f"[API错误] ak.fund_etf_spot_em 最终失败: {last_error}")
+        circuit_breaker.record_failure(source_key, str(last_error))
+        return pd.DataFrame()
+    
     def _get_hk_realtime_quote(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取港股实时行情数据
@@ -912,57 +882,24 @@ class AkshareFetcher(BaseFetcher):
         Returns:
             UnifiedRealtimeQuote 对象，获取失败返回 None
         """
-        import akshare as ak
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_hk"
+        cache = _get_hk_realtime_cache()
         
         try:
-            # 防封禁策略
-            self._set_random_user_agent()
-            self._enforce_rate_limit()
-            
             # 确保代码格式正确（5位数字）
             code = stock_code.lower().replace('hk', '').zfill(5)
             
-            logger.info(f"[API调用] ak.stock_hk_spot_em() 获取港股实时行情...")
-            import time as _time
-            api_start = _time.time()
-            
-            df = ak.stock_hk_spot_em()
-            
-            api_elapsed = _time.time() - api_start
-            logger.info(f"[API返回] ak.stock_hk_spot_em 成功: 返回 {len(df)} 只港股, 耗时 {api_elapsed:.2f}s")
-            circuit_breaker.record_success(source_key)
+            if cache.ensure_fresh(self._load_hk_spot_em):
+                logger.debug(f"[缓存命中] 使用缓存的港股实时行情数据")
             
             # 查找指定港股
-            row = df[df['代码'] == code]
-            if row.empty:
+            quote = cache.get(code)
+            if quote is None:
                 logger.warning(f"[API返回] 未找到港股 {code} 的实时行情")
                 return None
-            
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            # 港股行情数据构建
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get('名称', '')),
-                source=RealtimeSource.AKSHARE_EM,
-                price=safe_float(row.get('最新价')),
-                change_pct=safe_float(row.get('涨跌幅')),
-                change_amount=safe_float(row.get('涨跌额')),
-                volume=safe_int(row.get('成交量')),
-                amount=safe_float(row.get('成交额')),
-                volume_ratio=safe_float(row.get('量比')),
-                turnover_rate=safe_float(row.get('换手率')),
-                amplitude=safe_float(row.get('振幅')),
-                pe_ratio=safe_float(row.get('市盈率')),
-                pb_ratio=safe_float(row.get('市净率')),
-                total_mv=safe_float(row.get('总市值')),
-                circ_mv=safe_float(row.get('流通市值')),
-                high_52w=safe_float(row.get('52周最高')),
-                low_52w=safe_float(row.get('52周最低')),
-            )
+            # 保持调用方传入的代码格式（如 hk00700）
+            quote.code = stock_code
             
             logger.info(f"[港股实时行情] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"换手率={quote.turnover_rate}%")
@@ -973,6 +910,26 @@ class AkshareFetcher(BaseFetcher):
             circuit_breaker.record_failure(source_key, str(e))
             return None
     
+    def _load_hk_spot_em(self) -> pd.DataFrame:
+        """全量拉取港股实时行情（异常向上抛出，由调用方记录熔断）"""
+        import akshare as ak
+        circuit_breaker = get_realtime_circuit_breaker()
+        
+        # 防封禁策略
+        self._set_random_user_agent()
+        self._enforce_rate_limit()
+        
+        logger.info(f"[API调用] ak.stock_hk_spot_em() 获取港股实时行情...")
+        import time as _time
+        api_start = _time.time()
+        
+        df = ak.stock_hk_spot_em()
+        
+        api_elapsed = _time.time() - api_start
+        logger.info(f"[API返回] ak.stock_hk_spot_em 成功: 返回 {len(df)} 只港股, 耗时 {api_elapsed:.2f}s")
+        circuit_breaker.record_success("akshare_hk")
+        return df
+    
     def get_chip_distribution(self, stock_code: str) -> Optional[ChipDistribution]:
         """
         获取筹码分布数据
@@ -988,17 +945,37 @@ class AkshareFetcher(BaseFetcher):
         Returns:
             ChipDistribution 对象（最新一天的数据），获取失败返回 None
         """
+        history = self.get_chip_history(stock_code)
+        if not history:
+            return None
+        
+        chip = history[-1]
+        logger.info(f"[筹码分布] {stock_code} 日期={chip.date}: 获利比例={chip.profit_ratio:.1%}, "
+                   f"平均成本={chip.avg_cost}, 90%集中度={chip.concentration_90:.2%}, "
+                   f"70%集中度={chip.concentration_70:.2%}")
+        return chip
+    
+    def get_chip_history(self, stock_code: str) -> List[ChipDistribution]:
+        """
+        获取逐日筹码分布（ak.stock_cyq_em 一次返回近几个月的全部交易日）
+        
+        Args:
+            stock_code: 股票代码
+            
+        Returns:
+            按日期升序的 ChipDistribution 列表，获取失败或不支持时返回空列表
+        """
         import akshare as ak
 
         # 美股没有筹码分布数据（Akshare 不支持）
         if _is_us_code(stock_code):
             logger.debug(f"[API跳过] {stock_code} 是美股，无筹码分布数据")
-            return None
+            return []
 
         # ETF/指数没有筹码分布数据
         if _is_etf_code(stock_code):
             logger.debug(f"[API跳过] {stock_code} 是 ETF/指数，无筹码分布数据")
-            return None
+            return []
         
         try:
             # 防封禁策略
@@ -1015,36 +992,30 @@ class AkshareFetcher(BaseFetcher):
             
             if df.empty:
                 logger.warning(f"[API返回] ak.stock_cyq_em 返回空数据, 耗时 {api_elapsed:.2f}s")
-                return None
+                return []
             
             logger.info(f"[API返回] ak.stock_cyq_em 成功: 返回 {len(df)} 天数据, 耗时 {api_elapsed:.2f}s")
             logger.debug(f"[API返回] 筹码数据列名: {list(df.columns)}")
             
-            # 取最新一天的数据
-            latest = df.iloc[-1]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            chip = ChipDistribution(
-                code=stock_code,
-                date=str(latest.get('日期', '')),
-                profit_ratio=safe_float(latest.get('获利比例')),
-                avg_cost=safe_float(latest.get('平均成本')),
-                cost_90_low=safe_float(latest.get('90成本-低')),
-                cost_90_high=safe_float(latest.get('90成本-高')),
-                concentration_90=safe_float(latest.get('90集中度')),
-                cost_70_low=safe_float(latest.get('70成本-低')),
-                cost_70_high=safe_float(latest.get('70成本-高')),
-                concentration_70=safe_float(latest.get('70集中度')),
-            )
-            
-            logger.info(f"[筹码分布] {stock_code} 日期={chip.date}: 获利比例={chip.profit_ratio:.1%}, "
-                       f"平均成本={chip.avg_cost}, 90%集中度={chip.concentration_90:.2%}, "
-                       f"70%集中度={chip.concentration_70:.2%}")
-            return chip
+            return [
+                ChipDistribution(
+                    code=stock_code,
+                    date=str(row.get('日期', '')),
+                    profit_ratio=safe_float(row.get('获利比例')),
+                    avg_cost=safe_float(row.get('平均成本')),
+                    cost_90_low=safe_float(row.get('90成本-低')),
+                    cost_90_high=safe_float(row.get('90成本-高')),
+                    concentration_90=safe_float(row.get('90集中度')),
+                    cost_70_low=safe_float(row.get('70成本-低')),
+                    cost_70_high=safe_float(row.get('70成本-高')),
+                    concentration_70=safe_float(row.get('70集中度')),
+                )
+                for row in df.to_dict('records')
+            ]
             
         except Exception as e:
             logger.error(f"[API错误] 获取 {stock_code} 筹码分布失败: {e}")
-            return None
+            return []
     
     def get_enhanced_data(self, stock_code: str, days: int = 60) -> Dict[str, Any]:
         """
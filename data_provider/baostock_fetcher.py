@@ -9,12 +9,14 @@ BaostockFetcher - 备用数据源 2 (Priority 3)
 优点：稳定、无配额限制
 
 关键策略：
-1. 管理 bs.login() 和 bs.logout() 生命周期
-2. 使用上下文管理器防止连接泄露
+1. 进程内长会话：只登录一次，出错后才重新登录，退出时登出
+2. baostock 为进程级全局 socket 客户端，所有请求串行执行
 3. 失败后指数退避重试
 """
 
+import atexit
 import logging
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, Generator
@@ -29,10 +31,97 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
+class BaostockSession:
+    """
+    Baostock 长会话管理器（进程级单例）
+    
+    - 首次使用时登录，之后复用同一会话，避免每次请求都 login/logout
+    - baostock 模块内部只有一个全局 socket，使用可重入锁串行化所有请求
+      （包括结果集的 rs.next() 分页读取），防止多线程交叉读写
+    - 请求出错时作废会话，下次使用时自动重新登录
+    - 进程退出时登出
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bs = None
+        self._logged_in = False
+        self.logins = 0
+        atexit.register(self.logout)
+    
+    def _login(self) -> None:
+        if self._bs is None:
+            import baostock as bs
+            self._bs = bs
+        
+        login_result = self._bs.login()
+        if login_result.error_code != '0':
+            raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
+        
+        self._logged_in = True
+        self.logins += 1
+        logger.debug(f"Baostock 登录成功（第 {self.logins} 次）")
+    
+    def invalidate(self) -> None:
+        """作废当前会话（下次使用时重新登录）"""
+        with self._lock:
+            if self._logged_in:
+                self.logout()
+    
+    def logout(self) -> None:
+        """登出并重置会话状态"""
+        with self._lock:
+            if not self._logged_in:
+                return
+            self._logged_in = False
+            try:
+                logout_result = self._bs.logout()
+                if logout_result.error_code == '0':
+                    logger.debug("Baostock 登出成功")
+                else:
+                    logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
+            except Exception as e:
+                logger.warning(f"Baostock 登出时发生错误: {e}")
+    
+    @contextmanager
+    def session(self) -> Generator:
+        """
+        串行使用已登录的 baostock 模块
+        
+        块内抛出非 DataFetchError 异常（网络/协议错误）时作废会话；
+        查询返回错误码时由调用方显式 invalidate()
+        """
+        with self._lock:
+            if not self._logged_in:
+                self._login()
+            try:
+                yield self._bs
+            except DataFetchError:
+                raise
+            except Exception:
+                self.invalidate()
+                raise
+
+
+_session: Optional[BaostockSession] = None
+_session_lock = threading.Lock()
+
+
+def get_baostock_session() -> BaostockSession:
+    """获取进程级 Baostock 会话"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = BaostockSession()
+    return _session
+
+
 class BaostockFetcher(BaseFetcher):
     """
     Baostock 数据源实现
@@ -41,8 +130,8 @@ class BaostockFetcher(BaseFetcher):
     数据来源：证券宝 Baostock API
     
     关键策略：
-    - 使用上下文管理器管理连接生命周期
-    - 每次请求都重新登录/登出，防止连接泄露
+    - 共享进程级长会话，登录一次后复用，出错时自动重新登录
+    - 请求串行执行，多线程并发调用安全
     - 失败后指数退避重试
     
     Baostock 特点：
@@ -56,57 +145,23 @@ class BaostockFetcher(BaseFetcher):
     
     def __init__(self):
         """初始化 BaostockFetcher"""
-        self._bs_module = None
-    
-    def _get_baostock(self):
-        """
-        延迟加载 baostock 模块
-        
-        只在首次使用时导入，避免未安装时报错
-        """
-        if self._bs_module is None:
-            import baostock as bs
-            self._bs_module = bs
-        return self._bs_module
+        self._session = get_baostock_session()
     
     @contextmanager
     def _baostock_session(self) -> Generator:
         """
-        Baostock 连接上下文管理器
+        Baostock 会话上下文管理器
         
-        确保：
-        1. 进入上下文时自动登录
-        2. 退出上下文时自动登出
-        3. 异常时也能正确登出
+        复用进程级长会话（未登录时自动登录），块内请求与其他线程串行执行；
+        进入前先经过 baostock 共享限速器
         
         使用示例：
-            with self._baostock_session():
+            with self._baostock_session() as bs:
                 # 在这里执行数据查询
         """
-        bs = self._get_baostock()
-        login_result = None
-        
-        try:
-            # 登录 Baostock
-            login_result = bs.login()
-            
-            if login_result.error_code != '0':
-                raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
-            
-            logger.debug("Baostock 登录成功")
-            
+        get_rate_limiter('baostock').acquire()
+        with self._session.session() as bs:
             yield bs
-            
-        finally:
-            # 确保登出，防止连接泄露
-            try:
-                logout_result = bs.logout()
-                if logout_result.error_code == '0':
-                    logger.debug("Baostock 登出成功")
-                else:
-                    logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
-            except Exception as e:
-                logger.warning(f"Baostock 登出时发生错误: {e}")
     
     def _convert_stock_code(self, stock_code: str) -> str:
         """
@@ -177,6 +232,8 @@ class BaostockFetcher(BaseFetcher):
                 )
                 
                 if rs.error_code != '0':
+                    # 查询错误多由会话失效引起，作废后下次重新登录
+                    self._session.invalidate()
                     raise DataFetchError(f"Baostock 查询失败: {rs.error_msg}")
                 
                 # 转换为 DataFrame
@@ -272,6 +329,8 @@ class BaostockFetcher(BaseFetcher):
                             self._stock_name_cache[stock_code] = name
                             logger.debug(f"Baostock 获取股票名称成功: {stock_code} -> {name}")
                             return name
+                else:
+                    self._session.invalidate()
                 
         except Exception as e:
             logger.warning(f"Baostock 获取股票名称失败 {stock_code}: {e}")
@@ -312,6 +371,8 @@ class BaostockFetcher(BaseFetcher):
                         
                         logger.info(f"Baostock 获取股票列表成功: {len(df)} 条")
                         return df[['code', 'name']]
+                else:
+                    self._session.invalidate()
                 
         except Exception as e:
             logger.warning(f"Baostock 获取股票列表失败: {e}")
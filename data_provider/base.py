@@ -336,6 +336,52 @@ class DataFetcherManager:
                     break
         # Fallback: assume today is trade day when no calendar available.
         return today, True
+
+    def _get_tushare_fetcher(self) -> Optional[BaseFetcher]:
+        """返回可用的 TushareFetcher（未配置 Token 时为 None）"""
+        for fetcher in self._fetchers:
+            if fetcher.name == "TushareFetcher" and getattr(fetcher, "is_available", lambda: False)():
+                return fetcher
+        return None
+
+    def supports_market_daily(self) -> bool:
+        """是否支持按交易日获取全市场日线（需要 Tushare）"""
+        return self._get_tushare_fetcher() is not None
+
+    def get_recent_trade_dates(self, count: int) -> List[date]:
+        """
+        获取最近 count 个交易日（升序，依赖 Tushare 交易日历）
+
+        Returns:
+            交易日列表，不可用时返回空列表
+        """
+        fetcher = self._get_tushare_fetcher()
+        if fetcher is None:
+            return []
+        try:
+            return fetcher.get_recent_trade_dates(count)
+        except Exception as e:
+            logger.warning(f"[交易日历] Tushare 获取失败: {e}")
+            return []
+
+    def get_market_daily(self, trade_date: date) -> Optional[pd.DataFrame]:
+        """
+        按交易日获取全市场日线（Tushare trade_date 模式）
+
+        Args:
+            trade_date: 交易日
+
+        Returns:
+            含 code 列的标准化 DataFrame，失败返回 None
+        """
+        fetcher = self._get_tushare_fetcher()
+        if fetcher is None:
+            return None
+        try:
+            return fetcher.get_market_daily(trade_date)
+        except Exception as e:
+            logger.warning(f"[全市场日线] Tushare {trade_date} 获取失败: {e}")
+            return None
     
     def add_fetcher(self, fetcher: BaseFetcher) -> None:
         """添加数据源并重新排序"""
@@ -398,6 +444,40 @@ class DataFetcherManager:
         logger.error(error_summary)
         raise DataFetchError(error_summary)
     
+    def get_daily_data_batch(
+        self,
+        stock_codes: List[str],
+        days: int = 30,
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:
+        """
+        批量获取美股/港股日线数据（yfinance 多代码单次下载）
+        
+        A 股不参与批量（由各国内数据源逐只获取）；批量失败或缺失的股票
+        不在结果中，调用方可回退到 get_daily_data 逐只获取
+        
+        Args:
+            stock_codes: 股票代码列表
+            days: 获取天数
+            
+        Returns:
+            {股票代码: (数据, 数据源名称)}
+        """
+        from .akshare_fetcher import _is_hk_code, _is_us_code
+        
+        codes = [c for c in stock_codes if _is_us_code(c) or _is_hk_code(c)]
+        if len(codes) < 2:
+            return {}
+        
+        for fetcher in self._fetchers:
+            if fetcher.name == "YfinanceFetcher" and hasattr(fetcher, 'get_daily_data_batch'):
+                try:
+                    frames = fetcher.get_daily_data_batch(codes, days=days)
+                except Exception as e:
+                    logger.warning(f"[批量日线] {fetcher.name} 失败，将逐只获取: {e}")
+                    return {}
+                return {code: (df, fetcher.name) for code, df in frames.items()}
+        return {}
+    
     @property
     def available_fetchers(self) -> List[str]:
         """返回可用数据源名称列表"""
@@ -408,7 +488,7 @@ class DataFetcherManager:
         批量预取实时行情数据（在分析开始前调用）
         
         策略：
-        1. 检查优先级中是否包含全量拉取数据源（efinance/akshare_em）
+        1. 检查优先级中是否包含全量/批量数据源（efinance/akshare_em/pytdx）
         2. 如果不包含，跳过预取（新浪/腾讯是单股票查询，无需预取）
         3. 如果自选股数量 >= 5 且使用全量数据源，则预取填充缓存
         
@@ -435,7 +515,8 @@ class DataFetcherManager:
         # 注意：新增全量接口（如 tushare_realtime）时需同步更新此列表
         # 全量接口特征：一次 API 调用拉取全市场 5000+ 股票数据
         priority = config.realtime_source_priority.lower()
-        bulk_sources = ['efinance', 'akshare_em']  # TODO: 新增全量接口需同步更新此处
+        # pytdx 为批量接口：按自选股分批查询（每次 80 只），不拉全市场
+        bulk_sources = ['efinance', 'akshare_em', 'pytdx']  # TODO: 新增全量接口需同步更新此处
         
         # 如果优先级中前两个都不是全量数据源，跳过预取
         # 因为新浪/腾讯是单股票查询，不需要预取
@@ -458,6 +539,18 @@ class DataFetcherManager:
         
         logger.info(f"[预取] 开始批量预取实时行情，共 {len(stock_codes)} 只股票...")
         
+        # pytdx：直接按自选股批量查询并写入快照
+        if priority_list[first_bulk_source_index] == 'pytdx':
+            for fetcher in self._fetchers:
+                if fetcher.name == "PytdxFetcher" and hasattr(fetcher, 'get_realtime_quotes'):
+                    quotes = fetcher.get_realtime_quotes(stock_codes)
+                    if quotes:
+                        logger.info(f"[预取] pytdx 批量预取完成，缓存 {len(quotes)} 只")
+                        return len(quotes)
+                    break
+            logger.warning(f"[预取] pytdx 批量预取失败，将使用逐个查询模式")
+            return 0
+        
         # 尝试通过 efinance 或 akshare 预取
         # 只需要调用一次 get_realtime_quote，缓存机制会自动拉取全市场数据
         try:
@@ -485,7 +578,8 @@ class DataFetcherManager:
         2. AkshareFetcher.get_realtime_quote(source="em")  - 东财
         3. AkshareFetcher.get_realtime_quote(source="sina") - 新浪
         4. AkshareFetcher.get_realtime_quote(source="tencent") - 腾讯
-        5. 返回 None（降级兜底）
+        5. PytdxFetcher.get_realtime_quote() - 通达信（需在优先级中配置 pytdx）
+        6. 返回 None（降级兜底）
         
         Args:
             stock_code: 股票代码
@@ -538,6 +632,14 @@ class DataFetcherManager:
                                 quote = fetcher.get_realtime_quote(stock_code, source="sina")
                             break
                 
+                elif source == "pytdx":
+                    # 尝试 PytdxFetcher（优先命中批量预取的快照）
+                    for fetcher in self._fetchers:
+                        if fetcher.name == "PytdxFetcher":
+                            if hasattr(fetcher, 'get_realtime_quote'):
+                                quote = fetcher.get_realtime_quote(stock_code)
+                            break
+                
                 elif source in ("tencent", "akshare_qq"):
                     # 尝试 AkshareFetcher 腾讯数据源
                     for fetcher in self._fetchers:
@@ -568,17 +670,30 @@ class DataFetcherManager:
         """
         获取筹码分布数据（带熔断和降级）
         
+        Args:
+            stock_code: 股票代码
+            
+        Returns:
+            ChipDistribution 对象（最新一天），失败则返回 None
+        """
+        history = self.get_chip_history(stock_code)
+        return history[-1] if history else None
+
+    def get_chip_history(self, stock_code: str) -> List:
+        """
+        获取逐日筹码分布（带熔断和降级）
+        
         策略：
         1. 检查配置开关
         2. 检查熔断器状态
-        3. 调用 AkshareFetcher.get_chip_distribution()
-        4. 失败则返回 None（降级兜底）
+        3. 调用 AkshareFetcher.get_chip_history()（一次返回近几个月的逐日数据）
+        4. 失败则返回空列表（降级兜底）
         
         Args:
             stock_code: 股票代码
             
         Returns:
-            ChipDistribution 对象，失败则返回 None
+            按日期升序的 ChipDistribution 列表
         """
         from .realtime_types import get_chip_circuit_breaker
         from src.config import get_config
@@ -588,45 +703,45 @@ class DataFetcherManager:
         chip_source = getattr(config, "chip_source", "akshare")
         if chip_source == "none":
             logger.debug(f"[筹码分布] 已配置为 none，跳过 {stock_code}")
-            return None
+            return []
         
-        # 如果筹码分布功能被禁用，直接返回 None
+        # 如果筹码分布功能被禁用，直接返回空
         if not config.enable_chip_distribution:
             logger.debug(f"[筹码分布] 功能已禁用，跳过 {stock_code}")
-            return None
+            return []
         
         # 检查熔断器状态
         circuit_breaker = get_chip_circuit_breaker()
         if not circuit_breaker.is_available("akshare_chip"):
             logger.warning(f"[熔断] 筹码接口处于熔断状态，跳过 {stock_code}")
-            return None
+            return []
         
         try:
             if chip_source == "akshare":
                 # 调用 AkshareFetcher 获取筹码分布
                 for fetcher in self._fetchers:
                     if fetcher.name == "AkshareFetcher":
-                        if hasattr(fetcher, 'get_chip_distribution'):
-                            chip = fetcher.get_chip_distribution(stock_code)
-                            if chip is not None:
+                        if hasattr(fetcher, 'get_chip_history'):
+                            history = fetcher.get_chip_history(stock_code)
+                            if history:
                                 circuit_breaker.record_success("akshare_chip")
-                                return chip
+                                return history
                         break
             elif chip_source == "tushare":
                 for fetcher in self._fetchers:
                     if fetcher.name == "TushareFetcher" and hasattr(fetcher, 'get_chip_distribution'):
                         chip = fetcher.get_chip_distribution(stock_code)
                         if chip is not None:
-                            return chip
+                            return [chip]
                         break
                 logger.warning("[筹码分布] Tushare 筹码接口未实现或无权限，返回空")
             
-            return None
+            return []
             
         except Exception as e:
             logger.error(f"[筹码分布] 获取 {stock_code} 失败: {e}")
             circuit_breaker.record_failure("akshare_chip", str(e))
-            return None
+            return []
 
     def get_stock_name(self, stock_code: str) -> Optional[str]:
         """
@@ -22,7 +22,6 @@ EfinanceFetcher - 优先数据源 (Priority 0)
 
 import logging
 import random
-import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -38,10 +37,10 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
 from .realtime_types import (
-    UnifiedRealtimeQuote, RealtimeSource,
-    get_realtime_circuit_breaker,
-    safe_float, safe_int  # 使用统一的类型转换函数
+    RealtimeSource, RealtimeSnapshotStore,
+    get_realtime_circuit_breaker, get_cache_registry,
 )
 
 
@@ -101,15 +100,31 @@ USER_AGENTS = [
 ]
 
 
-# 缓存实时行情数据（避免重复请求）
-# TTL 设为 10 分钟 (600秒)：批量分析场景下避免重复拉取
-_realtime_cache: Dict[str, Any] = {
-    'data': None,
-    'timestamp': 0,
-    'ttl': 600  # 10分钟缓存有效期
+# efinance 全量行情列名映射（UnifiedRealtimeQuote 字段 -> 候选列名，中文优先）
+_EF_SPOT_COLUMNS = {
+    'name': ('股票名称', 'name'),
+    'price': ('最新价', 'price'),
+    'change_pct': ('涨跌幅', 'pct_chg'),
+    'change_amount': ('涨跌额', 'change'),
+    'volume': ('成交量', 'volume'),
+    'amount': ('成交额', 'amount'),
+    'turnover_rate': ('换手率', 'turnover_rate'),
+    'amplitude': ('振幅', 'amplitude'),
+    'high': ('最高', 'high'),
+    'low': ('最低', 'low'),
+    'open_price': ('开盘', '今开', 'open'),
 }
 
 
+# 全量行情快照缓存（由缓存注册表统一创建，TTL 取自 REALTIME_CACHE_TTL，可按名称覆盖）
+# 快照入库时建立代码索引，后续每只股票查询为 O(1)
+def _get_realtime_cache() -> RealtimeSnapshotStore:
+    """efinance 实时行情快照（ef.stock.get_realtime_quotes）"""
+    return get_cache_registry().snapshot_store(
+        'efinance', RealtimeSource.EFINANCE, _EF_SPOT_COLUMNS, code_columns=('股票代码', 'code')
+    )
+
+
 def _is_etf_code(stock_code: str) -> bool:
     """
     判断代码是否为 ETF 基金
@@ -142,7 +157,7 @@ class EfinanceFetcher(BaseFetcher):
     - ef.stock.get_realtime_quotes(): 获取实时行情
     
     关键策略：
-    - 每次请求前随机休眠 1.5-3.0 秒
+    - 与 akshare 东财接口共享令牌桶限速
     - 随机 User-Agent 轮换
     - 失败后指数退避重试（最多3次）
     """
@@ -150,17 +165,12 @@ class EfinanceFetcher(BaseFetcher):
     name = "EfinanceFetcher"
     priority = 0  # 最高优先级，排在 AkshareFetcher 之前
     
-    def __init__(self, sleep_min: float = 1.5, sleep_max: float = 3.0):
+    def __init__(self):
         """
         初始化 EfinanceFetcher
         
-        Args:
-            sleep_min: 最小休眠时间（秒）
-            sleep_max: 最大休眠时间（秒）
+        efinance 与 akshare 的东财接口同属一个上游，共用 eastmoney 令牌桶。
         """
-        self.sleep_min = sleep_min
-        self.sleep_max = sleep_max
-        self._last_request_time: Optional[float] = None
     
     def _set_random_user_agent(self) -> None:
         """
@@ -179,22 +189,10 @@ class EfinanceFetcher(BaseFetcher):
         """
         强制执行速率限制
         
-        策略：
-        1. 检查距离上次请求的时间间隔
-        2. 如果间隔不足，补充休眠时间
-        3. 然后再执行随机 jitter 休眠
+        与 AkshareFetcher 共用 eastmoney 令牌桶：多线程、多数据源并发时
+        东财接口的总请求频率仍受控，且按先后顺序放行。
         """
-        if self._last_request_time is not None:
-            elapsed = time.time() - self._last_request_time
-            min_interval = self.sleep_min
-            if elapsed < min_interval:
-                additional_sleep = min_interval - elapsed
-                logger.debug(f"补充休眠 {additional_sleep:.2f} 秒")
-                time.sleep(additional_sleep)
-        
-        # 执行随机 jitter 休眠
-        self.random_sleep(self.sleep_min, self.sleep_max)
-        self._last_request_time = time.time()
+        get_rate_limiter('eastmoney').acquire()
     
     @retry(
         stop=stop_after_attempt(5),  # 增加到5次
@@ -417,7 +415,6 @@ class EfinanceFetcher(BaseFetcher):
         Returns:
             UnifiedRealtimeQuote 对象，获取失败返回 None
         """
-        import efinance as ef
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "efinance"
         
@@ -426,77 +423,20 @@ class EfinanceFetcher(BaseFetcher):
             logger.warning(f"[熔断] 数据源 {source_key} 处于熔断状态，跳过")
             return None
         
+        cache = _get_realtime_cache()
         try:
-            # 检查缓存
-            current_time = time.time()
-            if (_realtime_cache['data'] is not None and 
-                current_time - _realtime_cache['timestamp'] < _realtime_cache['ttl']):
-                df = _realtime_cache['data']
-                cache_age = int(current_time - _realtime_cache['timestamp'])
-                logger.debug(f"[缓存命中] 实时行情(efinance) - 缓存年龄 {cache_age}s/{_realtime_cache['ttl']}s")
+            # 检查缓存，过期则触发全量刷新
+            if cache.ensure_fresh(self._load_realtime_quotes):
+                logger.debug(f"[缓存命中] 实时行情(efinance) - 缓存年龄 {int(cache.age())}s/{cache.ttl}s")
             else:
-                # 触发全量刷新
-                logger.info(f"[缓存未命中] 触发全量刷新 实时行情(efinance)")
-                # 防封禁策略
-                self._set_random_user_agent()
-                self._enforce_rate_limit()
-                
-                logger.info(f"[API调用] ef.stock.get_realtime_quotes() 获取实时行情...")
-                import time as _time
-                api_start = _time.time()
-                
-                # efinance 的实时行情 API
-                df = ef.stock.get_realtime_quotes()
-                
-                api_elapsed = _time.time() - api_start
-                logger.info(f"[API返回] ef.stock.get_realtime_quotes 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
-                circuit_breaker.record_success(source_key)
-                
-                # 更新缓存
-                _realtime_cache['data'] = df
-                _realtime_cache['timestamp'] = current_time
-                logger.info(f"[缓存更新] 实时行情(efinance) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
-            
-            # 查找指定股票
-            # efinance 返回的列名可能是 '股票代码' 或 'code'
-            code_col = '股票代码' if '股票代码' in df.columns else 'code'
-            row = df[df[code_col] == stock_code]
-            if row.empty:
+                logger.info(f"[缓存更新] 实时行情(efinance) 缓存已刷新，索引 {len(cache)} 只，TTL={cache.ttl}s")
+            
+            # 查找指定股票（代码索引 O(1) 查询）
+            quote = cache.get(stock_code)
+            if quote is None:
                 logger.warning(f"[API返回] 未找到股票 {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            # 获取列名（可能是中文或英文）
-            name_col = '股票名称' if '股票名称' in df.columns else 'name'
-            price_col = '最新价' if '最新价' in df.columns else 'price'
-            pct_col = '涨跌幅' if '涨跌幅' in df.columns else 'pct_chg'
-            chg_col = '涨跌额' if '涨跌额' in df.columns else 'change'
-            vol_col = '成交量' if '成交量' in df.columns else 'volume'
-            amt_col = '成交额' if '成交额' in df.columns else 'amount'
-            turn_col = '换手率' if '换手率' in df.columns else 'turnover_rate'
-            amp_col = '振幅' if '振幅' in df.columns else 'amplitude'
-            high_col = '最高' if '最高' in df.columns else 'high'
-            low_col = '最低' if '最低' in df.columns else 'low'
-            open_col = '开盘' if '开盘' in df.columns else 'open'
-            
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get(name_col, '')),
-                source=RealtimeSource.EFINANCE,
-                price=safe_float(row.get(price_col)),
-                change_pct=safe_float(row.get(pct_col)),
-                change_amount=safe_float(row.get(chg_col)),
-                volume=safe_int(row.get(vol_col)),
-                amount=safe_float(row.get(amt_col)),
-                turnover_rate=safe_float(row.get(turn_col)),
-                amplitude=safe_float(row.get(amp_col)),
-                high=safe_float(row.get(high_col)),
-                low=safe_float(row.get(low_col)),
-                open_price=safe_float(row.get(open_col)),
-            )
-            
             logger.info(f"[实时行情-efinance] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"换手率={quote.turnover_rate}%")
             return quote
@@ -506,6 +446,27 @@ class EfinanceFetcher(BaseFetcher):
             circuit_breaker.record_failure(source_key, str(e))
             return None
     
+    def _load_realtime_quotes(self) -> pd.DataFrame:
+        """全量拉取 efinance 实时行情（异常向上抛出，由调用方记录熔断）"""
+        import efinance as ef
+        
+        logger.info(f"[缓存未命中] 触发全量刷新 实时行情(efinance)")
+        # 防封禁策略
+        self._set_random_user_agent()
+        self._enforce_rate_limit()
+        
+        logger.info(f"[API调用] ef.stock.get_realtime_quotes() 获取实时行情...")
+        import time as _time
+        api_start = _time.time()
+        
+        # efinance 的实时行情 API
+        df = ef.stock.get_realtime_quotes()
+        
+        api_elapsed = _time.time() - api_start
+        logger.info(f"[API返回] ef.stock.get_realtime_quotes 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
+        get_realtime_circuit_breaker().record_success("efinance")
+        return df
+    
     def get_base_info(self, stock_code: str) -> Optional[Dict[str, Any]]:
         """
         获取股票基本信息
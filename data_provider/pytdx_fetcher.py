@@ -9,15 +9,18 @@ PytdxFetcher - 通达信数据源 (Priority 2)
 优点：实时数据、稳定、无配额限制
 
 关键策略：
-1. 多服务器自动切换
-2. 连接超时自动重连
+1. 多服务器自动切换（按连接延迟排序）
+2. 长连接池复用，心跳保活，失败自动重连
 3. 失败后指数退避重试
 """
 
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Generator, List, Tuple
+from typing import Optional, Generator, List, Tuple, Dict
 
 import pandas as pd
 from tenacity import (
@@ -29,10 +32,259 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
+from .realtime_types import (
+    RealtimeSnapshotStore, RealtimeSource, UnifiedRealtimeQuote,
+    get_cache_registry, get_realtime_circuit_breaker,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# pytdx get_security_quotes 列名映射（UnifiedRealtimeQuote 字段 -> 候选列名）
+# change_pct / change_amount 由 price 与 last_close 计算后补充
+_TDX_QUOTE_COLUMNS = {
+    'name': ('name',),
+    'price': ('price',),
+    'change_pct': ('change_pct',),
+    'change_amount': ('change_amount',),
+    'volume': ('vol',),
+    'amount': ('amount',),
+    'open_price': ('open',),
+    'high': ('high',),
+    'low': ('low',),
+    'pre_close': ('last_close',),
+}
+
+
+def _get_quote_cache() -> RealtimeSnapshotStore:
+    """pytdx 批量行情快照（仅包含最近一次批量查询的股票）"""
+    return get_cache_registry().snapshot_store(
+        'pytdx', RealtimeSource.PYTDX, _TDX_QUOTE_COLUMNS, code_columns=('code',)
+    )
+
+
+class PytdxConnectionPool:
+    """
+    通达信长连接池（线程安全）
+    
+    - 连接按需创建，最多 size 个；借出期间由调用方独占
+    - 首次建连前并发探测各服务器耗时并排序，之后按实际连接耗时更新；近期失败的服务器排到最后
+    - 连接开启 pytdx 心跳；空闲较久的连接借出前先做一次轻量校验
+    - 使用中抛出异常的连接直接丢弃，下次借用时自动重连
+    """
+    
+    # 失败服务器的降级时长（秒）
+    HOST_FAILURE_COOLDOWN = 60.0
+    # 空闲超过该时长的连接借出前需校验（秒）
+    IDLE_CHECK_SECONDS = 30.0
+    
+    def __init__(
+        self,
+        api_class,
+        hosts: List[Tuple[str, int]],
+        size: int = 2,
+        connect_timeout: float = 5.0,
+        acquire_timeout: float = 30.0,
+    ):
+        self._api_class = api_class
+        self._hosts = list(hosts)
+        self._size = max(1, size)
+        self._connect_timeout = connect_timeout
+        self._acquire_timeout = acquire_timeout
+        
+        self._cond = threading.Condition()
+        self._idle: List[Tuple[object, Tuple[str, int], float]] = []  # (api, host, 归还时间)
+        self._created = 0
+        self._closed = False
+        
+        self._host_latency: Dict[Tuple[str, int], float] = {}
+        self._host_failed_at: Dict[Tuple[str, int], float] = {}
+        self._probe_lock = threading.Lock()
+        self._probed = False
+        self._connects = 0
+        self._reuses = 0
+    
+    @property
+    def size(self) -> int:
+        return self._size
+    
+    def _ranked_hosts(self) -> List[Tuple[str, int]]:
+        """按延迟排序：已知可用（延迟升序）> 未测试 > 近期失败"""
+        now = time.time()
+        
+        def rank(host):
+            failed_at = self._host_failed_at.get(host)
+            if failed_at is not None and now - failed_at < self.HOST_FAILURE_COOLDOWN:
+                return (2, failed_at)
+            latency = self._host_latency.get(host)
+            if latency is None:
+                return (1, 0.0)
+            return (0, latency)
+        
+        with self._cond:
+            return sorted(self._hosts, key=rank)
+    
+    def _record_host(self, host: Tuple[str, int], latency: Optional[float]) -> None:
+        with self._cond:
+            if latency is None:
+                self._host_failed_at[host] = time.time()
+                return
+            self._host_failed_at.pop(host, None)
+            previous = self._host_latency.get(host)
+            # 指数平滑，避免单次抖动影响排序
+            self._host_latency[host] = latency if previous is None else previous * 0.7 + latency * 0.3
+    
+    def _probe_host(self, host: Tuple[str, int]) -> None:
+        """测量单个服务器的连接耗时"""
+        api = self._api_class()
+        start = time.perf_counter()
+        try:
+            ok = api.connect(host[0], host[1], time_out=self._connect_timeout)
+        except Exception:
+            ok = False
+        self._record_host(host, time.perf_counter() - start if ok else None)
+        self._safe_disconnect(api)
+    
+    def rank_hosts(self) -> None:
+        """并发探测全部服务器的连接耗时，用于后续择优连接（首次建连时自动执行一次）"""
+        with self._probe_lock:
+            if self._probed:
+                return
+            with ThreadPoolExecutor(max_workers=len(self._hosts)) as executor:
+                list(executor.map(self._probe_host, self._hosts))
+            self._probed = True
+        ranked = ", ".join(f"{h}:{p}" for h, p in self._ranked_hosts()[:3])
+        logger.info(f"Pytdx 服务器延迟排序完成，优先: {ranked}")
+    
+    def _connect(self) -> Tuple[object, Tuple[str, int]]:
+        """依次尝试排序后的服务器，返回 (api, host)"""
+        if not self._probed:
+            self.rank_hosts()
+        for host in self._ranked_hosts():
+            api = self._api_class(heartbeat=True)
+            start = time.perf_counter()
+            try:
+                if api.connect(host[0], host[1], time_out=self._connect_timeout):
+                    latency = time.perf_counter() - start
+                    self._record_host(host, latency)
+                    with self._cond:
+                        self._connects += 1
+                    logger.debug(f"Pytdx 连接成功: {host[0]}:{host[1]} ({latency * 1000:.0f}ms)")
+                    return api, host
+            except Exception as e:
+                logger.debug(f"Pytdx 连接 {host[0]}:{host[1]} 失败: {e}")
+            self._record_host(host, None)
+            self._safe_disconnect(api)
+        raise DataFetchError("Pytdx 无法连接任何服务器")
+    
+    @staticmethod
+    def _safe_disconnect(api) -> None:
+        try:
+            api.disconnect()
+        except Exception as e:
+            logger.debug(f"Pytdx 断开连接时出错: {e}")
+    
+    @staticmethod
+    def _is_alive(api) -> bool:
+        """轻量校验连接是否可用"""
+        try:
+            return api.get_security_count(0) is not None
+        except Exception:
+            return False
+    
+    def _borrow(self) -> Tuple[object, Tuple[str, int]]:
+        deadline = time.time() + self._acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DataFetchError("Pytdx 连接池已关闭")
+                if self._idle:
+                    api, host, returned_at = self._idle.pop()
+                    break
+                if self._created < self._size:
+                    self._created += 1
+                    api = None
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise DataFetchError("Pytdx 连接池等待超时")
+                self._cond.wait(remaining)
+        
+        if api is not None:
+            if time.time() - returned_at < self.IDLE_CHECK_SECONDS or self._is_alive(api):
+                with self._cond:
+                    self._reuses += 1
+                return api, host
+            logger.debug(f"Pytdx 空闲连接已失效，重新连接: {host[0]}:{host[1]}")
+            self._safe_disconnect(api)
+        
+        try:
+            return self._connect()
+        except Exception:
+            self._release_slot()
+            raise
+    
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+    
+    @contextmanager
+    def connection(self) -> Generator:
+        """
+        借用一个连接
+        
+        正常退出时归还连接；发生异常且连接已失效时丢弃（下次自动重连）
+        """
+        api, host = self._borrow()
+        try:
+            yield api
+        except Exception:
+            if self._is_alive(api):
+                self._return(api, host)
+            else:
+                self._record_host(host, None)
+                self._safe_disconnect(api)
+                self._release_slot()
+            raise
+        else:
+            self._return(api, host)
+    
+    def _return(self, api, host: Tuple[str, int]) -> None:
+        with self._cond:
+            if not self._closed:
+                self._idle.append((api, host, time.time()))
+                self._cond.notify()
+                return
+        self._safe_disconnect(api)
+        self._release_slot()
+    
+    def close(self) -> None:
+        """断开所有空闲连接"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for api, _, _ in idle:
+            self._safe_disconnect(api)
+    
+    def get_stats(self) -> Dict[str, object]:
+        """连接池统计：连接数、新建/复用次数、服务器延迟"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'open': self._created,
+                'idle': len(self._idle),
+                'connects': self._connects,
+                'reuses': self._reuses,
+                'host_latency_ms': {
+                    f"{h}:{p}": round(v * 1000, 1) for (h, p), v in self._host_latency.items()
+                },
+            }
+
+
 class PytdxFetcher(BaseFetcher):
     """
     通达信数据源实现
@@ -67,17 +319,25 @@ class PytdxFetcher(BaseFetcher):
         ("180.153.39.51", 7709),   # 杭州
     ]
     
-    def __init__(self, hosts: Optional[List[Tuple[str, int]]] = None):
+    def __init__(
+        self,
+        hosts: Optional[List[Tuple[str, int]]] = None,
+        pool_size: Optional[int] = None,
+    ):
         """
         初始化 PytdxFetcher
         
         Args:
             hosts: 服务器列表 [(host, port), ...]，默认使用内置列表
+            pool_size: 连接池大小（默认读取配置 PYTDX_POOL_SIZE）
         """
         self._hosts = hosts or self.DEFAULT_HOSTS
-        self._api = None
-        self._connected = False
-        self._current_host_idx = 0
+        if pool_size is None:
+            from src.config import get_config
+            pool_size = getattr(get_config(), 'pytdx_pool_size', 2)
+        self._pool_size = pool_size
+        self._pool: Optional[PytdxConnectionPool] = None
+        self._pool_lock = threading.Lock()
         self._stock_list_cache = None  # 股票列表缓存
         self._stock_name_cache = {}    # 股票名称缓存 {code: name}
     
@@ -94,55 +354,42 @@ class PytdxFetcher(BaseFetcher):
             logger.warning("pytdx 未安装，请运行: pip install pytdx")
             return None
     
+    def _get_pool(self) -> PytdxConnectionPool:
+        """延迟创建连接池（首次使用时）"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    TdxHq_API = self._get_pytdx()
+                    if TdxHq_API is None:
+                        raise DataFetchError("pytdx 库未安装")
+                    self._pool = PytdxConnectionPool(TdxHq_API, self._hosts, size=self._pool_size)
+                    logger.info(f"Pytdx 连接池已创建，大小: {self._pool_size}")
+        return self._pool
+    
     @contextmanager
     def _pytdx_session(self) -> Generator:
         """
         Pytdx 连接上下文管理器
         
-        确保：
-        1. 进入上下文时自动连接
-        2. 退出上下文时自动断开
-        3. 异常时也能正确断开
+        从连接池借用长连接：
+        1. 进入上下文时借出（无可用连接时自动连接最优服务器）
+        2. 正常退出时归还，供后续调用复用
+        3. 异常时丢弃该连接，下次自动重连
+        
+        借出前先经过 pytdx 共享限速器（默认不限速，可通过
+        RATE_LIMIT_PER_MINUTE_OVERRIDES 配置）
         
         使用示例：
             with self._pytdx_session() as api:
                 # 在这里执行数据查询
         """
-        TdxHq_API = self._get_pytdx()
-        if TdxHq_API is None:
-            raise DataFetchError("pytdx 库未安装")
-        
-        api = TdxHq_API()
-        connected = False
-        
-        try:
-            # 尝试连接服务器（自动选择最优）
-            for i in range(len(self._hosts)):
-                host_idx = (self._current_host_idx + i) % len(self._hosts)
-                host, port = self._hosts[host_idx]
-                
-                try:
-                    if api.connect(host, port, time_out=5):
-                        connected = True
-                        self._current_host_idx = host_idx
-                        logger.debug(f"Pytdx 连接成功: {host}:{port}")
-                        break
-                except Exception as e:
-                    logger.debug(f"Pytdx 连接 {host}:{port} 失败: {e}")
-                    continue
-            
-            if not connected:
-                raise DataFetchError("Pytdx 无法连接任何服务器")
-            
+        get_rate_limiter('pytdx').acquire()
+        with self._get_pool().connection() as api:
             yield api
-            
-        finally:
-            # 确保断开连接
-            try:
-                api.disconnect()
-                logger.debug("Pytdx 连接已断开")
-            except Exception as e:
-                logger.warning(f"Pytdx 断开连接时出错: {e}")
+    
+    def get_pool_stats(self) -> Optional[Dict[str, object]]:
+        """连接池统计（未创建时返回 None）"""
+        return self._pool.get_stats() if self._pool is not None else None
     
     def _get_market_code(self, stock_code: str) -> Tuple[int, str]:
         """
@@ -311,39 +558,122 @@ class PytdxFetcher(BaseFetcher):
         
         return None
     
-    def get_realtime_quote(self, stock_code: str) -> Optional[dict]:
+    # get_security_quotes 单次请求的股票数量上限
+    QUOTES_BATCH_SIZE = 80
+    
+    def _fetch_quotes_frame(self, stock_codes: List[str]) -> pd.DataFrame:
+        """
+        批量查询实时行情（每次请求最多 QUOTES_BATCH_SIZE 只，共用一个连接）
+        
+        Returns:
+            行情 DataFrame（code 列为调用方传入的代码，含计算后的涨跌幅/涨跌额）
+        """
+        pairs = [self._get_market_code(c) for c in stock_codes]
+        code_map = {pair: c for pair, c in zip(pairs, stock_codes)}
+        
+        rows = []
+        with self._pytdx_session() as api:
+            for i in range(0, len(pairs), self.QUOTES_BATCH_SIZE):
+                batch = pairs[i:i + self.QUOTES_BATCH_SIZE]
+                data = api.get_security_quotes(batch)
+                if not data:
+                    raise DataFetchError(f"Pytdx 批量行情返回为空（{len(batch)} 只）")
+                rows.extend(data)
+        
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return df
+        
+        df['code'] = [
+            code_map.get((int(m), str(c)), str(c)) for m, c in zip(df['market'], df['code'])
+        ]
+        price = pd.to_numeric(df['price'], errors='coerce')
+        last_close = pd.to_numeric(df['last_close'], errors='coerce').where(lambda x: x > 0)
+        df['change_amount'] = (price - last_close).round(3)
+        df['change_pct'] = ((price - last_close) / last_close * 100).round(2)
+        if self._stock_list_cache:
+            df['name'] = [self._stock_list_cache.get(c, '') for c in df['code']]
+        return df
+    
+    def get_realtime_quotes(self, stock_codes: List[str]) -> Dict[str, UnifiedRealtimeQuote]:
+        """
+        批量获取实时行情
+        
+        每 80 只一个请求，几百只自选股只需少量往返；
+        结果写入 pytdx 行情快照，后续 get_realtime_quote 在 TTL 内直接命中
+        
+        Args:
+            stock_codes: 股票代码列表（仅 A 股 6 位代码会被查询）
+            
+        Returns:
+            {代码: UnifiedRealtimeQuote}，失败返回空字典
+        """
+        circuit_breaker = get_realtime_circuit_breaker()
+        source_key = "pytdx"
+        
+        if not circuit_breaker.is_available(source_key):
+            logger.warning(f"[熔断] 数据源 {source_key} 处于熔断状态，跳过")
+            return {}
+        
+        codes = [c for c in dict.fromkeys(stock_codes) if c.isdigit() and len(c) == 6]
+        if not codes:
+            return {}
+        
+        try:
+            df = self._fetch_quotes_frame(codes)
+        except Exception as e:
+            logger.warning(f"[实时行情-pytdx] 批量获取失败（{len(codes)} 只）: {e}")
+            circuit_breaker.record_failure(source_key, str(e))
+            return {}
+        
+        circuit_breaker.record_success(source_key)
+        cache = _get_quote_cache()
+        cache.ingest(df)
+        quotes = cache.get_many(codes)
+        batches = (len(codes) + self.QUOTES_BATCH_SIZE - 1) // self.QUOTES_BATCH_SIZE
+        logger.info(f"[实时行情-pytdx] 批量获取 {len(quotes)}/{len(codes)} 只（{batches} 次请求）")
+        return quotes
+    
+    def get_realtime_quote(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取实时行情
         
+        优先读取批量预取的快照，未命中时单独查询
+        
         Args:
             stock_code: 股票代码
             
         Returns:
-            实时行情数据字典，失败返回 None
+            UnifiedRealtimeQuote 对象，失败返回 None
         """
+        cache = _get_quote_cache()
+        if cache.is_fresh():
+            quote = cache.get(stock_code)
+            if quote is not None:
+                logger.debug(f"[缓存命中] 实时行情(pytdx) {stock_code} - 缓存年龄 {int(cache.age())}s/{cache.ttl}s")
+                return quote
+        
+        circuit_breaker = get_realtime_circuit_breaker()
+        source_key = "pytdx"
+        if not circuit_breaker.is_available(source_key):
+            logger.warning(f"[熔断] 数据源 {source_key} 处于熔断状态，跳过")
+            return None
+        
         try:
-            market, code = self._get_market_code(stock_code)
-            
-            with self._pytdx_session() as api:
-                data = api.get_security_quotes([(market, code)])
-                
-                if data and len(data) > 0:
-                    quote = data[0]
-                    return {
-                        'code': stock_code,
-                        'name': quote.get('name', ''),
-                        'price': quote.get('price', 0),
-                        'open': quote.get('open', 0),
-                        'high': quote.get('high', 0),
-                        'low': quote.get('low', 0),
-                        'pre_close': quote.get('last_close', 0),
-                        'volume': quote.get('vol', 0),
-                        'amount': quote.get('amount', 0),
-                        'bid_prices': [quote.get(f'bid{i}', 0) for i in range(1, 6)],
-                        'ask_prices': [quote.get(f'ask{i}', 0) for i in range(1, 6)],
-                    }
+            df = self._fetch_quotes_frame([stock_code])
+            # 单只查询不覆盖批量快照，使用临时快照完成字段转换
+            single = RealtimeSnapshotStore(
+                'pytdx_single', RealtimeSource.PYTDX, _TDX_QUOTE_COLUMNS, code_columns=('code',)
+            )
+            single.ingest(df)
+            quote = single.get(stock_code)
+            circuit_breaker.record_success(source_key)
+            if quote is not None:
+                logger.info(f"[实时行情-pytdx] {stock_code}: 价格={quote.price}, 涨跌={quote.change_pct}%")
+            return quote
         except Exception as e:
             logger.warning(f"Pytdx 获取实时行情失败 {stock_code}: {e}")
+            circuit_breaker.record_failure(source_key, str(e))
         
         return None
 
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+数据源流控 - 按上游端点共享的令牌桶限速器
+===================================
+
+设计目标：
+1. 同一上游（如东方财富）的所有请求共享一个令牌桶，与 Fetcher 实例、线程数无关
+2. 线程安全：预约制令牌桶，在锁内只计算应等待的时长，休眠在锁外进行
+3. 公平：按进入顺序分配放行时间（先到先得），不会出现后来者插队
+4. 可选跨进程：后端为 sqlite 时，多个进程（如定时任务 + WebUI）共享同一限速状态
+5. 统计等待次数、累计/最大等待时间，评估 MAX_WORKERS 是否超出上游承受能力
+
+算法说明：
+- 令牌以 rate 个/秒的速度补充，最多积累 capacity 个
+- 每次 acquire 预先扣除令牌（允许为负，负值即排队中的请求），
+  等待时长 = 欠下的令牌数 / rate
+- jitter > 0 时，每次请求额外扣除 [0, jitter] 秒对应的令牌，
+  使请求间隔保持随机（防封禁），且不破坏最小间隔和先后顺序
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _SqliteBucketBackend:
+    """
+    跨进程令牌桶状态（SQLite）
+
+    每次预约在 BEGIN IMMEDIATE 事务中完成，SQLite 的写锁保证多进程互斥。
+    时间使用 time.time()（墙上时间），以便不同进程之间可比较。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_bucket ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def reserve(self, name: str, rate: float, capacity: float, cost: float) -> float:
+        """扣除 cost 个令牌，返回需要等待的秒数"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_bucket WHERE name = ?", (name,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+            tokens -= cost
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                (name, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return max(0.0, -tokens / rate)
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    用法：
+        bucket = TokenBucket('eastmoney', rate=0.5, capacity=1, jitter=3.0)
+        bucket.acquire()   # 阻塞直到轮到本次请求
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: float = 1.0,
+        jitter: float = 0.0,
+        backend: Optional[_SqliteBucketBackend] = None,
+    ):
+        """
+        Args:
+            name: 上游名称（同时作为跨进程状态的键）
+            rate: 每秒补充的令牌数；<= 0 表示不限速（仅统计调用次数）
+            capacity: 桶容量，即允许的最大突发请求数
+            jitter: 每次请求额外的随机间隔上限（秒）
+            backend: 跨进程后端；None 表示仅进程内共享
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.jitter = max(0.0, float(jitter))
+        self._backend = backend
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+        # 统计
+        self._acquires = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._waiting = 0
+        self._max_waiting = 0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _cost(self) -> float:
+        cost = 1.0
+        if self.jitter:
+            cost += random.uniform(0, self.jitter) * self.rate
+        return cost
+
+    def _reserve(self) -> float:
+        """预约一次放行，返回需要等待的秒数（调用方需持有 self._lock）"""
+        cost = self._cost()
+        if self._backend is not None:
+            return self._backend.reserve(self.name, self.rate, self.capacity, cost)
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= cost
+        return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> float:
+        """
+        获取一次请求许可（阻塞）
+
+        Returns:
+            实际等待的秒数
+        """
+        if self.unlimited:
+            with self._lock:
+                self._acquires += 1
+            return 0.0
+
+        with self._lock:
+            try:
+                wait = self._reserve()
+            except Exception as e:
+                # 跨进程后端异常时退化为进程内限速，避免阻断数据获取
+                logger.warning(f"[限速] {self.name} 跨进程状态读写失败，改用进程内限速: {e}")
+                self._backend = None
+                wait = self._reserve()
+            self._acquires += 1
+            if wait > 0:
+                self._waits += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._waiting += 1
+                self._max_waiting = max(self._max_waiting, self._waiting)
+
+        if wait > 0:
+            logger.debug(f"[限速] {self.name} 等待 {wait:.2f} 秒")
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'rate_per_minute': round(self.rate * 60, 2),
+                'capacity': self.capacity,
+                'jitter': self.jitter,
+                'shared': self._backend is not None,
+                'acquires': self._acquires,
+                'waits': self._waits,
+                'total_wait': round(self._total_wait, 2),
+                'max_wait': round(self._max_wait, 2),
+                'avg_wait': round(self._total_wait / self._waits, 2) if self._waits else 0.0,
+                'waiting': self._waiting,
+                'max_waiting': self._max_waiting,
+            }
+
+
+class RateLimiterRegistry:
+    """
+    限速器注册表
+
+    按上游名称创建并共享 TokenBucket，所有 Fetcher 通过 get_rate_limiter(name) 获取。
+    默认限速（次/分钟）可通过 RATE_LIMIT_PER_MINUTE_OVERRIDES 按名称覆盖，0 表示不限速。
+    """
+
+    def __init__(
+        self,
+        defaults: Optional[Dict[str, Dict[str, float]]] = None,
+        per_minute_overrides: Optional[Dict[str, int]] = None,
+        backend: Optional[_SqliteBucketBackend] = None,
+    ):
+        """
+        Args:
+            defaults: 各上游的默认参数，如 {'tushare': {'per_minute': 80}}
+            per_minute_overrides: 按名称覆盖每分钟请求数
+            backend: 跨进程后端（None 表示仅进程内共享）
+        """
+        self.defaults = dict(defaults or {})
+        self.per_minute_overrides = dict(per_minute_overrides or {})
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'RateLimiterRegistry':
+        """根据 Config 创建注册表"""
+        sleep_min = float(getattr(config, 'akshare_sleep_min', 2.0))
+        sleep_max = float(getattr(config, 'akshare_sleep_max', 5.0))
+        scraped = {
+            'per_minute': 60.0 / sleep_min if sleep_min > 0 else 0,
+            'jitter': max(0.0, sleep_max - sleep_min),
+        }
+        defaults = {
+            # 网页接口（东财/新浪/腾讯）：沿用 AKSHARE_SLEEP_MIN/MAX 的间隔与随机抖动
+            'eastmoney': dict(scraped),
+            'sina': dict(scraped),
+            'tencent': dict(scraped),
+            # Tushare：按积分配额限速，不加抖动
+            'tushare': {'per_minute': float(getattr(config, 'tushare_rate_limit_per_minute', 80))},
+        }
+
+        backend = None
+        if getattr(config, 'rate_limit_backend', 'memory') == 'sqlite':
+            try:
+                backend = _SqliteBucketBackend(getattr(config, 'rate_limit_db_path', './data/rate_limit.db'))
+            except Exception as e:
+                logger.warning(f"[限速] 初始化跨进程限速状态失败，改用进程内限速: {e}")
+
+        return cls(
+            defaults=defaults,
+            per_minute_overrides=getattr(config, 'rate_limit_per_minute_overrides', None),
+            backend=backend,
+        )
+
+    def limiter(self, name: str) -> TokenBucket:
+        """获取或创建指定上游的限速器（未配置的上游默认不限速）"""
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                params = self.defaults.get(name, {})
+                per_minute = float(self.per_minute_overrides.get(name, params.get('per_minute', 0)))
+                bucket = TokenBucket(
+                    name,
+                    rate=per_minute / 60.0,
+                    capacity=params.get('capacity', 1.0),
+                    jitter=params.get('jitter', 0.0) if per_minute > 0 else 0.0,
+                    backend=self.backend,
+                )
+                self._buckets[name] = bucket
+                logger.debug(f"[限速注册] {name} {per_minute:.1f} 次/分钟, 抖动 {bucket.jitter}s")
+            return bucket
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """汇总所有限速器的统计信息"""
+        return {name: bucket.get_stats() for name, bucket in list(self._buckets.items())}
+
+    def log_stats(self) -> None:
+        """将统计信息输出到日志"""
+        for name, stats in self.get_stats().items():
+            if not stats['acquires']:
+                continue
+            logger.info(
+                f"[限速统计] {name}: 请求 {stats['acquires']} 次, 等待 {stats['waits']} 次, "
+                f"累计 {stats['total_wait']}s, 平均 {stats['avg_wait']}s, 最长 {stats['max_wait']}s, "
+                f"最多同时排队 {stats['max_waiting']}"
+            )
+
+
+_registry: Optional[RateLimiterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter_registry() -> RateLimiterRegistry:
+    """获取全局限速器注册表（首次调用时根据 Config 创建）"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                try:
+                    from src.config import get_config
+                    _registry = RateLimiterRegistry.from_config(get_config())
+                except Exception as e:
+                    logger.warning(f"[限速注册] 读取配置失败，使用默认限速: {e}")
+                    _registry = RateLimiterRegistry.from_config(None)
+    return _registry
+
+
+def set_rate_limiter_registry(registry: RateLimiterRegistry) -> None:
+    """替换全局注册表（用于测试或运行时重新加载配置）"""
+    global _registry
+    with _registry_lock:
+        _registry = registry
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """获取指定上游的共享限速器"""
+    return get_rate_limiter_registry().limiter(name)
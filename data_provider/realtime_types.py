@@ -8,16 +8,20 @@
 1. 统一各数据源的实时行情返回结构
 2. 实现熔断/冷却机制，避免连续失败时反复请求
 3. 支持多数据源故障切换
+4. 全量行情快照一次入库、按代码 O(1) 查询
 
 使用方式：
 - 所有 Fetcher 的 get_realtime_quote() 统一返回 UnifiedRealtimeQuote
 - CircuitBreaker 管理各数据源的熔断状态
+- RealtimeSnapshotStore 管理全量接口（东财/efinance）的快照缓存
 """
 
 import logging
+import math
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Tuple, List, Callable
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -98,6 +102,7 @@ class RealtimeSource(Enum):
     AKSHARE_QQ = "akshare_qq"       # 腾讯财经
     TENCENT = "tencent"             # 腾讯直连
     SINA = "sina"                   # 新浪直连
+    PYTDX = "pytdx"                 # 通达信（pytdx 批量行情）
     FALLBACK = "fallback"           # 降级兜底
 
 
@@ -209,6 +214,8 @@ class ChipDistribution:
             'cost_90_low': self.cost_90_low,
             'cost_90_high': self.cost_90_high,
             'concentration_90': self.concentration_90,
+            'cost_70_low': self.cost_70_low,
+            'cost_70_high': self.cost_70_high,
             'concentration_70': self.concentration_70,
         }
     
@@ -261,6 +268,320 @@ class ChipDistribution:
         return "，".join(status_parts)
 
 
+class _SnapshotRefresh:
+    """一次进行中的快照刷新，等待方通过 wait() 获取同一结果"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self._done.set()
+
+    def wait(self) -> None:
+        """阻塞直到刷新结束；刷新失败时抛出同一异常"""
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class RealtimeSnapshotStore:
+    """
+    全市场实时行情快照存储
+    
+    设计说明：
+    - 东财/efinance 全量接口一次返回 5000+ 行，旧实现每查一只股票都要
+      对整张表做 df[df['代码'] == code] 布尔扫描，并逐字段 safe_float
+    - 本类在快照入库时一次性完成列名映射和数值向量化转换，
+      以「列数组 + 代码→行号索引」形式保存，查询为 O(1) 字典查找
+    - 原始 DataFrame 一并保留（data 属性），供需要全市场统计的模块复用
+    
+    使用方式：
+        store = RealtimeSnapshotStore('akshare_em', RealtimeSource.AKSHARE_EM,
+                                      column_map={'price': ('最新价',), ...})
+        if not store.is_fresh():
+            store.ingest(ak.stock_zh_a_spot_em())
+        quote = store.get('600519')
+    
+    并发刷新（ensure_fresh）：
+    - 单飞（single-flight）：快照过期时只有一个线程调用 loader，其余线程等待同一次刷新的结果
+      （刷新失败时等待方收到同一个异常，不会轮流重试）
+    - 可选 stale-while-revalidate：过期不超过 max_stale 秒且旧快照非空时，
+      读取方直接使用旧快照，由后台线程刷新
+    """
+    
+    # 需要转换为整数的字段，其余数值字段按浮点处理
+    INT_FIELDS = frozenset({'volume'})
+    
+    def __init__(
+        self,
+        name: str,
+        source: RealtimeSource,
+        column_map: Dict[str, Tuple[str, ...]],
+        code_columns: Tuple[str, ...] = ('代码',),
+        ttl: float = 600.0,
+        stale_while_revalidate: bool = False,
+        max_stale: float = 600.0,
+    ):
+        """
+        Args:
+            name: 快照名称（用于日志）
+            source: 构建 UnifiedRealtimeQuote 时标记的数据来源
+            column_map: {UnifiedRealtimeQuote 字段名: 候选列名元组}，按顺序取第一个存在的列
+            code_columns: 代码列候选列名
+            ttl: 缓存有效期（秒）
+            stale_while_revalidate: 过期后是否先返回旧快照并在后台刷新
+            max_stale: 允许使用旧快照的最长过期时间（秒，超过 TTL 的部分）
+        """
+        self.name = name
+        self.source = source
+        self.column_map = column_map
+        self.code_columns = code_columns
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max(0.0, max_stale)
+        
+        self._lock = threading.Lock()
+        # 进行中的刷新（单飞），None 表示当前无刷新
+        self._refresh: Optional[_SnapshotRefresh] = None
+        # 后台刷新失败后的退避截止时间，避免每次读取都重新触发
+        self._retry_after: float = 0.0
+        # 快照状态整体替换，读取方拿到的总是同一版本的 (data, index, columns)
+        self._data = None
+        self._index: Dict[str, int] = {}
+        self._columns: Dict[str, List[Any]] = {}
+        self._timestamp: float = 0.0
+        
+        # 命中统计：用于评估 TTL 是否真正节省了请求
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.coalesced = 0      # 等待他人刷新结果的次数
+        self.stale_hits = 0     # 过期后直接使用旧快照的次数
+        self.refresh_failures = 0
+    
+    @staticmethod
+    def _pick_column(columns, candidates: Tuple[str, ...]) -> Optional[str]:
+        """按顺序返回第一个存在的列名"""
+        for col in candidates:
+            if col in columns:
+                return col
+        return None
+    
+    def ingest(self, df) -> int:
+        """
+        入库一份全量快照（替换旧快照）
+        
+        空 DataFrame / None 也会被记录（None 存为空 DataFrame，并刷新时间戳），
+        避免同一轮任务对失败接口反复请求。
+        
+        Args:
+            df: 全量行情 DataFrame
+            
+        Returns:
+            建立索引的股票数量
+        """
+        import pandas as pd
+        
+        index: Dict[str, int] = {}
+        columns: Dict[str, List[Any]] = {}
+        
+        if df is not None and not df.empty:
+            code_col = self._pick_column(df.columns, self.code_columns)
+            if code_col is None:
+                logger.warning(f"[快照] {self.name} 缺少代码列 {self.code_columns}，无法建立索引")
+            else:
+                codes = df[code_col].astype(str).str.strip().tolist()
+                for field_name, candidates in self.column_map.items():
+                    col = self._pick_column(df.columns, candidates)
+                    if col is None:
+                        continue
+                    if field_name == 'name':
+                        columns[field_name] = ['' if v is None else str(v) for v in df[col].tolist()]
+                        continue
+                    # 向量化转换：'-' / '' 等非法值统一变为 NaN，再转为 None
+                    values = pd.to_numeric(df[col], errors='coerce').tolist()
+                    if field_name in self.INT_FIELDS:
+                        columns[field_name] = [None if math.isnan(v) else int(v) for v in values]
+                    else:
+                        columns[field_name] = [None if math.isnan(v) else float(v) for v in values]
+                # 代码重复时保留首行，与旧实现 row.iloc[0] 行为一致
+                for row_idx, code in enumerate(codes):
+                    index.setdefault(code, row_idx)
+        
+        with self._lock:
+            # None 按空快照记录，is_fresh() 才会在 TTL 内拦住后续请求
+            self._data = df if df is not None else pd.DataFrame()
+            self._index = index
+            self._columns = columns
+            self._timestamp = time.time()
+            self.refreshes += 1
+        
+        logger.debug(f"[快照] {self.name} 已入库 {len(index)} 只股票")
+        return len(index)
+    
+    def ensure_fresh(self, loader: Callable[[], Any]) -> bool:
+        """
+        保证快照在 TTL 内，过期时调用 loader 拉取全量数据并入库
+        
+        同一时刻只有一个线程调用 loader，其他线程等待并复用其结果；
+        loader 抛出的异常会原样向上传递（等待方收到同一异常），由调用方记录熔断失败。
+        
+        Args:
+            loader: 无参函数，返回全量行情 DataFrame
+            
+        Returns:
+            True 表示使用了已有快照（含等待他人刷新、stale-while-revalidate），
+            False 表示本线程触发了刷新
+        """
+        with self._lock:
+            if self.is_fresh():
+                self.hits += 1
+                return True
+            
+            if self._can_serve_stale():
+                self.stale_hits += 1
+                if self._refresh is None and time.time() >= self._retry_after:
+                    self._refresh = _SnapshotRefresh()
+                    threading.Thread(
+                        target=self._background_refresh,
+                        args=(loader, self._refresh),
+                        name=f"snapshot-refresh-{self.name}",
+                        daemon=True,
+                    ).start()
+                return True
+            
+            refresh = self._refresh
+            leader = refresh is None
+            if leader:
+                refresh = self._refresh = _SnapshotRefresh()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            logger.debug(f"[快照] {self.name} 正在刷新，等待结果")
+            refresh.wait()
+            return True
+        
+        self._run_refresh(loader, refresh)
+        return False
+    
+    def _can_serve_stale(self) -> bool:
+        """旧快照是否可在后台刷新期间继续使用（调用方需持有 self._lock）"""
+        return (
+            self.stale_while_revalidate
+            and bool(self._index)
+            and self.age() < self.ttl + self.max_stale
+        )
+    
+    def _run_refresh(self, loader: Callable[[], Any], refresh: '_SnapshotRefresh') -> None:
+        """执行一次刷新并唤醒等待方（异常原样抛出）"""
+        try:
+            self.ingest(loader())
+        except BaseException as e:
+            with self._lock:
+                self.refresh_failures += 1
+                self._retry_after = time.time() + min(60.0, self.ttl / 2)
+            refresh.finish(e)
+            raise
+        else:
+            refresh.finish()
+        finally:
+            with self._lock:
+                if self._refresh is refresh:
+                    self._refresh = None
+    
+    def _background_refresh(self, loader: Callable[[], Any], refresh: '_SnapshotRefresh') -> None:
+        try:
+            self._run_refresh(loader, refresh)
+            logger.info(f"[快照] {self.name} 后台刷新完成，索引 {len(self)} 只")
+        except Exception as e:
+            logger.warning(f"[快照] {self.name} 后台刷新失败，继续使用旧快照: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（hit_rate：未触发同步下载的读取占比）"""
+        total = self.hits + self.misses + self.coalesced + self.stale_hits
+        return {
+            'ttl': self.ttl,
+            'size': len(self._index),
+            'age': round(self.age(), 1) if self.has_snapshot() else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'coalesced': self.coalesced,
+            'stale_hits': self.stale_hits,
+            'refresh_failures': self.refresh_failures,
+            'hit_rate': round((total - self.misses) / total, 3) if total else None,
+        }
+    
+    def get(self, code: str) -> Optional[UnifiedRealtimeQuote]:
+        """
+        按代码查询实时行情（O(1)）
+        
+        Returns:
+            UnifiedRealtimeQuote，快照中不存在该代码时返回 None
+        """
+        with self._lock:
+            row_idx = self._index.get(code)
+            if row_idx is None:
+                return None
+            values = {field_name: col[row_idx] for field_name, col in self._columns.items()}
+        
+        name = values.pop('name', '') or ''
+        return UnifiedRealtimeQuote(code=code, name=name, source=self.source, **values)
+    
+    def get_many(self, codes: List[str]) -> Dict[str, UnifiedRealtimeQuote]:
+        """批量查询，返回 {代码: 行情}（快照中不存在的代码被忽略）"""
+        result = {}
+        for code in codes:
+            quote = self.get(code)
+            if quote is not None:
+                result[code] = quote
+        return result
+    
+    @property
+    def data(self):
+        """原始快照 DataFrame（未入库时为 None）"""
+        return self._data
+    
+    @property
+    def timestamp(self) -> float:
+        """最近一次入库时间"""
+        return self._timestamp
+    
+    def age(self) -> float:
+        """快照年龄（秒）"""
+        return time.time() - self._timestamp
+    
+    def has_snapshot(self) -> bool:
+        """是否已入库过快照（含空快照）"""
+        return self._data is not None
+    
+    def is_fresh(self) -> bool:
+        """快照是否存在且在 TTL 内"""
+        return self._data is not None and self.age() < self.ttl
+    
+    def is_empty(self) -> bool:
+        """当前快照是否没有可查询的数据"""
+        return not self._index
+    
+    def clear(self) -> None:
+        """清空快照"""
+        with self._lock:
+            self._data = None
+            self._index = {}
+            self._columns = {}
+            self._timestamp = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, code: str) -> bool:
+        return code in self._index
+
+
 class CircuitBreaker:
     """
     熔断器 - 管理数据源的熔断/冷却状态
@@ -294,6 +615,8 @@ class CircuitBreaker:
         
         # 各数据源状态 {source_name: {state, failures, last_failure_time, half_open_calls}}
         self._states: Dict[str, Dict[str, Any]] = {}
+        # 各数据源累计熔断次数 {source_name: trips}
+        self._trips: Dict[str, int] = {}
     
     def _get_state(self, source: str) -> Dict[str, Any]:
         """获取或初始化数据源状态"""
@@ -366,9 +689,12 @@ class CircuitBreaker:
             # 半开状态下失败，继续熔断
             state['state'] = self.OPEN
             state['half_open_calls'] = 0
+            self._trips[source] = self._trips.get(source, 0) + 1
             logger.warning(f"[熔断器] {source} 半开状态请求失败，继续熔断 {self.cooldown_seconds}s")
         elif state['failures'] >= self.failure_threshold:
             # 达到阈值，进入熔断
+            if state['state'] != self.OPEN:
+                self._trips[source] = self._trips.get(source, 0) + 1
             state['state'] = self.OPEN
             logger.warning(f"[熔断器] {source} 连续失败 {state['failures']} 次，进入熔断状态 "
                           f"(冷却 {self.cooldown_seconds}s)")
@@ -379,6 +705,15 @@ class CircuitBreaker:
         """获取所有数据源状态"""
         return {source: info['state'] for source, info in self._states.items()}
     
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断统计信息（当前状态 + 累计熔断次数）"""
+        return {
+            'failure_threshold': self.failure_threshold,
+            'cooldown_seconds': self.cooldown_seconds,
+            'states': self.get_status(),
+            'trips': dict(self._trips),
+        }
+    
     def reset(self, source: Optional[str] = None) -> None:
         """重置熔断器状态"""
         if source:
@@ -388,26 +723,173 @@ class CircuitBreaker:
             self._states.clear()
 
 
-# 全局熔断器实例（实时行情专用）
-_realtime_circuit_breaker = CircuitBreaker(
-    failure_threshold=3,      # 连续失败3次熔断
-    cooldown_seconds=300.0,   # 冷却5分钟
-    half_open_max_calls=1
-)
+class RealtimeCacheRegistry:
+    """
+    实时行情缓存 / 熔断器注册表
+    
+    职责：
+    1. 根据 Config（REALTIME_CACHE_TTL / CIRCUIT_BREAKER_COOLDOWN 及其按名称覆盖项）
+       统一创建所有全量快照缓存和熔断器，避免各模块硬编码 TTL/冷却时间
+    2. 按名称暴露实例，供各 Fetcher 及其他模块共享
+    3. 汇总命中/未命中/熔断次数，便于评估 TTL 是否真正节省了请求
+    
+    同名实例只创建一次；重复注册返回已有实例。
+    """
+    
+    def __init__(
+        self,
+        default_ttl: float = 600.0,
+        default_cooldown: float = 300.0,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        cooldown_overrides: Optional[Dict[str, float]] = None,
+        stale_while_revalidate: bool = False,
+        max_stale: float = 600.0,
+    ):
+        """
+        Args:
+            default_ttl: 快照缓存默认 TTL（秒）
+            default_cooldown: 熔断器默认冷却时间（秒）
+            ttl_overrides: 按缓存名称覆盖 TTL，如 {'akshare_em': 1200}
+            cooldown_overrides: 按熔断器名称覆盖冷却时间，如 {'chip': 900}
+            stale_while_revalidate: 快照过期后先返回旧快照，后台刷新
+            max_stale: 允许使用旧快照的最长过期时间（秒）
+        """
+        self.default_ttl = default_ttl
+        self.default_cooldown = default_cooldown
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.cooldown_overrides = dict(cooldown_overrides or {})
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+        
+        self._lock = threading.Lock()
+        self._stores: Dict[str, RealtimeSnapshotStore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    @classmethod
+    def from_config(cls, config) -> 'RealtimeCacheRegistry':
+        """根据 Config 创建注册表"""
+        return cls(
+            default_ttl=float(getattr(config, 'realtime_cache_ttl', 600)),
+            default_cooldown=float(getattr(config, 'circuit_breaker_cooldown', 300)),
+            ttl_overrides=getattr(config, 'realtime_cache_ttl_overrides', None),
+            cooldown_overrides=getattr(config, 'circuit_breaker_cooldown_overrides', None),
+            stale_while_revalidate=bool(getattr(config, 'realtime_cache_stale_while_revalidate', False)),
+            max_stale=float(getattr(config, 'realtime_cache_max_stale', 600)),
+        )
+    
+    def snapshot_store(
+        self,
+        name: str,
+        source: RealtimeSource,
+        column_map: Dict[str, Tuple[str, ...]],
+        code_columns: Tuple[str, ...] = ('代码',),
+    ) -> RealtimeSnapshotStore:
+        """获取或创建全量快照缓存（TTL 由配置决定）"""
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                ttl = float(self.ttl_overrides.get(name, self.default_ttl))
+                store = RealtimeSnapshotStore(
+                    name, source, column_map, code_columns=code_columns, ttl=ttl,
+                    stale_while_revalidate=self.stale_while_revalidate, max_stale=self.max_stale,
+                )
+                self._stores[name] = store
+                logger.debug(f"[缓存注册] {name} TTL={ttl}s, stale-while-revalidate={self.stale_while_revalidate}")
+            return store
+    
+    def circuit_breaker(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown_factor: float = 1.0,
+        half_open_max_calls: int = 1,
+    ) -> CircuitBreaker:
+        """
+        获取或创建熔断器
+        
+        Args:
+            name: 熔断器名称
+            failure_threshold: 连续失败次数阈值
+            cooldown_factor: 未单独覆盖时，冷却时间 = CIRCUIT_BREAKER_COOLDOWN × factor
+            half_open_max_calls: 半开状态最大尝试次数
+        """
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                cooldown = float(self.cooldown_overrides.get(name, self.default_cooldown * cooldown_factor))
+                breaker = CircuitBreaker(
+                    failure_threshold=failure_threshold,
+                    cooldown_seconds=cooldown,
+                    half_open_max_calls=half_open_max_calls,
+                )
+                self._breakers[name] = breaker
+                logger.debug(f"[熔断注册] {name} 阈值={failure_threshold} 冷却={cooldown}s")
+            return breaker
+    
+    def get_store(self, name: str) -> Optional[RealtimeSnapshotStore]:
+        """按名称获取已注册的快照缓存"""
+        return self._stores.get(name)
+    
+    def get_breaker(self, name: str) -> Optional[CircuitBreaker]:
+        """按名称获取已注册的熔断器"""
+        return self._breakers.get(name)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """汇总所有缓存与熔断器的统计信息"""
+        return {
+            'caches': {name: store.get_stats() for name, store in self._stores.items()},
+            'breakers': {name: breaker.get_stats() for name, breaker in self._breakers.items()},
+        }
+    
+    def log_stats(self) -> None:
+        """将统计信息输出到日志"""
+        for name, stats in self.get_stats()['caches'].items():
+            logger.info(f"[缓存统计] {name}: 命中 {stats['hits']} / 未命中 {stats['misses']}, "
+                        f"等待刷新 {stats['coalesced']}, 旧快照 {stats['stale_hits']}, "
+                        f"刷新 {stats['refreshes']} 次（失败 {stats['refresh_failures']}）, TTL={stats['ttl']}s")
+        for name, stats in self.get_stats()['breakers'].items():
+            trips = sum(stats['trips'].values())
+            if trips:
+                logger.info(f"[熔断统计] {name}: 累计熔断 {trips} 次 {stats['trips']}")
+
+
+_registry: Optional[RealtimeCacheRegistry] = None
+_registry_lock = threading.Lock()
+
 
-# 筹码接口熔断器（更保守的策略，因为该接口更不稳定）
-_chip_circuit_breaker = CircuitBreaker(
-    failure_threshold=2,      # 连续失败2次熔断
-    cooldown_seconds=600.0,   # 冷却10分钟
-    half_open_max_calls=1
-)
+def get_cache_registry() -> RealtimeCacheRegistry:
+    """
+    获取全局缓存/熔断器注册表（首次调用时根据 Config 创建）
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                try:
+                    from src.config import get_config
+                    _registry = RealtimeCacheRegistry.from_config(get_config())
+                except Exception as e:
+                    logger.warning(f"[缓存注册] 读取配置失败，使用默认 TTL/冷却时间: {e}")
+                    _registry = RealtimeCacheRegistry()
+    return _registry
+
+
+def set_cache_registry(registry: RealtimeCacheRegistry) -> None:
+    """替换全局注册表（用于测试或运行时重新加载配置）"""
+    global _registry
+    with _registry_lock:
+        _registry = registry
 
 
 def get_realtime_circuit_breaker() -> CircuitBreaker:
-    """获取实时行情熔断器"""
-    return _realtime_circuit_breaker
+    """获取实时行情熔断器（连续失败3次熔断，冷却 CIRCUIT_BREAKER_COOLDOWN）"""
+    return get_cache_registry().circuit_breaker('realtime', failure_threshold=3)
 
 
 def get_chip_circuit_breaker() -> CircuitBreaker:
-    """获取筹码接口熔断器"""
-    return _chip_circuit_breaker
+    """
+    获取筹码接口熔断器
+    
+    更保守的策略（该接口更不稳定）：连续失败2次熔断，冷却时间为默认值的 2 倍
+    """
+    return get_cache_registry().circuit_breaker('chip', failure_threshold=2, cooldown_factor=2.0)
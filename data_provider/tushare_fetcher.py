@@ -15,9 +15,8 @@ TushareFetcher - 备用数据源 1 (Priority 2)
 """
 
 import logging
-import time
 from datetime import datetime, date
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import pandas as pd
 from tenacity import (
@@ -28,6 +27,7 @@ from tenacity import (
     before_sleep_log,
 )
 
+from .rate_limiter import get_rate_limiter
 from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
 from src.config import get_config
 
@@ -54,18 +54,16 @@ class TushareFetcher(BaseFetcher):
     name = "TushareFetcher"
     priority = 2  # 默认优先级，会在 __init__ 中根据配置动态调整
 
-    def __init__(self, rate_limit_per_minute: int = 80):
+    def __init__(self):
         """
         初始化 TushareFetcher
 
-        Args:
-            rate_limit_per_minute: 每分钟最大请求数（默认80，Tushare免费配额）
+        每分钟请求数由 TUSHARE_RATE_LIMIT_PER_MINUTE 配置（默认80，Tushare免费配额），
+        通过共享令牌桶在所有线程间统一控制。
         """
-        self.rate_limit_per_minute = rate_limit_per_minute
-        self._call_count = 0  # 当前分钟内的调用次数
-        self._minute_start: Optional[float] = None  # 当前计数周期开始时间
         self._api: Optional[object] = None  # Tushare API 实例
         self._trade_cal_cache: Optional[dict] = None
+        self._trade_dates_cache: Optional[dict] = None
 
         # 尝试初始化 API
         self._init_api()
@@ -135,42 +133,10 @@ class TushareFetcher(BaseFetcher):
         检查并执行速率限制
         
         流控策略：
-        1. 检查是否进入新的一分钟
-        2. 如果是，重置计数器
-        3. 如果当前分钟调用次数超过限制，强制休眠
-        """
-        current_time = time.time()
-        
-        # 检查是否需要重置计数器（新的一分钟）
-        if self._minute_start is None:
-            self._minute_start = current_time
-            self._call_count = 0
-        elif current_time - self._minute_start >= 60:
-            # 已经过了一分钟，重置计数器
-            self._minute_start = current_time
-            self._call_count = 0
-            logger.debug("速率限制计数器已重置")
-        
-        # 检查是否超过配额
-        if self._call_count >= self.rate_limit_per_minute:
-            # 计算需要等待的时间（到下一分钟）
-            elapsed = current_time - self._minute_start
-            sleep_time = max(0, 60 - elapsed) + 1  # +1 秒缓冲
-            
-            logger.warning(
-                f"Tushare 达到速率限制 ({self._call_count}/{self.rate_limit_per_minute} 次/分钟)，"
-                f"等待 {sleep_time:.1f} 秒..."
-            )
-            
-            time.sleep(sleep_time)
-            
-            # 重置计数器
-            self._minute_start = time.time()
-            self._call_count = 0
-        
-        # 增加调用计数
-        self._call_count += 1
-        logger.debug(f"Tushare 当前分钟调用次数: {self._call_count}/{self.rate_limit_per_minute}")
+        使用进程内共享的 tushare 令牌桶（TUSHARE_RATE_LIMIT_PER_MINUTE），
+        多线程调用时按先后顺序均匀放行，不会出现固定窗口边界处的突发超额。
+        """
+        get_rate_limiter('tushare').acquire()
     
     def _convert_stock_code(self, stock_code: str) -> str:
         """
@@ -244,40 +210,97 @@ class TushareFetcher(BaseFetcher):
                 start_date=ts_start,
                 end_date=ts_end,
             )
-            # 调用 daily_basic 接口补充换手率/量比/估值等（可配置）
-            basic_df = None
-            config = get_config()
-            if config.daily_basic_source == "tushare":
-                try:
-                    basic_df = self._fetch_daily_basic(ts_code, ts_start, ts_end)
-                except Exception as e:
-                    logger.warning(f"Tushare daily_basic 获取失败: {e}")
-
-            if basic_df is not None and not basic_df.empty:
-                # 避免与技术指标 volume_ratio 冲突
-                basic_df = basic_df.rename(columns={'volume_ratio': 'volume_ratio_basic'})
-                basic_df['basic_fetched'] = True
-                df = df.merge(basic_df, on=['ts_code', 'trade_date'], how='left')
-                # daily_basic 成功时，仅匹配到的记录标记为已获取
-                df['basic_fetched'] = df['basic_fetched'].fillna(False)
-            else:
-                df['basic_fetched'] = False
-
-            return df
+            return self._attach_daily_basic(df, ts_code=ts_code, start_date=ts_start, end_date=ts_end)
             
         except Exception as e:
-            error_msg = str(e).lower()
-            
-            # 检测配额超限
-            if any(keyword in error_msg for keyword in ['quota', '配额', 'limit', '权限']):
-                logger.warning(f"Tushare 配额可能超限: {e}")
-                raise RateLimitError(f"Tushare 配额超限: {e}") from e
+            self._raise_fetch_error(e)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=30),
+        retry=retry_if_exception_type((ConnectionError, TimeoutError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+    )
+    def get_market_daily(self, trade_date: date) -> pd.DataFrame:
+        """
+        按交易日获取全市场日线（trade_date 模式）
+        
+        daily() 与 daily_basic() 各调用一次即可覆盖当日全部个股，
+        自选股较多时替代逐只调用，大幅减少配额消耗
+        
+        Args:
+            trade_date: 交易日
             
-            raise DataFetchError(f"Tushare 获取数据失败: {e}") from e
+        Returns:
+            标准化后的 DataFrame（含 code 列，未计算技术指标），无数据时为空
+        """
+        if self._api is None:
+            raise DataFetchError("Tushare API 未初始化，请检查 Token 配置")
+        
+        ts_date = trade_date.strftime('%Y%m%d')
+        self._check_rate_limit()
+        logger.debug(f"调用 Tushare daily(trade_date={ts_date})")
+        
+        try:
+            df = self._api.daily(trade_date=ts_date)
+            if df is None or df.empty:
+                return pd.DataFrame()
+            df = self._attach_daily_basic(df, trade_date=ts_date)
+        except Exception as e:
+            self._raise_fetch_error(e)
+        
+        codes = df['ts_code'].str.split('.').str[0].values
+        df = self._normalize_data(df, '')
+        df['code'] = codes
+        logger.info(f"Tushare 全市场日线 {trade_date}: {len(df)} 条")
+        return df
 
-    def _fetch_daily_basic(self, ts_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def _attach_daily_basic(self, df: pd.DataFrame, **query) -> pd.DataFrame:
+        """
+        调用 daily_basic 接口补充换手率/量比/估值等（可配置），按 ts_code + trade_date 合并
+        """
+        basic_df = None
+        config = get_config()
+        if config.daily_basic_source == "tushare":
+            try:
+                basic_df = self._fetch_daily_basic(**query)
+            except Exception as e:
+                logger.warning(f"Tushare daily_basic 获取失败: {e}")
+
+        if basic_df is not None and not basic_df.empty:
+            # 避免与技术指标 volume_ratio 冲突
+            basic_df = basic_df.rename(columns={'volume_ratio': 'volume_ratio_basic'})
+            basic_df['basic_fetched'] = True
+            df = df.merge(basic_df, on=['ts_code', 'trade_date'], how='left')
+            # daily_basic 成功时，仅匹配到的记录标记为已获取
+            df['basic_fetched'] = df['basic_fetched'].fillna(False)
+        else:
+            df['basic_fetched'] = False
+
+        return df
+
+    def _raise_fetch_error(self, e: Exception) -> None:
+        """将 Tushare 异常转换为 RateLimitError / DataFetchError 抛出"""
+        error_msg = str(e).lower()
+        
+        # 检测配额超限
+        if any(keyword in error_msg for keyword in ['quota', '配额', 'limit', '权限']):
+            logger.warning(f"Tushare 配额可能超限: {e}")
+            raise RateLimitError(f"Tushare 配额超限: {e}") from e
+        
+        raise DataFetchError(f"Tushare 获取数据失败: {e}") from e
+
+    def _fetch_daily_basic(
+        self,
+        ts_code: str = '',
+        start_date: str = '',
+        end_date: str = '',
+        trade_date: str = '',
+    ) -> pd.DataFrame:
         """
         获取 daily_basic 补充字段（换手率/量比/估值等）
+        
+        按 ts_code + 日期区间查询单只股票，或按 trade_date 查询全市场
         """
         if self._api is None:
             raise DataFetchError("Tushare API 未初始化，请检查 Token 配置")
@@ -288,6 +311,7 @@ class TushareFetcher(BaseFetcher):
             ts_code=ts_code,
             start_date=start_date,
             end_date=end_date,
+            trade_date=trade_date,
             fields="ts_code,trade_date,turnover_rate,volume_ratio,pe,pb,total_mv,circ_mv",
         )
     
@@ -398,6 +422,42 @@ class TushareFetcher(BaseFetcher):
         }
         return latest_trade_date, is_trade_day_today
 
+    def get_recent_trade_dates(self, count: int) -> List[date]:
+        """
+        获取截至今天的最近 count 个交易日（升序）
+        """
+        if self._api is None:
+            raise DataFetchError("Tushare API 未初始化，无法获取交易日历")
+
+        today = datetime.now().date()
+        cache = self._trade_dates_cache
+        if cache and cache["asof"] == today and len(cache["dates"]) >= count:
+            return cache["dates"][-count:]
+
+        # 交易日约占自然日的 2/3，多取一段保证数量足够
+        start = (today - pd.Timedelta(days=count * 2 + 30)).strftime("%Y%m%d")
+        end = today.strftime("%Y%m%d")
+
+        self._check_rate_limit()
+        df = self._api.trade_cal(
+            exchange="",
+            start_date=start,
+            end_date=end,
+            fields="cal_date,is_open",
+        )
+
+        dates: List[date] = []
+        if df is not None and not df.empty:
+            for d in df[df["is_open"] == 1]["cal_date"].tolist():
+                try:
+                    dates.append(datetime.strptime(d, "%Y%m%d").date())
+                except Exception:
+                    continue
+        dates.sort()
+
+        self._trade_dates_cache = {"asof": today, "dates": dates}
+        return dates[-count:]
+
     def get_stock_name(self, stock_code: str) -> Optional[str]:
         """
         获取股票名称
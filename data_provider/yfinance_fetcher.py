@@ -15,8 +15,8 @@ YfinanceFetcher - 兜底数据源 (Priority 4)
 """
 
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 import pandas as pd
 from tenacity import (
@@ -28,6 +28,7 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +140,7 @@ class YfinanceFetcher(BaseFetcher):
         
         try:
             # 使用 yfinance 下载数据
+            get_rate_limiter('yfinance').acquire()
             df = yf.download(
                 tickers=yf_code,
                 start=start_date,
@@ -157,6 +159,81 @@ class YfinanceFetcher(BaseFetcher):
                 raise
             raise DataFetchError(f"Yahoo Finance 获取数据失败: {e}") from e
     
+    def get_daily_data_batch(
+        self,
+        stock_codes: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: int = 30,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取日线数据（一次 yf.download 多只股票）
+        
+        将宽表按股票拆分后，逐只走 _normalize_data / _clean_data /
+        _calculate_indicators 标准流程，结果与 get_daily_data 一致
+        
+        Args:
+            stock_codes: 股票代码列表（美股/港股等）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选，默认今天）
+            days: 获取天数（当 start_date 未指定时使用）
+            
+        Returns:
+            {股票代码: 标准化 DataFrame}，无数据的股票不在结果中
+        """
+        import yfinance as yf
+        
+        if not stock_codes:
+            return {}
+        
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if start_date is None:
+            start_dt = datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days * 2)
+            start_date = start_dt.strftime('%Y-%m-%d')
+        
+        yf_codes = {self._convert_stock_code(code): code for code in stock_codes}
+        logger.info(f"[{self.name}] 批量获取 {len(yf_codes)} 只股票数据: {start_date} ~ {end_date}")
+        
+        try:
+            get_rate_limiter('yfinance').acquire()
+            wide = yf.download(
+                tickers=list(yf_codes),
+                start=start_date,
+                end=end_date,
+                progress=False,
+                auto_adjust=True,
+                group_by='ticker',
+                threads=True,
+            )
+        except Exception as e:
+            raise DataFetchError(f"Yahoo Finance 批量获取数据失败: {e}") from e
+        
+        results: Dict[str, pd.DataFrame] = {}
+        if wide is None or wide.empty:
+            return results
+        
+        tickers = wide.columns.get_level_values(0) if isinstance(wide.columns, pd.MultiIndex) else []
+        for yf_code, stock_code in yf_codes.items():
+            if yf_code not in tickers:
+                logger.warning(f"[{self.name}] 批量结果中缺少 {stock_code}")
+                continue
+            raw_df = wide[yf_code].dropna(how='all').rename_axis(columns=None)
+            if raw_df.empty:
+                continue
+            try:
+                df = self._normalize_data(raw_df, stock_code)
+                df = self._clean_data(df)
+                df = self._calculate_indicators(df)
+            except Exception as e:
+                logger.warning(f"[{self.name}] {stock_code} 批量数据处理失败: {e}")
+                continue
+            if not df.empty:
+                results[stock_code] = df
+        
+        logger.info(f"[{self.name}] 批量获取完成: {len(results)}/{len(yf_codes)} 只")
+        return results
+    
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
         标准化 Yahoo Finance 数据
@@ -10,11 +10,13 @@ A股自选股智能分析系统 - AI分析层
 3. 结合技术面和消息面生成分析报告
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import time
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from dataclasses import asdict, dataclass, fields
+from typing import Optional, Dict, Any, List, Tuple
 
 from tenacity import (
     retry,
@@ -25,6 +27,7 @@ from tenacity import (
 )
 
 from src.config import get_config
+from src.storage import get_db
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +235,12 @@ class AnalysisResult:
             'error_message': self.error_message,
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisResult':
+        """从字段字典恢复（忽略未知字段，用于缓存 / 历史结果）"""
+        field_names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in field_names})
+    
     def get_core_conclusion(self) -> str:
         """获取核心结论（一句话）"""
         if self.dashboard and 'core_conclusion' in self.dashboard:
@@ -496,6 +505,8 @@ class GeminiAnalyzer:
         self._using_fallback = False  # 是否正在使用备选模型
         self._use_openai = False  # 是否使用 OpenAI 兼容 API
         self._openai_client = None  # OpenAI 客户端
+        self._openai_client_kwargs: Optional[Dict[str, Any]] = None  # 供异步客户端复用
+        self._async_openai = None  # (事件循环, AsyncOpenAI 客户端)，异步客户端与事件循环绑定
         
         # 检查 Gemini API Key 是否有效（过滤占位符）
         gemini_key_valid = self._api_key and not self._api_key.startswith('your_') and len(self._api_key) > 10
@@ -553,6 +564,7 @@ class GeminiAnalyzer:
                 client_kwargs["base_url"] = config.openai_base_url
             
             self._openai_client = OpenAI(**client_kwargs)
+            self._openai_client_kwargs = client_kwargs
             self._current_model_name = config.openai_model
             self._use_openai = True
             logger.info(f"OpenAI 兼容 API 初始化成功 (base_url: {config.openai_base_url}, model: {config.openai_model})")
@@ -789,129 +801,420 @@ class GeminiAnalyzer:
         # 所有方式都失败
         raise last_error or Exception("所有 AI API 调用失败，已达最大重试次数")
     
+    def _get_async_openai_client(self):
+        """
+        获取当前事件循环下的 AsyncOpenAI 客户端
+        
+        异步客户端内部的连接池与事件循环绑定，事件循环变化时重新创建。
+        """
+        if not self._openai_client_kwargs:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_openai is None or self._async_openai[0] is not loop:
+            from openai import AsyncOpenAI
+            self._async_openai = (loop, AsyncOpenAI(**self._openai_client_kwargs))
+        return self._async_openai[1]
+    
+    async def _call_openai_api_async(self, prompt: str, generation_config: dict) -> str:
+        """异步调用 OpenAI 兼容 API（重试策略同 _call_openai_api）"""
+        client = self._get_async_openai_client()
+        if client is None:
+            raise ValueError("OpenAI 兼容 API 未初始化")
+        
+        config = get_config()
+        max_retries = config.gemini_max_retries
+        base_delay = config.gemini_retry_delay
+        
+        for attempt in range(max_retries):
+            try:
+                if attempt > 0:
+                    delay = min(base_delay * (2 ** (attempt - 1)), 60)
+                    logger.info(f"[OpenAI] 第 {attempt + 1} 次重试，等待 {delay:.1f} 秒...")
+                    await asyncio.sleep(delay)
+                
+                response = await client.chat.completions.create(
+                    model=self._current_model_name,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=generation_config.get('temperature', config.openai_temperature),
+                    max_tokens=generation_config.get('max_output_tokens', 8192),
+                )
+                
+                if response and response.choices and response.choices[0].message.content:
+                    return response.choices[0].message.content
+                raise ValueError("OpenAI API 返回空响应")
+                    
+            except Exception as e:
+                error_str = str(e)
+                is_rate_limit = '429' in error_str or 'rate' in error_str.lower() or 'quota' in error_str.lower()
+                if is_rate_limit:
+                    logger.warning(f"[OpenAI] API 限流，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+                else:
+                    logger.warning(f"[OpenAI] API 调用失败，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+                if attempt == max_retries - 1:
+                    raise
+        
+        raise Exception("OpenAI API 调用失败，已达最大重试次数")
+    
+    async def _call_api_with_retry_async(self, prompt: str, generation_config: dict) -> str:
+        """
+        异步调用 AI API（重试、备选模型切换和 OpenAI 兜底策略同 _call_api_with_retry）
+        """
+        if self._use_openai:
+            return await self._call_openai_api_async(prompt, generation_config)
+        
+        config = get_config()
+        max_retries = config.gemini_max_retries
+        base_delay = config.gemini_retry_delay
+        
+        last_error = None
+        tried_fallback = getattr(self, '_using_fallback', False)
+        
+        for attempt in range(max_retries):
+            try:
+                if attempt > 0:
+                    delay = min(base_delay * (2 ** (attempt - 1)), 60)
+                    logger.info(f"[Gemini] 第 {attempt + 1} 次重试，等待 {delay:.1f} 秒...")
+                    await asyncio.sleep(delay)
+                
+                response = await self._model.generate_content_async(
+                    prompt,
+                    generation_config=generation_config,
+                    request_options={"timeout": 120}
+                )
+                
+                if response and response.text:
+                    return response.text
+                raise ValueError("Gemini 返回空响应")
+                    
+            except Exception as e:
+                last_error = e
+                error_str = str(e)
+                is_rate_limit = '429' in error_str or 'quota' in error_str.lower() or 'rate' in error_str.lower()
+                
+                if is_rate_limit:
+                    logger.warning(f"[Gemini] API 限流 (429)，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+                    if attempt >= max_retries // 2 and not tried_fallback:
+                        if self._switch_to_fallback_model():
+                            tried_fallback = True
+                            logger.info("[Gemini] 已切换到备选模型，继续重试")
+                        else:
+                            logger.warning("[Gemini] 切换备选模型失败，继续使用当前模型重试")
+                else:
+                    logger.warning(f"[Gemini] API 调用失败，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+        
+        # Gemini 所有重试都失败，尝试 OpenAI 兼容 API
+        if not self._openai_client and config.openai_api_key and config.openai_base_url:
+            logger.warning("[Gemini] 所有重试失败，尝试初始化 OpenAI 兼容 API")
+            self._init_openai_fallback()
+        if self._openai_client:
+            logger.warning("[Gemini] 所有重试失败，切换到 OpenAI 兼容 API")
+            try:
+                return await self._call_openai_api_async(prompt, generation_config)
+            except Exception as openai_error:
+                logger.error(f"[OpenAI] 备选 API 也失败: {openai_error}")
+                raise last_error or openai_error
+        
+        raise last_error or Exception("所有 AI API 调用失败，已达最大重试次数")
+    
     def analyze(
         self, 
         context: Dict[str, Any],
-        news_context: Optional[str] = None
+        news_context: Optional[str] = None,
+        use_cache: bool = True,
     ) -> AnalysisResult:
         """
         分析单只股票
         
         流程：
         1. 格式化输入数据（技术面 + 新闻）
-        2. 调用 Gemini API（带重试和模型切换）
-        3. 解析 JSON 响应
-        4. 返回结构化结果
+        2. 查询 LLM 响应缓存（Prompt 完全相同则直接返回）
+        3. 调用 Gemini API（带重试和模型切换）
+        4. 解析 JSON 响应并写入缓存
+        5. 返回结构化结果
         
         Args:
             context: 从 storage.get_analysis_context() 获取的上下文数据
             news_context: 预先搜索的新闻内容（可选）
+            use_cache: 是否读取 LLM 响应缓存（False 时强制调用模型，结果仍会写入缓存）
             
         Returns:
             AnalysisResult 对象
         """
         code = context.get('code', 'Unknown')
         config = get_config()
-        
-        # 请求前增加延时（防止连续请求触发限流）
-        request_delay = config.gemini_request_delay
-        if request_delay > 0:
-            logger.debug(f"[LLM] 请求前等待 {request_delay:.1f} 秒...")
-            time.sleep(request_delay)
-        
-        # 优先从上下文获取股票名称（由 main.py 传入）
-        name = context.get('stock_name')
-        if not name or name.startswith('股票'):
-            # 备选：从 realtime 中获取
-            if 'realtime' in context and context['realtime'].get('name'):
-                name = context['realtime']['name']
-            else:
-                # 最后从映射表获取
-                name = STOCK_NAME_MAP.get(code, f'股票{code}')
+        name = self._resolve_stock_name(context, code)
         
         # 如果模型不可用，返回默认结果
         if not self.is_available():
-            return AnalysisResult(
-                code=code,
-                name=name,
-                sentiment_score=50,
-                trend_prediction='震荡',
-                operation_advice='持有',
-                confidence_level='低',
-                analysis_summary='AI 分析功能未启用（未配置 API Key）',
-                risk_warning='请配置 Gemini API Key 后重试',
-                success=False,
-                error_message='Gemini API Key 未配置',
-            )
+            return self._unavailable_result(code, name)
         
         try:
-            # 格式化输入（包含技术面数据和新闻）
-            prompt = self._format_prompt(context, name, news_context)
-            
-            # 获取模型名称
-            model_name = getattr(self, '_current_model_name', None)
-            if not model_name:
-                model_name = getattr(self._model, '_model_name', 'unknown')
-                if hasattr(self._model, 'model_name'):
-                    model_name = self._model.model_name
+            prompt, generation_config, api_provider = self._prepare_request(context, code, name, news_context)
+            cache_key = self._cache_key(prompt, generation_config) if config.llm_cache_enabled else None
+            if cache_key and use_cache:
+                cached = self._load_cached_result(cache_key, code, name, news_context)
+                if cached is not None:
+                    return cached
             
-            logger.info(f"========== AI 分析 {name}({code}) ==========")
-            logger.info(f"[LLM配置] 模型: {model_name}")
-            logger.info(f"[LLM配置] Prompt 长度: {len(prompt)} 字符")
-            logger.info(f"[LLM配置] 是否包含新闻: {'是' if news_context else '否'}")
-            
-            # 记录完整 prompt 到日志（INFO级别记录摘要，DEBUG记录完整）
-            prompt_preview = prompt[:500] + "..." if len(prompt) > 500 else prompt
-            logger.info(f"[LLM Prompt 预览]\n{prompt_preview}")
-            logger.debug(f"=== 完整 Prompt ({len(prompt)}字符) ===\n{prompt}\n=== End Prompt ===")
-
-            # 设置生成配置（从配置文件读取温度参数）
-            config = get_config()
-            generation_config = {
-                "temperature": config.gemini_temperature,
-                "max_output_tokens": 8192,
-            }
-
-            # 根据实际使用的 API 显示日志
-            api_provider = "OpenAI" if self._use_openai else "Gemini"
-            logger.info(f"[LLM调用] 开始调用 {api_provider} API...")
+            # 请求前增加延时（防止连续请求触发限流）
+            request_delay = config.gemini_request_delay
+            if request_delay > 0:
+                logger.debug(f"[LLM] 请求前等待 {request_delay:.1f} 秒...")
+                time.sleep(request_delay)
             
             # 使用带重试的 API 调用
             start_time = time.time()
             response_text = self._call_api_with_retry(prompt, generation_config)
             elapsed = time.time() - start_time
-
-            # 记录响应信息
-            logger.info(f"[LLM返回] {api_provider} API 响应成功, 耗时 {elapsed:.2f}s, 响应长度 {len(response_text)} 字符")
             
-            # 记录响应预览（INFO级别）和完整响应（DEBUG级别）
-            response_preview = response_text[:300] + "..." if len(response_text) > 300 else response_text
-            logger.info(f"[LLM返回 预览]\n{response_preview}")
-            logger.debug(f"=== {api_provider} 完整响应 ({len(response_text)}字符) ===\n{response_text}\n=== End Response ===")
+            result = self._build_result(response_text, code, name, news_context, api_provider, elapsed)
+            if cache_key:
+                self._save_cached_result(prompt, generation_config, code, result)
+            return result
             
-            # 解析响应
-            result = self._parse_response(response_text, code, name)
-            result.raw_response = response_text
-            result.search_performed = bool(news_context)
+        except Exception as e:
+            return self._error_result(code, name, e)
+    
+    async def analyze_async(
+        self,
+        context: Dict[str, Any],
+        news_context: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> AnalysisResult:
+        """
+        异步分析单只股票（流程与 analyze 相同，API 调用使用异步客户端）
+        
+        Args:
+            context: 从 storage.get_analysis_context() 获取的上下文数据
+            news_context: 预先搜索的新闻内容（可选）
+            use_cache: 是否读取 LLM 响应缓存
             
-            logger.info(f"[LLM解析] {name}({code}) 分析完成: {result.trend_prediction}, 评分 {result.sentiment_score}")
+        Returns:
+            AnalysisResult 对象
+        """
+        code = context.get('code', 'Unknown')
+        config = get_config()
+        name = self._resolve_stock_name(context, code)
+        
+        if not self.is_available():
+            return self._unavailable_result(code, name)
+        
+        try:
+            prompt, generation_config, api_provider = self._prepare_request(context, code, name, news_context)
+            cache_key = self._cache_key(prompt, generation_config) if config.llm_cache_enabled else None
+            if cache_key and use_cache:
+                cached = await asyncio.to_thread(self._load_cached_result, cache_key, code, name, news_context)
+                if cached is not None:
+                    return cached
+            
+            request_delay = config.gemini_request_delay
+            if request_delay > 0:
+                logger.debug(f"[LLM] 请求前等待 {request_delay:.1f} 秒...")
+                await asyncio.sleep(request_delay)
+            
+            start_time = time.time()
+            response_text = await self._call_api_with_retry_async(prompt, generation_config)
+            elapsed = time.time() - start_time
             
+            result = self._build_result(response_text, code, name, news_context, api_provider, elapsed)
+            if cache_key:
+                await asyncio.to_thread(self._save_cached_result, prompt, generation_config, code, result)
             return result
             
         except Exception as e:
-            logger.error(f"AI 分析 {name}({code}) 失败: {e}")
-            return AnalysisResult(
-                code=code,
-                name=name,
-                sentiment_score=50,
-                trend_prediction='震荡',
-                operation_advice='持有',
-                confidence_level='低',
-                analysis_summary=f'分析过程出错: {str(e)[:100]}',
-                risk_warning='分析失败，请稍后重试或手动分析',
-                success=False,
-                error_message=str(e),
-            )
+            return self._error_result(code, name, e)
+    
+    def _resolve_stock_name(self, context: Dict[str, Any], code: str) -> str:
+        """确定股票名称：上下文 > 实时行情 > 映射表"""
+        # 优先从上下文获取股票名称（由 main.py 传入）
+        name = context.get('stock_name')
+        if not name or name.startswith('股票'):
+            # 备选：从 realtime 中获取
+            if 'realtime' in context and context['realtime'].get('name'):
+                name = context['realtime']['name']
+            else:
+                # 最后从映射表获取
+                name = STOCK_NAME_MAP.get(code, f'股票{code}')
+        return name
+    
+    def _unavailable_result(self, code: str, name: str) -> AnalysisResult:
+        """模型不可用时的默认结果"""
+        return AnalysisResult(
+            code=code,
+            name=name,
+            sentiment_score=50,
+            trend_prediction='震荡',
+            operation_advice='持有',
+            confidence_level='低',
+            analysis_summary='AI 分析功能未启用（未配置 API Key）',
+            risk_warning='请配置 Gemini API Key 后重试',
+            success=False,
+            error_message='Gemini API Key 未配置',
+        )
+    
+    def _prepare_request(
+        self,
+        context: Dict[str, Any],
+        code: str,
+        name: str,
+        news_context: Optional[str],
+    ) -> Tuple[str, Dict[str, Any], str]:
+        """
+        构建提示词和生成配置
+        
+        Returns:
+            (prompt, generation_config, api_provider)
+        """
+        # 格式化输入（包含技术面数据和新闻）
+        prompt = self._format_prompt(context, name, news_context)
+        model_name = self._get_model_name()
+        
+        logger.info(f"========== AI 分析 {name}({code}) ==========")
+        logger.info(f"[LLM配置] 模型: {model_name}")
+        logger.info(f"[LLM配置] Prompt 长度: {len(prompt)} 字符")
+        logger.info(f"[LLM配置] 是否包含新闻: {'是' if news_context else '否'}")
+        
+        # 记录完整 prompt 到日志（INFO级别记录摘要，DEBUG记录完整）
+        prompt_preview = prompt[:500] + "..." if len(prompt) > 500 else prompt
+        logger.info(f"[LLM Prompt 预览]\n{prompt_preview}")
+        logger.debug(f"=== 完整 Prompt ({len(prompt)}字符) ===\n{prompt}\n=== End Prompt ===")
+
+        # 设置生成配置（从配置文件读取温度参数）
+        config = get_config()
+        generation_config = {
+            "temperature": config.gemini_temperature,
+            "max_output_tokens": 8192,
+        }
+
+        # 根据实际使用的 API 显示日志
+        api_provider = "OpenAI" if self._use_openai else "Gemini"
+        logger.info(f"[LLM调用] 开始调用 {api_provider} API...")
+        return prompt, generation_config, api_provider
+    
+    def _get_model_name(self) -> str:
+        """当前使用的模型名称"""
+        model_name = getattr(self, '_current_model_name', None)
+        if not model_name:
+            model_name = getattr(self._model, '_model_name', 'unknown')
+            if hasattr(self._model, 'model_name'):
+                model_name = self._model.model_name
+        return model_name
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        model_name: Optional[str] = None,
+    ) -> str:
+        """LLM 缓存键：模型 + 生成参数 + 系统提示词 + Prompt 的 SHA-256（model_name 默认为当前模型）"""
+        payload = json.dumps(
+            {
+                'model': model_name or self._get_model_name(),
+                'generation_config': generation_config,
+                'system_prompt': self.SYSTEM_PROMPT,
+                'prompt': prompt,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _load_cached_result(
+        self,
+        cache_key: str,
+        code: str,
+        name: str,
+        news_context: Optional[str],
+    ) -> Optional[AnalysisResult]:
+        """从 LLM 响应缓存恢复 AnalysisResult，未命中或读取失败返回 None"""
+        config = get_config()
+        try:
+            entry = get_db().get_llm_cache(cache_key, config.llm_cache_ttl)
+        except Exception as e:
+            logger.warning(f"[LLM缓存] 读取失败，改为调用模型: {e}")
+            return None
+        if entry is None:
+            return None
+        
+        data = dict(entry['result'])
+        data.update(code=code, name=name, raw_response=entry['response'], search_performed=bool(news_context))
+        result = AnalysisResult.from_dict(data)
+        logger.info(f"[LLM缓存] {name}({code}) 命中缓存 (模型: {entry['model']})，跳过 API 调用: "
+                    f"{result.trend_prediction}, 评分 {result.sentiment_score}")
+        return result
+    
+    def _save_cached_result(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        code: str,
+        result: AnalysisResult,
+    ) -> None:
+        """
+        写入 LLM 响应缓存并按 TTL / 条数上限淘汰（仅缓存成功结果）
+
+        调用过程中可能因限流切换到备选模型，缓存键按实际产生响应的模型（调用后的当前模型）重新计算，
+        避免把备选模型的回答缓存到主模型名下。
+        """
+        if not result.success or not result.raw_response:
+            return
+        config = get_config()
+        model_name = self._get_model_name()
+        cache_key = self._cache_key(prompt, generation_config, model_name)
+        data = asdict(result)
+        data.pop('raw_response', None)
+        try:
+            db = get_db()
+            db.save_llm_cache(cache_key, code, model_name, result.raw_response, data)
+            db.prune_llm_cache(config.llm_cache_ttl, config.llm_cache_max_entries)
+        except Exception as e:
+            logger.warning(f"[LLM缓存] 写入失败: {e}")
+    
+    def _build_result(
+        self,
+        response_text: str,
+        code: str,
+        name: str,
+        news_context: Optional[str],
+        api_provider: str,
+        elapsed: float,
+    ) -> AnalysisResult:
+        """记录响应并解析为 AnalysisResult"""
+        # 记录响应信息
+        logger.info(f"[LLM返回] {api_provider} API 响应成功, 耗时 {elapsed:.2f}s, 响应长度 {len(response_text)} 字符")
+        
+        # 记录响应预览（INFO级别）和完整响应（DEBUG级别）
+        response_preview = response_text[:300] + "..." if len(response_text) > 300 else response_text
+        logger.info(f"[LLM返回 预览]\n{response_preview}")
+        logger.debug(f"=== {api_provider} 完整响应 ({len(response_text)}字符) ===\n{response_text}\n=== End Response ===")
+        
+        # 解析响应
+        result = self._parse_response(response_text, code, name)
+        result.raw_response = response_text
+        result.search_performed = bool(news_context)
+        
+        logger.info(f"[LLM解析] {name}({code}) 分析完成: {result.trend_prediction}, 评分 {result.sentiment_score}")
+        
+        return result
+    
+    def _error_result(self, code: str, name: str, e: Exception) -> AnalysisResult:
+        """分析失败时的默认结果"""
+        logger.error(f"AI 分析 {name}({code}) 失败: {e}")
+        return AnalysisResult(
+            code=code,
+            name=name,
+            sentiment_score=50,
+            trend_prediction='震荡',
+            operation_advice='持有',
+            confidence_level='低',
+            analysis_summary=f'分析过程出错: {str(e)[:100]}',
+            risk_warning='分析失败，请稍后重试或手动分析',
+            success=False,
+            error_message=str(e),
+        )
     
     def _format_prompt(
         self, 
@@ -12,11 +12,31 @@ A股自选股智能分析系统 - 配置管理模块
 
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv, dotenv_values
 from dataclasses import dataclass, field
 
 
+def _parse_int_mapping(value: str) -> Dict[str, int]:
+    """
+    解析 "name:value,name:value" 格式的配置项
+
+    示例：REALTIME_CACHE_TTL_OVERRIDES=akshare_em:1200,efinance:300
+    格式错误的条目会被忽略。
+    """
+    result: Dict[str, int] = {}
+    for item in (value or '').split(','):
+        if ':' not in item:
+            continue
+        key, _, raw = item.partition(':')
+        key = key.strip()
+        try:
+            result[key] = int(raw.strip())
+        except ValueError:
+            continue
+    return {k: v for k, v in result.items() if k}
+
+
 @dataclass
 class Config:
     """
@@ -41,6 +61,12 @@ class Config:
     tushare_only: bool = False
     daily_basic_source: str = "tushare"
     chip_source: str = "akshare"
+    # 日线入库方式：auto（按调用次数自动选择）/ market（按交易日全市场）/ stock（逐只）
+    tushare_ingest_mode: str = "auto"
+    tushare_market_days: int = 30  # 全市场模式回补的交易日数
+    pytdx_pool_size: int = 2  # 通达信长连接池大小
+    # 增量获取日线：只请求库中最新日期之后的数据，均线基于库内历史重算
+    incremental_daily_fetch: bool = True
 
     # === AI 分析配置 ===
     gemini_api_key: Optional[str] = None
@@ -58,11 +84,21 @@ class Config:
     openai_base_url: Optional[str] = None  # 如: https://api.openai.com/v1
     openai_model: str = "gpt-4o-mini"  # OpenAI 兼容模型名称
     openai_temperature: float = 0.7  # OpenAI 温度参数（0.0-2.0，默认0.7）
+
+    # LLM 响应缓存（Prompt 完全相同时复用结果，存于 SQLite）
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: int = 21600  # 缓存有效期（秒），默认 6 小时
+    llm_cache_max_entries: int = 2000  # 最多保留条数，超出按最近命中时间淘汰
     
     # === 搜索引擎配置（支持多 Key 负载均衡）===
     bocha_api_keys: List[str] = field(default_factory=list)  # Bocha API Keys
     tavily_api_keys: List[str] = field(default_factory=list)  # Tavily API Keys
     serpapi_keys: List[str] = field(default_factory=list)  # SerpAPI Keys
+    # 各搜索引擎最大并发请求数（如 {'bocha': 3}，未配置的默认 2）
+    search_provider_concurrency: Dict[str, int] = field(default_factory=dict)
+    # 搜索查询缓存（SQLite），按情报维度设置 TTL
+    search_cache_enabled: bool = True
+    search_cache_ttl_overrides: Dict[str, int] = field(default_factory=dict)
     
     # === 通知配置（可同时配置多个，全部推送）===
     
@@ -111,6 +147,10 @@ class Config:
     feishu_max_bytes: int = 20000  # 飞书限制约 20KB，默认 20000 字节
     wechat_max_bytes: int = 4000   # 企业微信限制 4096 字节，默认 4000 字节
     wechat_msg_type: str = "markdown"  # 企业微信消息类型，默认 markdown 类型
+
+    # 多渠道推送：并发发送，单渠道超时（秒）后不再等待
+    notification_parallel: bool = True
+    notification_channel_timeout: float = 60.0
     
     # === 数据库配置 ===
     database_path: str = "./data/stock_analysis.db"
@@ -121,6 +161,19 @@ class Config:
     
     # === 系统配置 ===
     max_workers: int = 3  # 低并发防封禁
+    # 流水线模式：pool(每线程串行处理单股) / staged(数据/搜索/AI/推送分阶段并发) / async(asyncio)
+    pipeline_mode: str = "pool"
+    stage_search_workers: int = 2  # staged 模式搜索阶段并发数
+    stage_llm_workers: int = 2     # staged 模式 AI 分析阶段并发数
+    stage_queue_size: int = 4      # staged 模式阶段间队列容量
+    async_max_inflight: int = 32   # async 模式同时在途的搜索 + AI 分析数
+    # WebUI / Bot 单股分析结果的短期缓存（秒），期间相同请求直接复用结果；0 表示不缓存
+    analysis_result_cache_ttl: int = 600
+    
+    # 共享 HTTP 连接池（搜索 / 通知 / 机器人）
+    http_pool_size: int = 10       # 每个主机保持的 keep-alive 连接数
+    http_timeout: float = 10.0     # 未显式指定时的默认超时（秒）
+    http_max_retries: int = 2      # 连接失败 / 幂等请求 5xx 的重试次数
     debug: bool = False
     http_proxy: Optional[str] = None  # HTTP 代理 (例如: http://127.0.0.1:10809)
     https_proxy: Optional[str] = None # HTTPS 代理
@@ -129,18 +182,27 @@ class Config:
     schedule_enabled: bool = False            # 是否启用定时任务
     schedule_time: str = "18:00"              # 每日推送时间（HH:MM 格式）
     market_review_enabled: bool = True        # 是否启用大盘复盘
+    # 大盘复盘涨跌统计复用个股流程已下载的全量行情快照，允许的最大快照年龄（秒）；0 表示总是重新拉取
+    market_snapshot_max_age: int = 1800
 
     # === 实时行情增强数据配置 ===
     # 实时行情开关（关闭后使用历史收盘价进行分析）
     enable_realtime_quote: bool = True
     # 筹码分布开关（该接口不稳定，云端部署建议关闭）
     enable_chip_distribution: bool = True
-    # 实时行情数据源优先级（逗号分隔）
+    # 实时行情数据源优先级（逗号分隔，可选 akshare_sina/tencent/efinance/akshare_em/pytdx）
     realtime_source_priority: str = "akshare_sina,tencent,efinance,akshare_em"
     # 实时行情缓存时间（秒）
     realtime_cache_ttl: int = 600
+    # 按缓存名称覆盖 TTL（如 {'akshare_em': 1200}）
+    realtime_cache_ttl_overrides: Dict[str, int] = field(default_factory=dict)
+    # 快照过期后先返回旧快照并在后台刷新（stale-while-revalidate），以及旧快照最长可用的过期时间（秒）
+    realtime_cache_stale_while_revalidate: bool = False
+    realtime_cache_max_stale: int = 600
     # 熔断器冷却时间（秒）
     circuit_breaker_cooldown: int = 300
+    # 按熔断器名称覆盖冷却时间（如 {'chip': 900}）
+    circuit_breaker_cooldown_overrides: Dict[str, int] = field(default_factory=dict)
 
     # Discord 机器人状态
     discord_bot_status: str = "A股智能分析 | /help"
@@ -152,6 +214,11 @@ class Config:
     
     # Tushare 每分钟最大请求数（免费配额）
     tushare_rate_limit_per_minute: int = 80
+    # 按上游名称覆盖每分钟请求数（eastmoney/sina/tencent/tushare/pytdx/baostock/yfinance，0 表示不限速）
+    rate_limit_per_minute_overrides: Dict[str, int] = field(default_factory=dict)
+    # 限速状态后端：memory（进程内共享）/ sqlite（多进程共享）
+    rate_limit_backend: str = "memory"
+    rate_limit_db_path: str = "./data/rate_limit.db"
     
     # 重试配置
     max_retries: int = 3
@@ -307,6 +374,10 @@ class Config:
             tushare_only=os.getenv('TUSHARE_ONLY', 'false').lower() == 'true',
             daily_basic_source=os.getenv('DAILY_BASIC_SOURCE', 'tushare').lower(),
             chip_source=os.getenv('CHIP_SOURCE', 'akshare').lower(),
+            tushare_ingest_mode=os.getenv('TUSHARE_INGEST_MODE', 'auto').lower(),
+            tushare_market_days=int(os.getenv('TUSHARE_MARKET_DAYS', '30')),
+            pytdx_pool_size=int(os.getenv('PYTDX_POOL_SIZE', '2')),
+            incremental_daily_fetch=os.getenv('INCREMENTAL_DAILY_FETCH', 'true').lower() == 'true',
             gemini_api_key=os.getenv('GEMINI_API_KEY'),
             gemini_model=os.getenv('GEMINI_MODEL', 'gemini-3-flash-preview'),
             gemini_model_fallback=os.getenv('GEMINI_MODEL_FALLBACK', 'gemini-2.5-flash'),
@@ -318,9 +389,15 @@ class Config:
             openai_base_url=os.getenv('OPENAI_BASE_URL'),
             openai_model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
             openai_temperature=float(os.getenv('OPENAI_TEMPERATURE', '0.7')),
+            llm_cache_enabled=os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true',
+            llm_cache_ttl=int(os.getenv('LLM_CACHE_TTL', '21600')),
+            llm_cache_max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '2000')),
             bocha_api_keys=bocha_api_keys,
             tavily_api_keys=tavily_api_keys,
             serpapi_keys=serpapi_keys,
+            search_provider_concurrency=_parse_int_mapping(os.getenv('SEARCH_PROVIDER_CONCURRENCY', '')),
+            search_cache_enabled=os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true',
+            search_cache_ttl_overrides=_parse_int_mapping(os.getenv('SEARCH_CACHE_TTL_OVERRIDES', '')),
             wechat_webhook_url=os.getenv('WECHAT_WEBHOOK_URL'),
             feishu_webhook_url=os.getenv('FEISHU_WEBHOOK_URL'),
             telegram_bot_token=os.getenv('TELEGRAM_BOT_TOKEN'),
@@ -342,16 +419,28 @@ class Config:
             feishu_max_bytes=int(os.getenv('FEISHU_MAX_BYTES', '20000')),
             wechat_max_bytes=wechat_max_bytes,
             wechat_msg_type=wechat_msg_type,
+            notification_parallel=os.getenv('NOTIFICATION_PARALLEL', 'true').lower() == 'true',
+            notification_channel_timeout=float(os.getenv('NOTIFICATION_CHANNEL_TIMEOUT', '60')),
             database_path=os.getenv('DATABASE_PATH', './data/stock_analysis.db'),
             log_dir=os.getenv('LOG_DIR', './logs'),
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             max_workers=int(os.getenv('MAX_WORKERS', '3')),
+            pipeline_mode=os.getenv('PIPELINE_MODE', 'pool').lower(),
+            stage_search_workers=int(os.getenv('STAGE_SEARCH_WORKERS', '2')),
+            stage_llm_workers=int(os.getenv('STAGE_LLM_WORKERS', '2')),
+            stage_queue_size=int(os.getenv('STAGE_QUEUE_SIZE', '4')),
+            async_max_inflight=int(os.getenv('ASYNC_MAX_INFLIGHT', '32')),
+            analysis_result_cache_ttl=int(os.getenv('ANALYSIS_RESULT_CACHE_TTL', '600')),
+            http_pool_size=int(os.getenv('HTTP_POOL_SIZE', '10')),
+            http_timeout=float(os.getenv('HTTP_TIMEOUT', '10')),
+            http_max_retries=int(os.getenv('HTTP_MAX_RETRIES', '2')),
             debug=os.getenv('DEBUG', 'false').lower() == 'true',
             http_proxy=os.getenv('HTTP_PROXY'),
             https_proxy=os.getenv('HTTPS_PROXY'),
             schedule_enabled=os.getenv('SCHEDULE_ENABLED', 'false').lower() == 'true',
             schedule_time=os.getenv('SCHEDULE_TIME', '18:00'),
             market_review_enabled=os.getenv('MARKET_REVIEW_ENABLED', 'true').lower() == 'true',
+            market_snapshot_max_age=int(os.getenv('MARKET_SNAPSHOT_MAX_AGE', '1800')),
             webui_enabled=os.getenv('WEBUI_ENABLED', 'false').lower() == 'true',
             webui_host=os.getenv('WEBUI_HOST', '127.0.0.1'),
             webui_port=int(os.getenv('WEBUI_PORT', '8000')),
@@ -386,7 +475,18 @@ class Config:
             # - efinance/akshare_em: 全量拉取，数据丰富但负载大
             realtime_source_priority=os.getenv('REALTIME_SOURCE_PRIORITY', 'akshare_sina,tencent,efinance,akshare_em'),
             realtime_cache_ttl=int(os.getenv('REALTIME_CACHE_TTL', '600')),
-            circuit_breaker_cooldown=int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '300'))
+            realtime_cache_ttl_overrides=_parse_int_mapping(os.getenv('REALTIME_CACHE_TTL_OVERRIDES', '')),
+            realtime_cache_stale_while_revalidate=os.getenv('REALTIME_CACHE_STALE_WHILE_REVALIDATE', 'false').lower() == 'true',
+            realtime_cache_max_stale=int(os.getenv('REALTIME_CACHE_MAX_STALE', '600')),
+            circuit_breaker_cooldown=int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '300')),
+            circuit_breaker_cooldown_overrides=_parse_int_mapping(os.getenv('CIRCUIT_BREAKER_COOLDOWN_OVERRIDES', '')),
+            # 流控配置
+            akshare_sleep_min=float(os.getenv('AKSHARE_SLEEP_MIN', '2.0')),
+            akshare_sleep_max=float(os.getenv('AKSHARE_SLEEP_MAX', '5.0')),
+            tushare_rate_limit_per_minute=int(os.getenv('TUSHARE_RATE_LIMIT_PER_MINUTE', '80')),
+            rate_limit_per_minute_overrides=_parse_int_mapping(os.getenv('RATE_LIMIT_PER_MINUTE_OVERRIDES', '')),
+            rate_limit_backend=os.getenv('RATE_LIMIT_BACKEND', 'memory').lower(),
+            rate_limit_db_path=os.getenv('RATE_LIMIT_DB_PATH', './data/rate_limit.db'),
         )
     
     @classmethod
@@ -447,6 +547,18 @@ class Config:
         if self.chip_source not in ("akshare", "tushare", "none"):
             warnings.append("提示：CHIP_SOURCE 非法，已回退为 akshare")
             self.chip_source = "akshare"
+        if self.tushare_ingest_mode not in ("auto", "market", "stock"):
+            warnings.append("提示：TUSHARE_INGEST_MODE 非法，已回退为 auto")
+            self.tushare_ingest_mode = "auto"
+        if self.pipeline_mode not in ("pool", "staged", "async"):
+            warnings.append("提示：PIPELINE_MODE 非法，已回退为 pool")
+            self.pipeline_mode = "pool"
+        if self.rate_limit_backend not in ("memory", "sqlite"):
+            warnings.append("提示：RATE_LIMIT_BACKEND 非法，已回退为 memory")
+            self.rate_limit_backend = "memory"
+        if self.akshare_sleep_max < self.akshare_sleep_min:
+            warnings.append("提示：AKSHARE_SLEEP_MAX 小于 AKSHARE_SLEEP_MIN，已调整为相同值")
+            self.akshare_sleep_max = self.akshare_sleep_min
         
         if not self.gemini_api_key and not self.openai_api_key:
             warnings.append("警告：未配置 Gemini 或 OpenAI API Key，AI 分析功能将不可用")
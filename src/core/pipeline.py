@@ -11,27 +11,46 @@ A股自选股智能分析系统 - 核心分析流水线
 4. 提供股票分析的核心功能
 """
 
+import asyncio
+import functools
 import logging
 import time
+from dataclasses import asdict, dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
+import pandas as pd
+
 from src.config import get_config, Config
+from src.http_client import get_http_pool
 from src.storage import get_db
 from data_provider import DataFetcherManager
-from data_provider.realtime_types import ChipDistribution, UnifiedRealtimeQuote, RealtimeSource
+from data_provider.akshare_fetcher import _is_etf_code
+from data_provider.rate_limiter import get_rate_limiter_registry
+from data_provider.realtime_types import ChipDistribution, UnifiedRealtimeQuote, RealtimeSource, get_cache_registry
 from src.analyzer import GeminiAnalyzer, AnalysisResult, STOCK_NAME_MAP
 from src.notification import NotificationService, NotificationChannel
 from src.search_service import SearchService
 from src.enums import ReportType
 from src.stock_analyzer import StockTrendAnalyzer, TrendAnalysisResult
+from src.core.staged_executor import Stage, StagedExecutor
 from bot.models import BotMessage
 
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class StockAnalysisJob:
+    """单只股票在各阶段之间传递的中间结果"""
+    code: str
+    stock_name: str
+    context: Dict[str, Any]
+    enhanced_context: Dict[str, Any]
+    news_context: Optional[str] = None
+
+
 class StockAnalysisPipeline:
     """
     股票分析主流程调度器
@@ -42,11 +61,18 @@ class StockAnalysisPipeline:
     3. 实现并发控制和异常处理
     """
     
+    # 趋势分析读取的历史K线根数（MA60 需至少 60 根）
+    TREND_HISTORY_DAYS = 120
+    
     def __init__(
         self,
         config: Optional[Config] = None,
         max_workers: Optional[int] = None,
-        source_message: Optional[BotMessage] = None
+        source_message: Optional[BotMessage] = None,
+        fetcher_manager: Optional[DataFetcherManager] = None,
+        analyzer: Optional[GeminiAnalyzer] = None,
+        search_service: Optional[SearchService] = None,
+        trend_analyzer: Optional[StockTrendAnalyzer] = None,
     ):
         """
         初始化调度器
@@ -54,6 +80,9 @@ class StockAnalysisPipeline:
         Args:
             config: 配置对象（可选，默认使用全局配置）
             max_workers: 最大并发线程数（可选，默认从配置读取）
+            source_message: 触发本次分析的机器人消息（用于回复到原会话）
+            fetcher_manager / analyzer / search_service / trend_analyzer:
+                可注入已初始化的共享实例（见 src/core/services.py），未提供时新建
         """
         self.config = config or get_config()
         self.max_workers = max_workers or self.config.max_workers
@@ -61,15 +90,19 @@ class StockAnalysisPipeline:
         
         # 初始化各模块
         self.db = get_db()
-        self.fetcher_manager = DataFetcherManager()
+        self.fetcher_manager = fetcher_manager or DataFetcherManager()
         # 不再单独创建 akshare_fetcher，统一使用 fetcher_manager 获取增强数据
-        self.trend_analyzer = StockTrendAnalyzer()  # 趋势分析器
-        self.analyzer = GeminiAnalyzer()
+        self.trend_analyzer = trend_analyzer or StockTrendAnalyzer()  # 趋势分析器
+        self.analyzer = analyzer or GeminiAnalyzer()
         self.notifier = NotificationService(source_message=source_message)
         self._trade_status_cache: Optional[Tuple[date, bool]] = None
+        # 批量预取的日线数据 {code: (df, source_name)}，由 fetch_and_save_stock_data 消费
+        self._prefetched_daily: Dict[str, Tuple[pd.DataFrame, str]] = {}
+        # 各股票库内最新日期（run 开始时一次分组查询），用于增量获取
+        self._last_stored_dates: Dict[str, date] = {}
         
         # 初始化搜索服务
-        self.search_service = SearchService(
+        self.search_service = search_service or SearchService(
             bocha_keys=self.config.bocha_api_keys,
             tavily_keys=self.config.tavily_api_keys,
             serpapi_keys=self.config.serpapi_keys,
@@ -134,16 +167,24 @@ class StockAnalysisPipeline:
                     logger.info(f"[{code}] 今日数据已存在，跳过获取（断点续传）")
                     return True, None
             
-            # 从数据源获取数据
-            logger.info(f"[{code}] 开始从数据源获取数据...")
-            df, source_name = self.fetcher_manager.get_daily_data(code, days=30)
+            # 从数据源获取数据（优先使用批量预取结果）
+            prefetched = self._prefetched_daily.pop(code, None)
+            if prefetched is not None:
+                df, source_name = prefetched
+                logger.info(f"[{code}] 使用批量预取的日线数据（来源: {source_name}）")
+            else:
+                last_date = self._get_incremental_start(code, force_refresh)
+                if last_date is not None:
+                    return self._fetch_and_save_incremental(code, last_date)
+                logger.info(f"[{code}] 开始从数据源获取数据...")
+                df, source_name = self.fetcher_manager.get_daily_data(code, days=30)
             
             if df is None or df.empty:
                 return False, "获取数据为空"
             
             # 保存到数据库
-            saved_count = self.db.save_daily_data(df, code, source_name)
-            logger.info(f"[{code}] 数据保存成功（来源: {source_name}，新增 {saved_count} 条）")
+            inserted, updated = self.db.save_daily_data(df, code, source_name)
+            logger.info(f"[{code}] 数据保存成功（来源: {source_name}，新增 {inserted} 条，更新 {updated} 条）")
             
             return True, None
             
@@ -152,11 +193,251 @@ class StockAnalysisPipeline:
             logger.error(f"[{code}] {error_msg}")
             return False, error_msg
 
+    # 增量获取的最大缺口（自然日），超过则按完整窗口重新获取
+    INCREMENTAL_MAX_GAP_DAYS = 30
+    
+    def _get_incremental_start(self, code: str, force_refresh: bool = False) -> Optional[date]:
+        """
+        返回增量获取的起点（库内最新日期），不满足增量条件时返回 None
+        """
+        if force_refresh or not getattr(self.config, 'incremental_daily_fetch', True):
+            return None
+        last_date = self._last_stored_dates.get(code)
+        if last_date is None:
+            last_date = self.db.get_last_dates([code]).get(code)
+        if last_date is None or (date.today() - last_date).days > self.INCREMENTAL_MAX_GAP_DAYS:
+            return None
+        return last_date
+    
+    def _fetch_and_save_incremental(self, code: str, last_date: date) -> Tuple[bool, Optional[str]]:
+        """
+        增量获取日线：仅请求 last_date 之后的数据，结合库内历史重算均线/量比
+        
+        请求区间从 last_date 当天开始（重叠一根K线，保证涨跌幅计算基准），
+        只写入 last_date 之后的新K线
+        """
+        start_date = last_date.strftime('%Y-%m-%d')
+        logger.info(f"[{code}] 增量获取日线: {start_date} 起（库内最新 {last_date}）")
+        df, source_name = self.fetcher_manager.get_daily_data(code, start_date=start_date)
+        
+        if df is None or df.empty:
+            return False, "获取数据为空"
+        
+        df = df.copy()
+        df['code'] = code
+        history_df = self.db.get_daily_frame([code], last_date - timedelta(days=45), last_date)
+        df = self._calculate_grouped_indicators(history_df, df)
+        df = df[df['date'].dt.date > last_date]
+        if df.empty:
+            logger.info(f"[{code}] 无新增日线（库内已是最新交易日 {last_date}）")
+            return True, None
+        
+        inserted, updated = self.db.save_daily_data(df, code, source_name)
+        logger.info(f"[{code}] 增量数据保存成功（来源: {source_name}，新增 {inserted} 条，更新 {updated} 条）")
+        return True, None
+    
+    def ingest_market_daily(self, stock_codes: List[str]) -> int:
+        """
+        按交易日批量入库日线（Tushare trade_date 模式）
+        
+        对自选股缺失的每个交易日，全市场 daily / daily_basic 各调用一次，
+        结合库内历史计算均线后批量写入。之后 fetch_and_save_stock_data
+        检测到最新交易日已入库，即跳过该股票的网络请求。
+        
+        auto 模式下仅当调用次数少于逐只获取时启用（每个交易日 2 次 vs 每只股票 2 次）
+        
+        ETF 不在 Tushare daily / daily_basic 中，始终逐只获取，不计入覆盖率；
+        已拉取过的交易日中不存在的代码（停牌、未上市等）记入缺席表，不再视为缺失
+        
+        Args:
+            stock_codes: 股票代码列表
+            
+        Returns:
+            写入（新增+更新）的记录数
+        """
+        mode = getattr(self.config, 'tushare_ingest_mode', 'auto')
+        if mode == 'stock' or not self.fetcher_manager.supports_market_daily():
+            return 0
+        
+        # 仅 A 股个股（6 位数字代码，排除 ETF）
+        codes = [c for c in stock_codes if c.isdigit() and len(c) == 6 and not _is_etf_code(c)]
+        if not codes:
+            return 0
+        
+        try:
+            trade_dates = self.fetcher_manager.get_recent_trade_dates(self.config.tushare_market_days)
+            # 今日尚未收盘时不拉取今日数据
+            if trade_dates and trade_dates[-1] == date.today():
+                if datetime.now().time() < datetime.strptime("16:30", "%H:%M").time():
+                    trade_dates = trade_dates[:-1]
+            if not trade_dates:
+                return 0
+            
+            require_basic = getattr(self.config, "daily_basic_source", "tushare") == "tushare"
+            coverage = self.db.get_daily_coverage(codes, trade_dates[0], trade_dates[-1], require_basic)
+            absences = self.db.get_market_daily_absences(codes, trade_dates[0], trade_dates[-1])
+            for trade_date, absent in absences.items():
+                coverage.setdefault(trade_date, set()).update(absent)
+            missing_dates = [d for d in trade_dates if len(coverage.get(d, ())) < len(codes)]
+            if not missing_dates:
+                logger.info("[全市场日线] 自选股近期日线均已入库，无需拉取")
+                return 0
+            
+            missing_codes = {c for d in missing_dates for c in codes if c not in coverage.get(d, ())}
+            if mode == 'auto' and len(missing_dates) >= len(missing_codes):
+                logger.info(
+                    f"[全市场日线] 缺失 {len(missing_dates)} 个交易日 / {len(missing_codes)} 只股票，"
+                    f"逐只获取更省配额，跳过全市场模式"
+                )
+                return 0
+            
+            logger.info(f"[全市场日线] 按交易日拉取 {len(missing_dates)} 天，覆盖 {len(missing_codes)} 只股票")
+            frames = []
+            for trade_date in missing_dates:
+                market_df = self.fetcher_manager.get_market_daily(trade_date)
+                if market_df is None:
+                    # 失败时剩余股票交由逐只获取兜底
+                    break
+                if not market_df.empty:
+                    market_df = market_df[market_df['code'].isin(codes)]
+                    frames.append(market_df)
+                    self._record_market_absences(trade_date, codes, market_df, require_basic)
+            if not frames:
+                return 0
+            
+            new_df = pd.concat(frames, ignore_index=True)
+            history_start = new_df['date'].min().date() - timedelta(days=45)
+            history_df = self.db.get_daily_frame(codes, history_start, trade_dates[-1])
+            new_df = self._calculate_grouped_indicators(history_df, new_df)
+            
+            inserted, updated = self.db.save_daily_frame(new_df, "TushareFetcher")
+            return inserted + updated
+        except Exception as e:
+            logger.warning(f"[全市场日线] 批量入库失败，回退为逐只获取: {e}")
+            return 0
+    
+    def _record_market_absences(
+        self,
+        trade_date: date,
+        codes: List[str],
+        market_df: pd.DataFrame,
+        require_basic: bool,
+    ) -> None:
+        """
+        记录当日全市场日线中不存在的自选股，避免后续运行反复拉取该交易日
+        
+        要求 daily_basic 时，当日 daily_basic 成功但未包含的股票同样记录；
+        daily_basic 整体失败则不记录这部分，下次运行重试。
+        """
+        present = market_df
+        if require_basic and market_df['basic_fetched'].astype(bool).any():
+            present = market_df[market_df['basic_fetched'].astype(bool)]
+        absent = sorted(set(codes) - set(present['code']))
+        if not absent:
+            return
+        try:
+            self.db.save_market_daily_absences(trade_date, absent)
+            logger.debug(f"[全市场日线] {trade_date} 无数据的自选股: {', '.join(absent)}")
+        except Exception as e:
+            logger.warning(f"[全市场日线] 记录 {trade_date} 缺席股票失败: {e}")
+    
+    def prefetch_daily_data(self, stock_codes: List[str]) -> int:
+        """
+        批量预取美股/港股日线（yfinance 多代码单次下载）
+        
+        仅预取今日尚无数据的股票；结果暂存于 _prefetched_daily，
+        由 fetch_and_save_stock_data 直接入库，免去逐只 HTTP 请求
+        
+        Returns:
+            预取成功的股票数量
+        """
+        codes = [c for c in stock_codes if not self.db.has_today_data(c)]
+        if not codes:
+            return 0
+        
+        try:
+            prefetched = self.fetcher_manager.get_daily_data_batch(codes, days=30)
+        except Exception as e:
+            logger.warning(f"[批量日线] 预取失败，将逐只获取: {e}")
+            return 0
+        
+        self._prefetched_daily.update(prefetched)
+        if prefetched:
+            logger.info(f"[批量日线] 已预取 {len(prefetched)} 只美股/港股日线")
+        return len(prefetched)
+    
+    @staticmethod
+    def _calculate_grouped_indicators(history_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        基于库内历史 + 新增日线，按股票分组计算 MA5/10/20 与量比（口径同 BaseFetcher）
+        
+        Returns:
+            仅包含新增日线的 DataFrame（已填充技术指标）
+        """
+        history_df = history_df.assign(_is_new=False)
+        new_df = new_df.assign(_is_new=True)
+        combined = pd.concat([history_df, new_df], ignore_index=True)
+        combined['date'] = pd.to_datetime(combined['date'])
+        combined = (
+            combined.drop_duplicates(subset=['code', 'date'], keep='last')
+            .sort_values(['code', 'date'])
+            .reset_index(drop=True)
+        )
+        
+        grouped = combined.groupby('code', sort=False)
+        for window in (5, 10, 20):
+            combined[f'ma{window}'] = (
+                grouped['close'].rolling(window=window, min_periods=1).mean()
+                .reset_index(level=0, drop=True)
+                .round(2)
+            )
+        avg_volume_5 = (
+            grouped['volume'].rolling(window=5, min_periods=1).mean()
+            .reset_index(level=0, drop=True)
+        )
+        combined['volume_ratio'] = (
+            combined['volume'] / avg_volume_5.groupby(combined['code']).shift(1)
+        ).fillna(1.0).round(2)
+        
+        return combined[combined['_is_new'].astype(bool)].drop(columns=['_is_new'])
+    
     def _get_trade_status_cached(self) -> Tuple[date, bool]:
         if self._trade_status_cache is None:
             self._trade_status_cache = self.fetcher_manager.get_trade_status()
         return self._trade_status_cache
     
+    def _get_chip_distribution(self, code: str) -> Optional[ChipDistribution]:
+        """
+        获取筹码分布（优先读库）
+        
+        目标交易日 = 该股已入库的最新日线日期（无记录时取最新交易日）。
+        库中已有该日筹码时直接返回；否则请求一次逐日筹码并全部入库，
+        请求失败时退回库中最近一天的数据。
+        """
+        if not self.config.enable_chip_distribution or getattr(self.config, 'chip_source', 'akshare') == 'none':
+            return None
+
+        target_date = self.db.get_last_dates([code]).get(code) or self._get_trade_status_cached()[0]
+        cached = self.db.get_chip_distribution(code, target_date)
+        if cached:
+            logger.info(f"[{code}] 筹码分布命中本地缓存: {target_date}")
+            return ChipDistribution(**cached)
+
+        history = self.fetcher_manager.get_chip_history(code)
+        if history:
+            try:
+                saved = self.db.save_chip_distributions([chip.to_dict() for chip in history])
+                logger.debug(f"[{code}] 筹码分布入库 {saved} 天")
+            except Exception as e:
+                logger.warning(f"[{code}] 筹码分布入库失败: {e}")
+            return history[-1]
+
+        stale = self.db.get_chip_distribution(code)
+        if stale:
+            logger.info(f"[{code}] 筹码接口不可用，使用本地最近一天的数据: {stale['date']}")
+            return ChipDistribution(**stale)
+        return None
+
     def analyze_stock(self, code: str) -> Optional[AnalysisResult]:
         """
         分析单只股票（增强版：含量比、换手率、筹码分析、多维度情报）
@@ -176,168 +457,211 @@ class StockAnalysisPipeline:
             AnalysisResult 或 None（如果分析失败）
         """
         try:
-            # 获取股票名称（优先从实时行情获取真实名称）
-            stock_name = STOCK_NAME_MAP.get(code, '')
+            job = self._prepare_analysis(code)
+            job.news_context = self._search_news(code, job.stock_name)
+            return self._run_ai_analysis(job)
             
-            # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
-            realtime_quote = None
-            if not self.config.enable_realtime_quote:
-                logger.info(f"[{code}] 实时行情已禁用，将使用历史数据进行分析")
-            else:
-                try:
-                    realtime_quote = self.fetcher_manager.get_realtime_quote(code)
-                    if realtime_quote:
-                        # 使用实时行情返回的真实股票名称
-                        if realtime_quote.name:
-                            stock_name = realtime_quote.name
-                        # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
-                        volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
-                        turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
-                        logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
-                                  f"量比={volume_ratio}, 换手率={turnover_rate}% "
-                                  f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
-                    else:
-                        logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
-                except Exception as e:
-                    logger.warning(f"[{code}] 获取实时行情失败: {e}")
+        except Exception as e:
+            logger.error(f"[{code}] 分析失败: {e}")
+            logger.exception(f"[{code}] 详细错误信息:")
+            return None
 
-            # 若仍未获得股票名称，尝试通过数据源查询（Tushare Only 时仅用 Tushare）
-            if not stock_name or stock_name.startswith('股票'):
-                try:
-                    fetched_name = self.fetcher_manager.get_stock_name(code)
-                    if fetched_name:
-                        stock_name = fetched_name
-                        logger.info(f"[{code}] 股票名称已从数据源获取: {stock_name}")
-                except Exception as e:
-                    logger.debug(f"[{code}] 获取股票名称失败: {e}")
-            
-            # 如果还是没有名称，使用代码作为名称
-            if not stock_name:
-                stock_name = f'股票{code}'
-            
-            # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护
-            chip_data = None
+    def _prepare_analysis(self, code: str) -> 'StockAnalysisJob':
+        """
+        数据阶段：实时行情、筹码、技术面上下文与趋势分析
+        
+        Returns:
+            StockAnalysisJob（已包含增强上下文，尚未搜索和 AI 分析）
+        """
+        # 获取股票名称（优先从实时行情获取真实名称）
+        stock_name = STOCK_NAME_MAP.get(code, '')
+        
+        # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
+        realtime_quote = None
+        if not self.config.enable_realtime_quote:
+            logger.info(f"[{code}] 实时行情已禁用，将使用历史数据进行分析")
+        else:
             try:
-                chip_data = self.fetcher_manager.get_chip_distribution(code)
-                if chip_data:
-                    logger.info(f"[{code}] 筹码分布: 获利比例={chip_data.profit_ratio:.1%}, "
-                              f"90%集中度={chip_data.concentration_90:.2%}")
+                realtime_quote = self.fetcher_manager.get_realtime_quote(code)
+                if realtime_quote:
+                    # 使用实时行情返回的真实股票名称
+                    if realtime_quote.name:
+                        stock_name = realtime_quote.name
+                    # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
+                    volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
+                    turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
+                    logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
+                              f"量比={volume_ratio}, 换手率={turnover_rate}% "
+                              f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
                 else:
-                    logger.debug(f"[{code}] 筹码分布获取失败或已禁用")
+                    logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
             except Exception as e:
-                logger.warning(f"[{code}] 获取筹码分布失败: {e}")
-            
-            # Step 3: 趋势分析（基于交易理念）
-            trend_result: Optional[TrendAnalysisResult] = None
+                logger.warning(f"[{code}] 获取实时行情失败: {e}")
+
+        # 若仍未获得股票名称，尝试通过数据源查询（Tushare Only 时仅用 Tushare）
+        if not stock_name or stock_name.startswith('股票'):
             try:
-                # 获取历史数据进行趋势分析
-                context = self.db.get_analysis_context(code)
-                if context and 'raw_data' in context:
-                    import pandas as pd
-                    raw_data = context['raw_data']
-                    if isinstance(raw_data, list) and len(raw_data) > 0:
-                        df = pd.DataFrame(raw_data)
-                        trend_result = self.trend_analyzer.analyze(df, code)
-                        logger.info(f"[{code}] 趋势分析: {trend_result.trend_status.value}, "
-                                  f"买入信号={trend_result.buy_signal.value}, 评分={trend_result.signal_score}")
+                fetched_name = self.fetcher_manager.get_stock_name(code)
+                if fetched_name:
+                    stock_name = fetched_name
+                    logger.info(f"[{code}] 股票名称已从数据源获取: {stock_name}")
             except Exception as e:
-                logger.warning(f"[{code}] 趋势分析失败: {e}")
-            
-            # Step 4: 多维度情报搜索（最新消息+风险排查+业绩预期）
-            news_context = None
-            if self.search_service.is_available:
-                logger.info(f"[{code}] 开始多维度情报搜索...")
-                
-                # 使用多维度搜索（最多5次搜索）
-                intel_results = self.search_service.search_comprehensive_intel(
-                    stock_code=code,
-                    stock_name=stock_name,
-                    max_searches=5
-                )
-                
-                # 格式化情报报告
-                if intel_results:
-                    news_context = self.search_service.format_intel_report(intel_results, stock_name)
-                    total_results = sum(
-                        len(r.results) for r in intel_results.values() if r.success
-                    )
-                    logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
-                    logger.debug(f"[{code}] 情报搜索结果:\n{news_context}")
+                logger.debug(f"[{code}] 获取股票名称失败: {e}")
+        
+        # 如果还是没有名称，使用代码作为名称
+        if not stock_name:
+            stock_name = f'股票{code}'
+        
+        # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护
+        chip_data = None
+        try:
+            chip_data = self._get_chip_distribution(code)
+            if chip_data:
+                logger.info(f"[{code}] 筹码分布: 获利比例={chip_data.profit_ratio:.1%}, "
+                          f"90%集中度={chip_data.concentration_90:.2%}")
             else:
-                logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
-            
-            # Step 5: 获取分析上下文（技术面数据）
-            context = self.db.get_analysis_context(code)
-            if context and context.get('today'):
-                basic_fetched = context['today'].get('basic_fetched')
-                if basic_fetched is not None:
-                    logger.info(f"[{code}] daily_basic 已入库: {bool(basic_fetched)}")
-            
-            if context is None:
-                logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
-                from datetime import date
-                context = {
-                    'code': code,
-                    'stock_name': stock_name,
-                    'date': date.today().isoformat(),
-                    'data_missing': True,
-                    'today': {},
-                    'yesterday': {}
-                }
-            
-            # Step 6: 如果未启用实时行情且为 Tushare Only，使用 daily_basic 作为实时替代
-            if realtime_quote is None and getattr(self.config, "daily_basic_source", "tushare") == "tushare":
-                today_ctx = context.get('today', {}) if context else {}
-                basic_volume_ratio = today_ctx.get('volume_ratio_basic')
-                fallback_volume_ratio = basic_volume_ratio if basic_volume_ratio is not None else today_ctx.get('volume_ratio')
-                if any(
-                    v is not None for v in [
-                        fallback_volume_ratio,
-                        today_ctx.get('turnover_rate'),
-                        today_ctx.get('pe'),
-                        today_ctx.get('pb'),
-                        today_ctx.get('total_mv'),
-                        today_ctx.get('circ_mv'),
-                    ]
-                ):
-                    realtime_quote = UnifiedRealtimeQuote(
-                        code=code,
-                        name=stock_name,
-                        source=RealtimeSource.FALLBACK,
-                        price=today_ctx.get('close'),
-                        volume_ratio=fallback_volume_ratio,
-                        turnover_rate=today_ctx.get('turnover_rate'),
-                        pe_ratio=today_ctx.get('pe'),
-                        pb_ratio=today_ctx.get('pb'),
-                        total_mv=today_ctx.get('total_mv'),
-                        circ_mv=today_ctx.get('circ_mv'),
-                    )
-
-            # Step 7: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
-            enhanced_context = self._enhance_context(
-                context, 
-                realtime_quote, 
-                chip_data, 
-                trend_result,
-                stock_name  # 传入股票名称
-            )
-            
-            # Step 8: 调用 AI 分析（传入增强的上下文和新闻）
-            result = self.analyzer.analyze(enhanced_context, news_context=news_context)
-            if result and getattr(self.config, "daily_basic_source", "tushare") == "tushare":
-                basic_flag = None
-                if context and context.get('today'):
-                    basic_flag = context['today'].get('basic_fetched')
-                basic_text = f"daily_basic={bool(basic_flag)}" if basic_flag is not None else "daily_basic=unknown"
-                source_text = f"Tushare daily+daily_basic ({basic_text})"
-                result.data_sources = source_text if not result.data_sources else f"{result.data_sources} | {source_text}"
-            
-            return result
-            
+                logger.debug(f"[{code}] 筹码分布获取失败或已禁用")
         except Exception as e:
-            logger.error(f"[{code}] 分析失败: {e}")
-            logger.exception(f"[{code}] 详细错误信息:")
+            logger.warning(f"[{code}] 获取筹码分布失败: {e}")
+        
+        # Step 3: 获取分析上下文（技术面数据 + 历史K线，单次查询）
+        context = self.db.get_analysis_context(code, history_days=self.TREND_HISTORY_DAYS)
+        raw_data = context.pop('raw_data', None) if context else None
+        if context and context.get('today'):
+            basic_fetched = context['today'].get('basic_fetched')
+            if basic_fetched is not None:
+                logger.info(f"[{code}] daily_basic 已入库: {bool(basic_fetched)}")
+        
+        # Step 4: 趋势分析（基于交易理念）
+        trend_result: Optional[TrendAnalysisResult] = None
+        try:
+            if raw_data is not None and not raw_data.empty:
+                trend_result = self.trend_analyzer.analyze(raw_data, code)
+                logger.info(f"[{code}] 趋势分析: {trend_result.trend_status.value}, "
+                          f"买入信号={trend_result.buy_signal.value}, 评分={trend_result.signal_score}")
+        except Exception as e:
+            logger.warning(f"[{code}] 趋势分析失败: {e}")
+        
+        if context is None:
+            logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
+            from datetime import date
+            context = {
+                'code': code,
+                'stock_name': stock_name,
+                'date': date.today().isoformat(),
+                'data_missing': True,
+                'today': {},
+                'yesterday': {}
+            }
+        
+        # Step 6: 如果未启用实时行情且为 Tushare Only，使用 daily_basic 作为实时替代
+        if realtime_quote is None and getattr(self.config, "daily_basic_source", "tushare") == "tushare":
+            today_ctx = context.get('today', {}) if context else {}
+            basic_volume_ratio = today_ctx.get('volume_ratio_basic')
+            fallback_volume_ratio = basic_volume_ratio if basic_volume_ratio is not None else today_ctx.get('volume_ratio')
+            if any(
+                v is not None for v in [
+                    fallback_volume_ratio,
+                    today_ctx.get('turnover_rate'),
+                    today_ctx.get('pe'),
+                    today_ctx.get('pb'),
+                    today_ctx.get('total_mv'),
+                    today_ctx.get('circ_mv'),
+                ]
+            ):
+                realtime_quote = UnifiedRealtimeQuote(
+                    code=code,
+                    name=stock_name,
+                    source=RealtimeSource.FALLBACK,
+                    price=today_ctx.get('close'),
+                    volume_ratio=fallback_volume_ratio,
+                    turnover_rate=today_ctx.get('turnover_rate'),
+                    pe_ratio=today_ctx.get('pe'),
+                    pb_ratio=today_ctx.get('pb'),
+                    total_mv=today_ctx.get('total_mv'),
+                    circ_mv=today_ctx.get('circ_mv'),
+                )
+
+        # Step 7: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
+        enhanced_context = self._enhance_context(
+            context, 
+            realtime_quote, 
+            chip_data, 
+            trend_result,
+            stock_name  # 传入股票名称
+        )
+        
+        return StockAnalysisJob(
+            code=code,
+            stock_name=stock_name,
+            context=context,
+            enhanced_context=enhanced_context,
+        )
+
+    def _search_news(self, code: str, stock_name: str) -> Optional[str]:
+        """搜索阶段：多维度情报搜索（最新消息+风险排查+业绩预期），返回格式化的情报文本"""
+        if not self.search_service.is_available:
+            logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
             return None
+        
+        logger.info(f"[{code}] 开始多维度情报搜索...")
+        
+        # 使用多维度搜索（最多5次搜索）
+        intel_results = self.search_service.search_comprehensive_intel(
+            stock_code=code,
+            stock_name=stock_name,
+            max_searches=5
+        )
+        return self._format_news(code, stock_name, intel_results)
+    
+    async def _search_news_async(self, code: str, stock_name: str) -> Optional[str]:
+        """搜索阶段（异步版本）"""
+        if not self.search_service.is_available:
+            logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
+            return None
+        
+        logger.info(f"[{code}] 开始多维度情报搜索...")
+        intel_results = await self.search_service.search_comprehensive_intel_async(
+            stock_code=code,
+            stock_name=stock_name,
+            max_searches=5
+        )
+        return self._format_news(code, stock_name, intel_results)
+    
+    def _format_news(self, code: str, stock_name: str, intel_results) -> Optional[str]:
+        """格式化情报报告"""
+        if not intel_results:
+            return None
+        
+        news_context = self.search_service.format_intel_report(intel_results, stock_name)
+        total_results = sum(
+            len(r.results) for r in intel_results.values() if r.success
+        )
+        logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
+        logger.debug(f"[{code}] 情报搜索结果:\n{news_context}")
+        return news_context
+
+    def _run_ai_analysis(self, job: 'StockAnalysisJob') -> Optional[AnalysisResult]:
+        """AI 分析阶段：传入增强的上下文和新闻调用 LLM"""
+        result = self.analyzer.analyze(job.enhanced_context, news_context=job.news_context)
+        return self._annotate_data_sources(job, result)
+    
+    async def _run_ai_analysis_async(self, job: 'StockAnalysisJob') -> Optional[AnalysisResult]:
+        """AI 分析阶段（异步版本）"""
+        result = await self.analyzer.analyze_async(job.enhanced_context, news_context=job.news_context)
+        return self._annotate_data_sources(job, result)
+    
+    def _annotate_data_sources(self, job: 'StockAnalysisJob', result: Optional[AnalysisResult]) -> Optional[AnalysisResult]:
+        """Tushare 模式下在结果中标注 daily_basic 数据来源"""
+        context = job.context
+        if result and getattr(self.config, "daily_basic_source", "tushare") == "tushare":
+            basic_flag = None
+            if context and context.get('today'):
+                basic_flag = context['today'].get('basic_fetched')
+            basic_text = f"daily_basic={bool(basic_flag)}" if basic_flag is not None else "daily_basic=unknown"
+            source_text = f"Tushare daily+daily_basic ({basic_text})"
+            result.data_sources = source_text if not result.data_sources else f"{result.data_sources} | {source_text}"
+        return result
     
     def _enhance_context(
         self,
@@ -489,24 +813,8 @@ class StockAnalysisPipeline:
                 )
                 
                 # 单股推送模式（#55）：每分析完一只股票立即推送
-                if single_stock_notify and self.notifier.is_available():
-                    try:
-                        # 根据报告类型选择生成方法
-                        if report_type == ReportType.FULL:
-                            # 完整报告：使用决策仪表盘格式
-                            report_content = self.notifier.generate_dashboard_report([result])
-                            logger.info(f"[{code}] 使用完整报告格式")
-                        else:
-                            # 精简报告：使用单股报告格式（默认）
-                            report_content = self.notifier.generate_single_stock_report(result)
-                            logger.info(f"[{code}] 使用精简报告格式")
-                        
-                        if self.notifier.send(report_content):
-                            logger.info(f"[{code}] 单股推送成功")
-                        else:
-                            logger.warning(f"[{code}] 单股推送失败")
-                    except Exception as e:
-                        logger.error(f"[{code}] 单股推送异常: {e}")
+                if single_stock_notify:
+                    self._notify_single_stock(code, result, report_type)
             
             return result
             
@@ -515,6 +823,28 @@ class StockAnalysisPipeline:
             logger.exception(f"[{code}] 处理过程发生未知异常: {e}")
             return None
     
+    def _notify_single_stock(self, code: str, result: AnalysisResult, report_type: ReportType) -> None:
+        """单股推送（#55）：根据报告类型生成内容并立即推送"""
+        if not self.notifier.is_available():
+            return
+        try:
+            # 根据报告类型选择生成方法
+            if report_type == ReportType.FULL:
+                # 完整报告：使用决策仪表盘格式
+                report_content = self.notifier.generate_dashboard_report([result])
+                logger.info(f"[{code}] 使用完整报告格式")
+            else:
+                # 精简报告：使用单股报告格式（默认）
+                report_content = self.notifier.generate_single_stock_report(result)
+                logger.info(f"[{code}] 使用精简报告格式")
+            
+            if self.notifier.send(report_content):
+                logger.info(f"[{code}] 单股推送成功")
+            else:
+                logger.warning(f"[{code}] 单股推送失败")
+        except Exception as e:
+            logger.error(f"[{code}] 单股推送异常: {e}")
+    
     def run(
         self, 
         stock_codes: Optional[List[str]] = None,
@@ -526,7 +856,7 @@ class StockAnalysisPipeline:
         
         流程：
         1. 获取待分析的股票列表
-        2. 使用线程池并发处理
+        2. 并发处理：线程池（默认）/ 分阶段流水线（PIPELINE_MODE=staged）/ asyncio（PIPELINE_MODE=async）
         3. 收集分析结果
         4. 发送通知
         
@@ -538,9 +868,40 @@ class StockAnalysisPipeline:
         Returns:
             分析结果列表
         """
+        if self.config.pipeline_mode == "async":
+            return asyncio.run(self.run_async(stock_codes, dry_run=dry_run, send_notification=send_notification))
+        
         start_time = time.time()
         
-        # 使用配置中的股票列表
+        stock_codes = self._resolve_stock_codes(stock_codes)
+        if not stock_codes:
+            return []
+        
+        self._prepare_run(stock_codes, dry_run)
+        single_stock_notify, report_type, analysis_delay = self._run_options()
+        
+        if self.config.pipeline_mode == "staged":
+            results = self._run_staged(
+                stock_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+            )
+        else:
+            results = self._run_pool(
+                stock_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+            )
+        
+        self._finish_run(stock_codes, results, start_time, dry_run, send_notification, single_stock_notify)
+        return results
+    
+    def _resolve_stock_codes(self, stock_codes: Optional[List[str]]) -> List[str]:
+        """未指定股票列表时使用配置中的自选股"""
         if stock_codes is None:
             self.config.refresh_stock_list()
             stock_codes = self.config.stock_list
@@ -548,18 +909,35 @@ class StockAnalysisPipeline:
         if not stock_codes:
             logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
             return []
-        
+        return stock_codes
+    
+    def _prepare_run(self, stock_codes: List[str], dry_run: bool) -> None:
+        """批量预处理：日线入库 / 批量下载 / 最新日期 / 实时行情预取"""
         logger.info(f"===== 开始分析 {len(stock_codes)} 只股票 =====")
         logger.info(f"股票列表: {', '.join(stock_codes)}")
         logger.info(f"并发数: {self.max_workers}, 模式: {'仅获取数据' if dry_run else '完整分析'}")
         
+        # === 按交易日批量入库日线（Tushare 全市场模式，减少逐只调用）===
+        self.ingest_market_daily(stock_codes)
+        # === 美股/港股日线批量下载（yfinance 多代码单次请求）===
+        self.prefetch_daily_data(stock_codes)
+        # === 各股票库内最新日期（一次分组查询，供增量获取使用）===
+        self._last_stored_dates = self.db.get_last_dates(stock_codes)
+        
         # === 批量预取实时行情（优化：避免每只股票都触发全量拉取）===
         # 只有股票数量 >= 5 时才进行预取，少量股票直接逐个查询更高效
         if len(stock_codes) >= 5:
             prefetch_count = self.fetcher_manager.prefetch_realtime_quotes(stock_codes)
             if prefetch_count > 0:
                 logger.info(f"已启用批量预取架构：一次拉取全市场数据，{len(stock_codes)} 只股票共享缓存")
+    
+    def _run_options(self) -> Tuple[bool, ReportType, float]:
+        """
+        读取单股推送、报告类型和分析间隔配置
         
+        Returns:
+            (single_stock_notify, report_type, analysis_delay)
+        """
         # 单股推送模式（#55）：从配置读取
         single_stock_notify = getattr(self.config, 'single_stock_notify', False)
         # Issue #119: 从配置读取报告类型
@@ -570,7 +948,161 @@ class StockAnalysisPipeline:
 
         if single_stock_notify:
             logger.info(f"已启用单股推送模式：每分析完一只股票立即推送（报告类型: {report_type_str}）")
+        return single_stock_notify, report_type, analysis_delay
+    
+    def _finish_run(
+        self,
+        stock_codes: List[str],
+        results: List[AnalysisResult],
+        start_time: float,
+        dry_run: bool,
+        send_notification: bool,
+        single_stock_notify: bool,
+    ) -> None:
+        """统计并发送汇总通知"""
+        # 统计
+        elapsed_time = time.time() - start_time
+        
+        # dry-run 模式下，数据获取成功即视为成功
+        if dry_run:
+            # 检查哪些股票的数据今天已存在
+            success_count = sum(1 for code in stock_codes if self.db.has_today_data(code))
+            fail_count = len(stock_codes) - success_count
+        else:
+            success_count = len(results)
+            fail_count = len(stock_codes) - success_count
+        
+        logger.info("===== 分析完成 =====")
+        logger.info(f"成功: {success_count}, 失败: {fail_count}, 耗时: {elapsed_time:.2f} 秒")
+        # 缓存/熔断统计：评估 REALTIME_CACHE_TTL 等配置是否真正节省了请求
+        get_cache_registry().log_stats()
+        # 限速统计：等待时间过长说明 MAX_WORKERS 已超出上游承受能力
+        get_rate_limiter_registry().log_stats()
+        
+        # 分析结果落库（单个事务批量写入）
+        if results and not dry_run:
+            self._save_analysis_results(results)
+        
+        # 发送通知（单股推送模式下跳过汇总推送，避免重复）
+        if results and send_notification and not dry_run:
+            if single_stock_notify:
+                # 单股推送模式：只保存汇总报告，不再重复推送
+                logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
+                self._send_notifications(results, skip_push=True)
+            else:
+                self._send_notifications(results)
+        
+        # 连接复用统计（搜索 / 通知共享 HTTP 连接池）
+        get_http_pool().log_stats()
+    
+    def _save_analysis_results(self, results: List[AnalysisResult]) -> None:
+        """批量保存本次运行的分析结果，失败不影响推送"""
+        try:
+            self.db.save_analysis_results(
+                [asdict(result) for result in results],
+                report_type=self.config.report_type,
+            )
+        except Exception as e:
+            logger.warning(f"保存分析结果失败: {e}")
+    
+    async def run_async(
+        self,
+        stock_codes: Optional[List[str]] = None,
+        dry_run: bool = False,
+        send_notification: bool = True
+    ) -> List[AnalysisResult]:
+        """
+        异步运行完整的分析流程（PIPELINE_MODE=async 时 run() 会调用此方法）
+        
+        - 搜索（Bocha 使用 httpx 异步请求）和 AI 分析（Gemini / OpenAI 异步客户端）直接在事件循环中进行
+        - akshare / efinance 等阻塞的数据源调用和通知推送放入有界线程池（大小为 max_workers）
+        - 同时在途的搜索 + AI 分析数量由 ASYNC_MAX_INFLIGHT 限制
+        
+        大量股票同时等待网络 I/O 时只占用少量线程。
+        
+        Args:
+            stock_codes: 股票代码列表（可选，默认使用配置中的自选股）
+            dry_run: 是否仅获取数据不分析
+            send_notification: 是否发送推送通知
+            
+        Returns:
+            分析结果列表
+        """
+        start_time = time.time()
         
+        stock_codes = self._resolve_stock_codes(stock_codes)
+        if not stock_codes:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        # 注意：阻塞调用的线程数保持与 max_workers 一致（默认3）以避免触发反爬
+        blocking_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-io")
+        
+        def blocking(func, *args, **kwargs):
+            return loop.run_in_executor(blocking_executor, functools.partial(func, *args, **kwargs))
+        
+        try:
+            await blocking(self._prepare_run, stock_codes, dry_run)
+            single_stock_notify, report_type, analysis_delay = self._run_options()
+            single_stock_notify = single_stock_notify and send_notification
+            inflight = asyncio.Semaphore(max(1, self.config.async_max_inflight))
+            logger.info(f"异步模式: 阻塞调用线程数 {self.max_workers}, 最大在途分析数 {self.config.async_max_inflight}")
+            
+            async def process(code: str) -> Optional[AnalysisResult]:
+                try:
+                    logger.info(f"========== 开始处理 {code} ==========")
+                    success, error = await blocking(self.fetch_and_save_stock_data, code)
+                    if not success:
+                        logger.warning(f"[{code}] 数据获取失败: {error}")
+                        # 即使获取失败，也尝试用已有数据分析
+                    if dry_run:
+                        logger.info(f"[{code}] 跳过 AI 分析（dry-run 模式）")
+                        return None
+                    
+                    job = await blocking(self._prepare_analysis, code)
+                    async with inflight:
+                        try:
+                            job.news_context = await self._search_news_async(code, job.stock_name)
+                        except Exception as e:
+                            # 搜索失败不影响后续 AI 分析
+                            logger.warning(f"[{code}] 情报搜索失败: {e}")
+                        result = await self._run_ai_analysis_async(job)
+                        # Issue #128: 分析间隔，避免触发 AI API 限流
+                        if analysis_delay > 0:
+                            await asyncio.sleep(analysis_delay)
+                    
+                    if result:
+                        logger.info(
+                            f"[{code}] 分析完成: {result.operation_advice}, "
+                            f"评分 {result.sentiment_score}"
+                        )
+                        if single_stock_notify:
+                            await blocking(self._notify_single_stock, code, result, report_type)
+                    return result
+                except Exception as e:
+                    # 捕获所有异常，确保单股失败不影响整体
+                    logger.exception(f"[{code}] 处理过程发生未知异常: {e}")
+                    return None
+            
+            outputs = await asyncio.gather(*(process(code) for code in stock_codes))
+            results = [result for result in outputs if result]
+            
+            await blocking(
+                self._finish_run, stock_codes, results, start_time, dry_run, send_notification, single_stock_notify
+            )
+            return results
+        finally:
+            blocking_executor.shutdown(wait=False)
+    
+    def _run_pool(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float,
+    ) -> List[AnalysisResult]:
+        """线程池模式：每个工作线程串行完成单只股票的全部步骤"""
         results: List[AnalysisResult] = []
         
         # 使用线程池并发处理
@@ -582,7 +1114,7 @@ class StockAnalysisPipeline:
                     self.process_single_stock,
                     code,
                     skip_analysis=dry_run,
-                    single_stock_notify=single_stock_notify and send_notification,
+                    single_stock_notify=single_stock_notify,
                     report_type=report_type  # Issue #119: 传递报告类型
                 ): code
                 for code in stock_codes
@@ -604,32 +1136,71 @@ class StockAnalysisPipeline:
                 except Exception as e:
                     logger.error(f"[{code}] 任务执行失败: {e}")
         
-        # 统计
-        elapsed_time = time.time() - start_time
-        
-        # dry-run 模式下，数据获取成功即视为成功
-        if dry_run:
-            # 检查哪些股票的数据今天已存在
-            success_count = sum(1 for code in stock_codes if self.db.has_today_data(code))
-            fail_count = len(stock_codes) - success_count
-        else:
-            success_count = len(results)
-            fail_count = len(stock_codes) - success_count
-        
-        logger.info("===== 分析完成 =====")
-        logger.info(f"成功: {success_count}, 失败: {fail_count}, 耗时: {elapsed_time:.2f} 秒")
-        
-        # 发送通知（单股推送模式下跳过汇总推送，避免重复）
-        if results and send_notification and not dry_run:
-            if single_stock_notify:
-                # 单股推送模式：只保存汇总报告，不再重复推送
-                logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
-                self._send_notifications(results, skip_push=True)
-            else:
-                self._send_notifications(results)
-        
         return results
-    
+
+    def _run_staged(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float,
+    ) -> List[AnalysisResult]:
+        """
+        分阶段模式：数据 → 搜索 → AI 分析 → 单股推送，阶段之间用有界队列衔接
+
+        数据阶段沿用 max_workers（低并发防封禁），搜索和 AI 阶段各自独立并发，
+        LLM 等待期间数据抓取继续进行，总耗时趋近最慢的阶段而不是各阶段之和。
+        """
+        def data_stage(code: str) -> Optional[StockAnalysisJob]:
+            logger.info(f"========== 开始处理 {code} ==========")
+            success, error = self.fetch_and_save_stock_data(code)
+            if not success:
+                logger.warning(f"[{code}] 数据获取失败: {error}")
+                # 即使获取失败，也尝试用已有数据分析
+            if dry_run:
+                logger.info(f"[{code}] 跳过 AI 分析（dry-run 模式）")
+                return None
+            return self._prepare_analysis(code)
+
+        def search_stage(job: StockAnalysisJob) -> StockAnalysisJob:
+            try:
+                job.news_context = self._search_news(job.code, job.stock_name)
+            except Exception as e:
+                # 搜索失败不影响后续 AI 分析
+                logger.warning(f"[{job.code}] 情报搜索失败: {e}")
+            return job
+
+        def llm_stage(job: StockAnalysisJob) -> Optional[AnalysisResult]:
+            result = self._run_ai_analysis(job)
+            if result:
+                logger.info(
+                    f"[{job.code}] 分析完成: {result.operation_advice}, "
+                    f"评分 {result.sentiment_score}"
+                )
+            # Issue #128: 分析间隔，避免触发 AI API 限流
+            if analysis_delay > 0:
+                time.sleep(analysis_delay)
+            return result
+
+        def notify_stage(result: AnalysisResult) -> AnalysisResult:
+            self._notify_single_stock(result.code, result, report_type)
+            return result
+
+        stages = [Stage("data", data_stage, workers=self.max_workers)]
+        if not dry_run:
+            stages.append(Stage("search", search_stage, workers=self.config.stage_search_workers))
+            stages.append(Stage("llm", llm_stage, workers=self.config.stage_llm_workers))
+            if single_stock_notify:
+                stages.append(Stage("notify", notify_stage, workers=1))
+
+        logger.info(
+            "分阶段流水线: " + " → ".join(f"{stage.name}({stage.workers})" for stage in stages)
+            + f", 队列容量 {self.config.stage_queue_size}"
+        )
+        executor = StagedExecutor(stages, queue_size=self.config.stage_queue_size)
+        return executor.run(stock_codes)
+
     def _send_notifications(self, results: List[AnalysisResult], skip_push: bool = False) -> None:
         """
         发送分析结果通知
@@ -659,37 +1230,20 @@ class StockAnalysisPipeline:
                 channels = self.notifier.get_available_channels()
                 context_success = self.notifier.send_to_context(report)
 
-                # 企业微信：只发精简版（平台限制）
-                wechat_success = False
+                # 企业微信：只发精简版（平台限制）；其他渠道发完整报告
+                # （避免自定义 Webhook 被 wechat 截断逻辑污染）
+                overrides = {}
                 if NotificationChannel.WECHAT in channels:
                     dashboard_content = self.notifier.generate_wechat_dashboard(results)
                     logger.info(f"企业微信仪表盘长度: {len(dashboard_content)} 字符")
                     logger.debug(f"企业微信推送内容:\n{dashboard_content}")
-                    wechat_success = self.notifier.send_to_wechat(dashboard_content)
-
-                # 其他渠道：发完整报告（避免自定义 Webhook 被 wechat 截断逻辑污染）
-                non_wechat_success = False
-                for channel in channels:
-                    if channel == NotificationChannel.WECHAT:
-                        continue
-                    if channel == NotificationChannel.FEISHU:
-                        non_wechat_success = self.notifier.send_to_feishu(report) or non_wechat_success
-                    elif channel == NotificationChannel.TELEGRAM:
-                        non_wechat_success = self.notifier.send_to_telegram(report) or non_wechat_success
-                    elif channel == NotificationChannel.EMAIL:
-                        non_wechat_success = self.notifier.send_to_email(report) or non_wechat_success
-                    elif channel == NotificationChannel.CUSTOM:
-                        non_wechat_success = self.notifier.send_to_custom(report) or non_wechat_success
-                    elif channel == NotificationChannel.PUSHPLUS:
-                        non_wechat_success = self.notifier.send_to_pushplus(report) or non_wechat_success
-                    elif channel == NotificationChannel.DISCORD:
-                        non_wechat_success = self.notifier.send_to_discord(report) or non_wechat_success
-                    elif channel == NotificationChannel.PUSHOVER:
-                        non_wechat_success = self.notifier.send_to_pushover(report) or non_wechat_success
-                    else:
-                        logger.warning(f"未知通知渠道: {channel}")
-
-                success = wechat_success or non_wechat_success or context_success
+                    overrides[NotificationChannel.WECHAT] = dashboard_content
+
+                # 各渠道并发发送，单渠道超时不阻塞其他渠道
+                channel_results = self.notifier.send_to_channels(report, channels, overrides=overrides)
+                channel_success = any(r.success for r in channel_results)
+
+                success = channel_success or context_success
                 if success:
                     logger.info("决策仪表盘推送成功")
                 else:
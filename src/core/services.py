@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 共享服务容器
+===================================
+
+职责：
+1. 长驻进程（WebUI / Bot）中复用已初始化的数据源、AI 分析器、搜索服务
+2. 每次请求只创建轻量的 StockAnalysisPipeline / NotificationService（携带 source_message 等请求上下文）
+3. 配置重新加载（Config 单例被替换）后自动重建
+
+共享实例的线程安全性与 pool 模式一致：单次运行中它们本就被 MAX_WORKERS 个线程同时使用。
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from src.config import Config, get_config
+from src.core.pipeline import StockAnalysisPipeline
+from src.analyzer import GeminiAnalyzer
+from src.notification import NotificationService
+from src.search_service import SearchService
+from src.stock_analyzer import StockTrendAnalyzer
+from data_provider import DataFetcherManager
+from bot.models import BotMessage
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineServices:
+    """
+    共享服务容器（线程安全、懒加载）
+
+    用法：
+        services = get_pipeline_services()
+        pipeline = services.create_pipeline(source_message=message)
+        result = pipeline.process_single_stock(code, ...)
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or get_config()
+        self._lock = threading.RLock()
+        self._fetcher_manager: Optional[DataFetcherManager] = None
+        self._analyzer: Optional[GeminiAnalyzer] = None
+        self._search_service: Optional[SearchService] = None
+        self._trend_analyzer: Optional[StockTrendAnalyzer] = None
+
+    @property
+    def fetcher_manager(self) -> DataFetcherManager:
+        if self._fetcher_manager is None:
+            with self._lock:
+                if self._fetcher_manager is None:
+                    self._fetcher_manager = DataFetcherManager()
+        return self._fetcher_manager
+
+    @property
+    def analyzer(self) -> GeminiAnalyzer:
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._analyzer = GeminiAnalyzer()
+        return self._analyzer
+
+    @property
+    def search_service(self) -> SearchService:
+        if self._search_service is None:
+            with self._lock:
+                if self._search_service is None:
+                    self._search_service = SearchService(
+                        bocha_keys=self.config.bocha_api_keys,
+                        tavily_keys=self.config.tavily_api_keys,
+                        serpapi_keys=self.config.serpapi_keys,
+                    )
+        return self._search_service
+
+    @property
+    def trend_analyzer(self) -> StockTrendAnalyzer:
+        if self._trend_analyzer is None:
+            with self._lock:
+                if self._trend_analyzer is None:
+                    self._trend_analyzer = StockTrendAnalyzer()
+        return self._trend_analyzer
+
+    @property
+    def has_llm(self) -> bool:
+        """是否配置了 AI 模型（Gemini 或 OpenAI 兼容）"""
+        return bool(self.config.gemini_api_key or self.config.openai_api_key)
+
+    def create_pipeline(
+        self,
+        source_message: Optional[BotMessage] = None,
+        max_workers: Optional[int] = None,
+    ) -> StockAnalysisPipeline:
+        """创建注入共享服务的流水线（每次请求一个，运行状态互不影响）"""
+        return StockAnalysisPipeline(
+            config=self.config,
+            max_workers=max_workers,
+            source_message=source_message,
+            fetcher_manager=self.fetcher_manager,
+            analyzer=self.analyzer,
+            search_service=self.search_service,
+            trend_analyzer=self.trend_analyzer,
+        )
+
+    def create_notifier(self, source_message: Optional[BotMessage] = None) -> NotificationService:
+        """创建通知服务（仅读取配置，开销很小，按请求创建以隔离 source_message）"""
+        return NotificationService(source_message=source_message)
+
+
+_services: Optional[PipelineServices] = None
+_services_lock = threading.Lock()
+
+
+def get_pipeline_services() -> PipelineServices:
+    """获取全局共享服务容器（配置单例被替换后自动重建）"""
+    global _services
+    config = get_config()
+    if _services is None or _services.config is not config:
+        with _services_lock:
+            if _services is None or _services.config is not config:
+                if _services is not None:
+                    logger.info("[服务容器] 配置已重新加载，重建共享服务")
+                _services = PipelineServices(config)
+    return _services
+
+
+def reset_pipeline_services() -> None:
+    """丢弃已初始化的共享服务（下次获取时重建）"""
+    global _services
+    with _services_lock:
+        _services = None
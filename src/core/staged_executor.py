@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 分阶段流水线执行器
+===================================
+
+职责：
+1. 将单股处理拆成多个阶段（数据 → 搜索 → AI 分析 → 推送）
+2. 阶段之间使用有界队列衔接，每个阶段独立控制并发数
+3. 慢阶段（如 LLM）与限速阶段（如数据抓取）互相重叠，总耗时趋近最慢阶段
+
+阶段函数返回 None 表示该任务在此阶段终止（失败或无需继续），不会进入下一阶段。
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_SENTINEL = object()
+
+
+@dataclass
+class Stage:
+    """流水线阶段定义"""
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+    # 运行统计
+    processed: int = 0
+    dropped: int = 0
+    busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, elapsed: float, passed: bool) -> None:
+        with self._lock:
+            self.busy_seconds += elapsed
+            if passed:
+                self.processed += 1
+            else:
+                self.dropped += 1
+
+
+class StagedExecutor:
+    """
+    有界队列衔接的多阶段执行器
+
+    用法：
+        executor = StagedExecutor([
+            Stage("data", fetch, workers=3),
+            Stage("llm", analyze, workers=2),
+        ], queue_size=4)
+        outputs = executor.run(items)
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        if not stages:
+            raise ValueError("至少需要一个阶段")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        执行流水线，阻塞直到所有任务完成
+
+        Args:
+            items: 输入任务（第一个阶段的参数）
+
+        Returns:
+            最后一个阶段的非 None 输出（按完成顺序）
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        outputs: List[Any] = []
+        outputs_lock = threading.Lock()
+        threads: List[threading.Thread] = []
+
+        for index, stage in enumerate(self.stages):
+            workers = max(1, stage.workers)
+            remaining = {'count': workers}
+            remaining_lock = threading.Lock()
+            next_queue = queues[index + 1] if index + 1 < len(self.stages) else None
+            next_workers = max(1, self.stages[index + 1].workers) if next_queue is not None else 0
+
+            def on_worker_exit(remaining=remaining, remaining_lock=remaining_lock,
+                               next_queue=next_queue, next_workers=next_workers):
+                # 本阶段最后一个工作线程退出时，通知下一阶段结束
+                with remaining_lock:
+                    remaining['count'] -= 1
+                    last = remaining['count'] == 0
+                if last and next_queue is not None:
+                    for _ in range(next_workers):
+                        next_queue.put(_SENTINEL)
+
+            for worker_id in range(workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[index], next_queue, outputs, outputs_lock, on_worker_exit),
+                    name=f"stage-{stage.name}-{worker_id}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        # 生产者：按队列容量投递任务，队列满时阻塞（背压）
+        first_workers = max(1, self.stages[0].workers)
+        for item in items:
+            queues[0].put(item)
+        for _ in range(first_workers):
+            queues[0].put(_SENTINEL)
+
+        for thread in threads:
+            thread.join()
+
+        self.log_stats()
+        return outputs
+
+    @staticmethod
+    def _worker(
+        stage: Stage,
+        in_queue: queue.Queue,
+        out_queue: Optional[queue.Queue],
+        outputs: List[Any],
+        outputs_lock: threading.Lock,
+        on_exit: Callable[[], None],
+    ) -> None:
+        try:
+            while True:
+                item = in_queue.get()
+                if item is _SENTINEL:
+                    break
+                start = time.time()
+                try:
+                    output = stage.func(item)
+                except Exception as e:
+                    logger.exception(f"[流水线] 阶段 {stage.name} 处理异常: {e}")
+                    output = None
+                stage.record(time.time() - start, output is not None)
+                if output is None:
+                    continue
+                if out_queue is not None:
+                    out_queue.put(output)
+                else:
+                    with outputs_lock:
+                        outputs.append(output)
+        finally:
+            on_exit()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各阶段统计：处理数、终止数、累计耗时"""
+        return {
+            stage.name: {
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'dropped': stage.dropped,
+                'busy_seconds': round(stage.busy_seconds, 2),
+            }
+            for stage in self.stages
+        }
+
+    def log_stats(self) -> None:
+        parts = [
+            f"{name}(并发{s['workers']}): 完成 {s['processed']}, 终止 {s['dropped']}, 累计 {s['busy_seconds']}s"
+            for name, s in self.get_stats().items()
+        ]
+        logger.info("[流水线] 阶段统计: " + " | ".join(parts))
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 共享 HTTP 连接池
+===================================
+
+职责：
+1. 为搜索、通知、机器人等模块提供共享的 requests.Session（按用途命名）
+2. 每个 Session 内按主机维护 keep-alive 连接池，避免每次请求重新 DNS / TCP / TLS 握手
+3. 统一连接池大小、默认超时和重试策略（HTTP_POOL_SIZE / HTTP_TIMEOUT / HTTP_MAX_RETRIES）
+4. 按主机统计请求数与新建连接数，评估连接复用率
+
+重试策略：
+- 连接失败（请求未发出）对所有方法重试
+- 读取超时和 429/5xx 状态码只对幂等方法（GET 等）重试，POST 推送不会重复发送
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class HttpStats:
+    """按主机统计请求数和新建连接数（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = {'requests': 0, 'connections': 0}
+        return stats
+
+    def record_request(self, host: Optional[str]) -> None:
+        with self._lock:
+            self._host(host or 'unknown')['requests'] += 1
+
+    def record_connection(self, host: Optional[str]) -> None:
+        with self._lock:
+            self._host(host or 'unknown')['connections'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            {主机: {'requests', 'connections', 'reuse_rate'}}
+            reuse_rate = 1 - 新建连接数 / 请求数
+        """
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                requests_count = stats['requests']
+                reuse = 1 - stats['connections'] / requests_count if requests_count else 0.0
+                result[host] = {**stats, 'reuse_rate': round(max(0.0, reuse), 3)}
+            return result
+
+
+def _counting_pool_class(base: type, stats: HttpStats) -> type:
+    """创建在新建连接时计数的 urllib3 连接池类"""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.record_connection(self.host)
+            return super()._new_conn()
+
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter：统计每个主机的新建连接数（包括经代理的连接）"""
+
+    def __init__(self, stats: HttpStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def _install_counters(self, manager) -> None:
+        manager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self._stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self._stats),
+        }
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._install_counters(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        is_new = proxy not in self.proxy_manager
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if is_new:
+            self._install_counters(manager)
+        return manager
+
+
+class PooledSession(requests.Session):
+    """
+    带默认超时和请求计数的 Session
+
+    调用方未显式传入 timeout 时使用 HTTP_TIMEOUT，避免请求无限阻塞。
+    """
+
+    def __init__(self, name: str, stats: HttpStats, timeout: float):
+        super().__init__()
+        self.name = name
+        self._stats = stats
+        self._default_timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self._default_timeout
+        self._stats.record_request(urlparse(url).hostname)
+        return super().request(method, url, *args, **kwargs)
+
+
+class HttpSessionPool:
+    """
+    共享 Session 注册表
+
+    同名 Session 只创建一次，例如：
+    - search: Bocha / SerpAPI
+    - notification: 企业微信 / 飞书 / Telegram / Discord 等推送
+    - bot: 钉钉 sessionWebhook 等机器人回复
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = 10.0, max_retries: int = 2):
+        """
+        Args:
+            pool_size: 每个主机保持的最大空闲连接数
+            timeout: 默认超时（秒）
+            max_retries: 最大重试次数
+        """
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, PooledSession] = {}
+        self._stats: Dict[str, HttpStats] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'HttpSessionPool':
+        """根据 Config 创建连接池"""
+        return cls(
+            pool_size=int(getattr(config, 'http_pool_size', 10)),
+            timeout=float(getattr(config, 'http_timeout', 10)),
+            max_retries=int(getattr(config, 'http_max_retries', 2)),
+        )
+
+    def _build_retry(self) -> Retry:
+        return Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+
+    def session(self, name: str = 'default') -> PooledSession:
+        """获取或创建指定用途的共享 Session"""
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                stats = HttpStats()
+                session = PooledSession(name, stats, self.timeout)
+                adapter = _CountingAdapter(
+                    stats,
+                    pool_connections=self.pool_size,
+                    pool_maxsize=self.pool_size,
+                    max_retries=self._build_retry(),
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[name] = session
+                self._stats[name] = stats
+                logger.debug(f"[HTTP] 创建共享连接池 {name}: 每主机 {self.pool_size} 连接, "
+                             f"超时 {self.timeout}s, 重试 {self.max_retries} 次")
+            return session
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{Session 名称: {主机: 统计}}"""
+        return {name: stats.snapshot() for name, stats in list(self._stats.items())}
+
+    def log_stats(self) -> None:
+        """将连接复用统计输出到日志"""
+        for name, hosts in self.get_stats().items():
+            for host, stats in hosts.items():
+                if not stats['requests']:
+                    continue
+                logger.info(f"[HTTP统计] {name} {host}: 请求 {stats['requests']} 次, "
+                            f"新建连接 {stats['connections']} 个, 复用率 {stats['reuse_rate']:.0%}")
+
+    def close(self) -> None:
+        """关闭所有 Session（释放连接）"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._stats.clear()
+
+
+_pool: Optional[HttpSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HttpSessionPool:
+    """获取全局共享连接池（首次调用时根据 Config 创建）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    from src.config import get_config
+                    _pool = HttpSessionPool.from_config(get_config())
+                except Exception as e:
+                    logger.warning(f"[HTTP] 读取配置失败，使用默认连接池参数: {e}")
+                    _pool = HttpSessionPool()
+    return _pool
+
+
+def get_http_session(name: str = 'default') -> PooledSession:
+    """获取指定用途的共享 Session"""
+    return get_http_pool().session(name)
@@ -22,6 +22,7 @@ import yfinance as yf
 
 from src.config import get_config
 from src.search_service import SearchService
+from data_provider.realtime_types import get_cache_registry
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +99,9 @@ class MarketAnalyzer:
         'sh000300': '沪深300',
     }
     
+    # 可复用的全量 A 股行情快照（与个股实时行情共享缓存），按优先级
+    SHARED_SPOT_SNAPSHOTS = ('akshare_em', 'efinance')
+    
     def __init__(self, search_service: Optional[SearchService] = None, analyzer=None):
         """
         初始化大盘分析器
@@ -213,14 +217,31 @@ class MarketAnalyzer:
             'sh000300': ('000300.SS', '沪深300'),
         }
 
-        try:
-            for ak_code, (yf_code, name) in yf_mapping.items():
-                if ak_code not in self.MAIN_INDICES:
-                    continue
+        targets = {
+            yf_code: (ak_code, name)
+            for ak_code, (yf_code, name) in yf_mapping.items()
+            if ak_code in self.MAIN_INDICES
+        }
+        if not targets:
+            return indices
 
-                ticker = yf.Ticker(yf_code)
+        try:
+            # 一次请求下载全部指数（group_by='ticker' 便于按代码拆分）
+            data = yf.download(
+                tickers=list(targets),
+                period='5d',
+                progress=False,
+                auto_adjust=False,
+                group_by='ticker',
+                threads=True,
+            )
+            tickers = data.columns.get_level_values(0) if isinstance(data.columns, pd.MultiIndex) else []
+
+            for yf_code, (ak_code, name) in targets.items():
                 try:
-                    hist = ticker.history(period='2d')
+                    if yf_code not in tickers:
+                        continue
+                    hist = data[yf_code].dropna(subset=['Close'])
                     if hist.empty:
                         continue
 
@@ -260,27 +281,28 @@ class MarketAnalyzer:
         try:
             logger.info("[大盘] 获取市场涨跌统计...")
             
-            # 获取全部A股实时行情
-            df = self._call_akshare_with_retry(ak.stock_zh_a_spot_em, "A股实时行情", attempts=2)
+            # 获取全部A股实时行情：优先复用个股流程已下载的快照
+            df = self._get_shared_spot_snapshot()
+            if df is None:
+                df = self._call_akshare_with_retry(ak.stock_zh_a_spot_em, "A股实时行情", attempts=2)
             
             if df is not None and not df.empty:
-                # 涨跌统计
+                # 涨跌统计（快照为共享数据，只读不改）
                 change_col = '涨跌幅'
                 if change_col in df.columns:
-                    df[change_col] = pd.to_numeric(df[change_col], errors='coerce')
-                    overview.up_count = len(df[df[change_col] > 0])
-                    overview.down_count = len(df[df[change_col] < 0])
-                    overview.flat_count = len(df[df[change_col] == 0])
+                    change = pd.to_numeric(df[change_col], errors='coerce')
+                    overview.up_count = int((change > 0).sum())
+                    overview.down_count = int((change < 0).sum())
+                    overview.flat_count = int((change == 0).sum())
                     
                     # 涨停跌停统计（涨跌幅 >= 9.9% 或 <= -9.9%）
-                    overview.limit_up_count = len(df[df[change_col] >= 9.9])
-                    overview.limit_down_count = len(df[df[change_col] <= -9.9])
+                    overview.limit_up_count = int((change >= 9.9).sum())
+                    overview.limit_down_count = int((change <= -9.9).sum())
                 
                 # 两市成交额
                 amount_col = '成交额'
                 if amount_col in df.columns:
-                    df[amount_col] = pd.to_numeric(df[amount_col], errors='coerce')
-                    overview.total_amount = df[amount_col].sum() / 1e8  # 转为亿元
+                    overview.total_amount = pd.to_numeric(df[amount_col], errors='coerce').sum() / 1e8  # 转为亿元
                 
                 logger.info(f"[大盘] 涨:{overview.up_count} 跌:{overview.down_count} 平:{overview.flat_count} "
                           f"涨停:{overview.limit_up_count} 跌停:{overview.limit_down_count} "
@@ -289,6 +311,31 @@ class MarketAnalyzer:
         except Exception as e:
             logger.error(f"[大盘] 获取涨跌统计失败: {e}")
     
+    def _get_shared_spot_snapshot(self) -> Optional[pd.DataFrame]:
+        """
+        获取个股流程已缓存的全量 A 股行情快照
+        
+        快照年龄不超过 MARKET_SNAPSHOT_MAX_AGE 时直接复用，避免再次下载 stock_zh_a_spot_em。
+        
+        Returns:
+            原始快照 DataFrame，无可用快照返回 None
+        """
+        max_age = getattr(self.config, 'market_snapshot_max_age', 1800)
+        if max_age <= 0:
+            return None
+        registry = get_cache_registry()
+        for name in self.SHARED_SPOT_SNAPSHOTS:
+            store = registry.get_store(name)
+            if store is None or store.is_empty():
+                continue
+            age = store.age()
+            if age > max_age:
+                logger.debug(f"[大盘] {name} 快照已 {age:.0f}s，超过 {max_age}s，不复用")
+                continue
+            logger.info(f"[大盘] 复用 {name} 全量行情快照（{age:.0f}s 前，{len(store)} 只），跳过重复下载")
+            return store.data
+        return None
+    
     def _get_sector_rankings(self, overview: MarketOverview):
         """获取板块涨跌榜"""
         try:
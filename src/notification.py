@@ -19,15 +19,17 @@ import logging
 import json
 import smtplib
 import re
+import time
 import markdown2
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
 from enum import Enum
 
-import requests
 try:
     import discord
     discord_available = True
@@ -35,6 +37,7 @@ except ImportError:
     discord_available = False
 
 from src.config import get_config
+from src.http_client import get_http_session
 from src.analyzer import AnalysisResult
 from src.formatters import format_feishu_markdown
 from bot.models import BotMessage
@@ -104,6 +107,30 @@ class ChannelDetector:
         return names.get(channel, "未知渠道")
 
 
+@dataclass
+class ChannelResult:
+    """单个渠道的推送结果"""
+    channel: NotificationChannel
+    success: bool = False
+    latency: float = 0.0            # 耗时（秒）；超时时为等待的时长
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return ChannelDetector.get_channel_name(self.channel)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'channel': self.channel.value,
+            'name': self.name,
+            'success': self.success,
+            'latency': round(self.latency, 3),
+            'timed_out': self.timed_out,
+            'error': self.error,
+        }
+
+
 class NotificationService:
     """
     通知服务
@@ -175,6 +202,11 @@ class NotificationService:
         # 消息长度限制（字节）
         self._feishu_max_bytes = getattr(config, 'feishu_max_bytes', 20000)
         self._wechat_max_bytes = getattr(config, 'wechat_max_bytes', 4000)
+
+        # 多渠道推送：并发发送 + 单渠道超时
+        self._parallel = getattr(config, 'notification_parallel', True)
+        self._channel_timeout = getattr(config, 'notification_channel_timeout', 60.0)
+        self.last_results: List[ChannelResult] = []
         
         # 检测所有已配置的渠道
         self._available_channels = self._detect_all_channels()
@@ -1378,7 +1410,7 @@ class NotificationService:
         """发送企业微信消息"""
         payload = self._gen_wechat_payload(content)
         
-        response = requests.post(
+        response = get_http_session('notification').post(
             self._wechat_url,
             json=payload,
             timeout=10
@@ -1592,7 +1624,7 @@ class NotificationService:
             logger.debug(f"飞书请求 URL: {self._feishu_url}")
             logger.debug(f"飞书请求 payload 长度: {len(content)} 字符")
 
-            response = requests.post(
+            response = get_http_session('notification').post(
                 self._feishu_url,
                 json=payload,
                 timeout=30
@@ -1923,7 +1955,7 @@ class NotificationService:
             "disable_web_page_preview": True
         }
         
-        response = requests.post(api_url, json=payload, timeout=10)
+        response = get_http_session('notification').post(api_url, json=payload, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -1941,7 +1973,7 @@ class NotificationService:
                     payload['text'] = text  # 使用原始文本
                     del payload['parse_mode']
                     
-                    response = requests.post(api_url, json=payload, timeout=10)
+                    response = get_http_session('notification').post(api_url, json=payload, timeout=10)
                     if response.status_code == 200 and response.json().get('ok'):
                         logger.info("Telegram 消息发送成功（纯文本）")
                         return True
@@ -2132,7 +2164,7 @@ class NotificationService:
                 "priority": priority,
             }
             
-            response = requests.post(api_url, data=payload, timeout=30)
+            response = get_http_session('notification').post(api_url, data=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -2294,7 +2326,7 @@ class NotificationService:
         if self._custom_webhook_bearer_token:
             headers['Authorization'] = f'Bearer {self._custom_webhook_bearer_token}'
         body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
-        response = requests.post(url, data=body, headers=headers, timeout=timeout)
+        response = get_http_session('notification').post(url, data=body, headers=headers, timeout=timeout)
         if response.status_code == 200:
             return True
         logger.error(f"自定义 Webhook 推送失败: HTTP {response.status_code}")
@@ -2499,7 +2531,7 @@ class NotificationService:
             是否发送成功
         """
         try:
-            from bot.platforms.feishu_stream import FeishuReplyClient, FEISHU_SDK_AVAILABLE
+            from bot.platforms.feishu_stream import get_feishu_reply_client, FEISHU_SDK_AVAILABLE
             if not FEISHU_SDK_AVAILABLE:
                 logger.warning("飞书 SDK 不可用，无法发送 Stream 回复")
                 return False
@@ -2514,8 +2546,8 @@ class NotificationService:
                 logger.warning("飞书 APP_ID 或 APP_SECRET 未配置")
                 return False
             
-            # 创建回复客户端
-            reply_client = FeishuReplyClient(app_id, app_secret)
+            # 获取共享回复客户端（按应用缓存）
+            reply_client = get_feishu_reply_client(app_id, app_secret)
             
             # 飞书文本消息有长度限制，需要分批发送
             max_bytes = getattr(config, 'feishu_max_bytes', 20000)
@@ -2647,7 +2679,7 @@ class NotificationService:
                 "template": "markdown"  # 使用 Markdown 格式
             }
 
-            response = requests.post(api_url, json=payload, timeout=10)
+            response = get_http_session('notification').post(api_url, json=payload, timeout=10)
 
             if response.status_code == 200:
                 result = response.json()
@@ -2706,7 +2738,7 @@ class NotificationService:
                 'avatar_url': 'https://picsum.photos/200'
             }
             
-            response = requests.post(
+            response = get_http_session('notification').post(
                 self._discord_config['webhook_url'],
                 json=payload,
                 timeout=10
@@ -2743,7 +2775,7 @@ class NotificationService:
             }
             
             url = f'https://discord.com/api/v10/channels/{self._discord_config["channel_id"]}/messages'
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = get_http_session('notification').post(url, json=payload, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 logger.info("Discord Bot 消息发送成功")
@@ -2755,11 +2787,114 @@ class NotificationService:
             logger.error(f"Discord Bot 发送异常: {e}")
             return False
     
+    def _get_channel_sender(self, channel: NotificationChannel) -> Optional[Callable[[str], bool]]:
+        """渠道 → 发送方法（各方法内部自行分片，分片按顺序发送）"""
+        senders = {
+            NotificationChannel.WECHAT: self.send_to_wechat,
+            NotificationChannel.FEISHU: self.send_to_feishu,
+            NotificationChannel.TELEGRAM: self.send_to_telegram,
+            NotificationChannel.EMAIL: self.send_to_email,
+            NotificationChannel.PUSHOVER: self.send_to_pushover,
+            NotificationChannel.PUSHPLUS: self.send_to_pushplus,
+            NotificationChannel.CUSTOM: self.send_to_custom,
+            NotificationChannel.DISCORD: self.send_to_discord,
+        }
+        return senders.get(channel)
+
+    def _send_one_channel(self, channel: NotificationChannel, content: str) -> ChannelResult:
+        """向单个渠道发送并计时（异常不外抛）"""
+        result = ChannelResult(channel=channel)
+        sender = self._get_channel_sender(channel)
+        start = time.time()
+        if sender is None:
+            logger.warning(f"不支持的通知渠道: {channel}")
+            result.error = "unsupported channel"
+            return result
+        try:
+            result.success = bool(sender(content))
+        except Exception as e:
+            logger.error(f"{result.name} 发送失败: {e}")
+            result.error = str(e)
+        result.latency = time.time() - start
+        return result
+
+    def send_to_channels(
+        self,
+        content: str,
+        channels: Optional[List[NotificationChannel]] = None,
+        overrides: Optional[Dict[NotificationChannel, str]] = None,
+        parallel: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ) -> List[ChannelResult]:
+        """
+        向多个渠道推送，返回每个渠道的结果
+
+        并发模式下每个渠道在独立线程中发送，渠道内的分片仍按顺序发送；
+        超过 timeout 仍未完成的渠道记为超时失败，不再等待（后台线程会自行结束）。
+
+        Args:
+            content: 消息内容（Markdown 格式）
+            channels: 目标渠道，默认所有已配置渠道
+            overrides: 按渠道替换消息内容（如企业微信发送精简版）
+            parallel: 是否并发，默认取 NOTIFICATION_PARALLEL
+            timeout: 单渠道超时（秒），默认取 NOTIFICATION_CHANNEL_TIMEOUT；仅并发模式生效
+
+        Returns:
+            与 channels 顺序一致的 ChannelResult 列表
+        """
+        channels = list(self._available_channels if channels is None else channels)
+        overrides = overrides or {}
+        parallel = self._parallel if parallel is None else parallel
+        timeout = self._channel_timeout if timeout is None else timeout
+        if not channels:
+            return []
+
+        def payload(channel: NotificationChannel) -> str:
+            return overrides.get(channel, content)
+
+        if not parallel or len(channels) == 1:
+            results = [self._send_one_channel(channel, payload(channel)) for channel in channels]
+        else:
+            start = time.time()
+            executor = ThreadPoolExecutor(max_workers=len(channels), thread_name_prefix="notify")
+            try:
+                futures = [
+                    executor.submit(self._send_one_channel, channel, payload(channel))
+                    for channel in channels
+                ]
+                # 所有渠道同时开始，统一的截止时间即单渠道超时
+                wait(futures, timeout=timeout if timeout and timeout > 0 else None)
+            finally:
+                executor.shutdown(wait=False)
+
+            results = []
+            for channel, future in zip(channels, futures):
+                if future.done():
+                    results.append(future.result())
+                else:
+                    future.cancel()
+                    result = ChannelResult(
+                        channel=channel,
+                        latency=time.time() - start,
+                        timed_out=True,
+                        error=f"timeout after {timeout}s",
+                    )
+                    logger.error(f"{result.name} 推送超时（{timeout}s），不再等待")
+                    results.append(result)
+
+        self.last_results = results
+        summary = ", ".join(
+            f"{r.name}{'✓' if r.success else ('超时' if r.timed_out else '✗')} {r.latency:.1f}s"
+            for r in results
+        )
+        logger.info(f"[推送] {'并发' if parallel else '串行'}发送 {len(results)} 个渠道: {summary}")
+        return results
+
     def send(self, content: str) -> bool:
         """
         统一发送接口 - 向所有已配置的渠道发送
         
-        遍历所有已配置的渠道，逐一发送消息
+        各渠道的详细结果（成功/耗时/超时）保存在 last_results 中
         
         Args:
             content: 消息内容（Markdown 格式）
@@ -2770,6 +2905,7 @@ class NotificationService:
         context_success = self.send_to_context(content)
 
         if not self._available_channels:
+            self.last_results = []
             if context_success:
                 logger.info("已通过消息上下文渠道完成推送（无其他通知渠道）")
                 return True
@@ -2779,40 +2915,9 @@ class NotificationService:
         channel_names = self.get_channel_names()
         logger.info(f"正在向 {len(self._available_channels)} 个渠道发送通知：{channel_names}")
         
-        success_count = 0
-        fail_count = 0
-        
-        for channel in self._available_channels:
-            channel_name = ChannelDetector.get_channel_name(channel)
-            try:
-                if channel == NotificationChannel.WECHAT:
-                    result = self.send_to_wechat(content)
-                elif channel == NotificationChannel.FEISHU:
-                    result = self.send_to_feishu(content)
-                elif channel == NotificationChannel.TELEGRAM:
-                    result = self.send_to_telegram(content)
-                elif channel == NotificationChannel.EMAIL:
-                    result = self.send_to_email(content)
-                elif channel == NotificationChannel.PUSHOVER:
-                    result = self.send_to_pushover(content)
-                elif channel == NotificationChannel.PUSHPLUS:
-                    result = self.send_to_pushplus(content)
-                elif channel == NotificationChannel.CUSTOM:
-                    result = self.send_to_custom(content)
-                elif channel == NotificationChannel.DISCORD:
-                    result = self.send_to_discord(content)
-                else:
-                    logger.warning(f"不支持的通知渠道: {channel}")
-                    result = False
-                
-                if result:
-                    success_count += 1
-                else:
-                    fail_count += 1
-                    
-            except Exception as e:
-                logger.error(f"{channel_name} 发送失败: {e}")
-                fail_count += 1
+        results = self.send_to_channels(content)
+        success_count = sum(1 for r in results if r.success)
+        fail_count = len(results) - success_count
         
         logger.info(f"通知发送完成：成功 {success_count} 个，失败 {fail_count} 个")
         return success_count > 0 or context_success
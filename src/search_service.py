@@ -11,15 +11,21 @@ A股自选股智能分析系统 - 搜索服务模块
 4. 搜索结果缓存和格式化
 """
 
+import asyncio
+import hashlib
 import logging
 import random
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from itertools import cycle
 
+from src.http_client import get_http_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +53,23 @@ class SearchResponse:
     success: bool = True
     error_message: Optional[str] = None
     search_time: float = 0.0  # 搜索耗时（秒）
+    from_cache: bool = False  # 是否来自查询缓存
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于查询缓存持久化）"""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SearchResponse':
+        """从字典恢复（to_dict 的逆操作）"""
+        return cls(
+            query=data.get('query', ''),
+            results=[SearchResult(**r) for r in data.get('results', [])],
+            provider=data.get('provider', ''),
+            success=data.get('success', True),
+            error_message=data.get('error_message'),
+            search_time=data.get('search_time', 0.0),
+        )
     
     def to_context(self, max_results: int = 5) -> str:
         """将搜索结果转换为可用于 AI 分析的上下文"""
@@ -76,6 +99,12 @@ class BaseSearchProvider(ABC):
         self._key_cycle = cycle(api_keys) if api_keys else None
         self._key_usage: Dict[str, int] = {key: 0 for key in api_keys}
         self._key_errors: Dict[str, int] = {key: 0 for key in api_keys}
+        # Key 轮询与计数在多线程并发搜索时需要加锁
+        self._lock = threading.Lock()
+        # 并发请求上限（由 SearchService 按配置设置）
+        self._max_concurrency = 2
+        self._semaphore = threading.BoundedSemaphore(self._max_concurrency)
+        self._async_semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
     
     @property
     def name(self) -> str:
@@ -86,6 +115,24 @@ class BaseSearchProvider(ABC):
         """检查是否有可用的 API Key"""
         return bool(self._api_keys)
     
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+    
+    def set_max_concurrency(self, limit: int) -> None:
+        """设置该搜索引擎的最大并发请求数（同步与异步搜索分别生效）"""
+        self._max_concurrency = max(1, int(limit))
+        self._semaphore = threading.BoundedSemaphore(self._max_concurrency)
+        self._async_semaphore = None
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发信号量（asyncio.Semaphore 与事件循环绑定）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_semaphore is None or self._async_semaphore[0] is not loop:
+                self._async_semaphore = (loop, asyncio.Semaphore(self._max_concurrency))
+            return self._async_semaphore[1]
+    
     def _get_next_key(self) -> Optional[str]:
         """
         获取下一个可用的 API Key（负载均衡）
@@ -95,29 +142,33 @@ class BaseSearchProvider(ABC):
         if not self._key_cycle:
             return None
         
-        # 最多尝试所有 key
-        for _ in range(len(self._api_keys)):
-            key = next(self._key_cycle)
-            # 跳过错误次数过多的 key（超过 3 次）
-            if self._key_errors.get(key, 0) < 3:
-                return key
-        
-        # 所有 key 都有问题，重置错误计数并返回第一个
-        logger.warning(f"[{self._name}] 所有 API Key 都有错误记录，重置错误计数")
-        self._key_errors = {key: 0 for key in self._api_keys}
-        return self._api_keys[0] if self._api_keys else None
+        with self._lock:
+            # 最多尝试所有 key
+            for _ in range(len(self._api_keys)):
+                key = next(self._key_cycle)
+                # 跳过错误次数过多的 key（超过 3 次）
+                if self._key_errors.get(key, 0) < 3:
+                    return key
+            
+            # 所有 key 都有问题，重置错误计数并返回第一个
+            logger.warning(f"[{self._name}] 所有 API Key 都有错误记录，重置错误计数")
+            self._key_errors = {key: 0 for key in self._api_keys}
+            return self._api_keys[0] if self._api_keys else None
     
     def _record_success(self, key: str) -> None:
         """记录成功使用"""
-        self._key_usage[key] = self._key_usage.get(key, 0) + 1
-        # 成功后减少错误计数
-        if key in self._key_errors and self._key_errors[key] > 0:
-            self._key_errors[key] -= 1
+        with self._lock:
+            self._key_usage[key] = self._key_usage.get(key, 0) + 1
+            # 成功后减少错误计数
+            if key in self._key_errors and self._key_errors[key] > 0:
+                self._key_errors[key] -= 1
     
     def _record_error(self, key: str) -> None:
         """记录错误"""
-        self._key_errors[key] = self._key_errors.get(key, 0) + 1
-        logger.warning(f"[{self._name}] API Key {key[:8]}... 错误计数: {self._key_errors[key]}")
+        with self._lock:
+            self._key_errors[key] = self._key_errors.get(key, 0) + 1
+            errors = self._key_errors[key]
+        logger.warning(f"[{self._name}] API Key {key[:8]}... 错误计数: {errors}")
     
     @abstractmethod
     def _do_search(self, query: str, api_key: str, max_results: int) -> SearchResponse:
@@ -147,7 +198,59 @@ class BaseSearchProvider(ABC):
         
         start_time = time.time()
         try:
-            response = self._do_search(query, api_key, max_results)
+            # 按搜索引擎限制并发请求数
+            with self._semaphore:
+                response = self._do_search(query, api_key, max_results)
+            response.search_time = time.time() - start_time
+            
+            if response.success:
+                self._record_success(api_key)
+                logger.info(f"[{self._name}] 搜索 '{query}' 成功，返回 {len(response.results)} 条结果，耗时 {response.search_time:.2f}s")
+            else:
+                self._record_error(api_key)
+            
+            return response
+            
+        except Exception as e:
+            self._record_error(api_key)
+            elapsed = time.time() - start_time
+            logger.error(f"[{self._name}] 搜索 '{query}' 失败: {e}")
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self._name,
+                success=False,
+                error_message=str(e),
+                search_time=elapsed
+            )
+
+    async def _do_search_async(self, query: str, api_key: str, max_results: int) -> SearchResponse:
+        """
+        异步执行搜索
+        
+        默认把同步实现放到线程池执行（SDK 只有同步接口的搜索引擎），
+        有原生 HTTP 接口的子类可覆盖为异步请求。
+        """
+        return await asyncio.to_thread(self._do_search, query, api_key, max_results)
+    
+    async def search_async(self, query: str, max_results: int = 5) -> SearchResponse:
+        """
+        异步执行搜索（Key 轮询、错误计数与 search 相同）
+        """
+        api_key = self._get_next_key()
+        if not api_key:
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self._name,
+                success=False,
+                error_message=f"{self._name} 未配置 API Key"
+            )
+        
+        start_time = time.time()
+        try:
+            async with self._get_async_semaphore():
+                response = await self._do_search_async(query, api_key, max_results)
             response.search_time = time.time() - start_time
             
             if response.success:
@@ -186,11 +289,33 @@ class TavilySearchProvider(BaseSearchProvider):
     
     def __init__(self, api_keys: List[str]):
         super().__init__(api_keys, "Tavily")
+        self._clients: Dict[str, Any] = {}
+    
+    def _get_client(self, api_key: str):
+        """
+        获取指定 Key 的 TavilyClient（按 Key 缓存）
+        
+        TavilyClient 会把 Authorization 写入 Session 头，因此每个 Key 使用独立的共享 Session。
+        旧版 tavily-python 不支持 session 参数，此时退回客户端自带的连接。
+        """
+        from tavily import TavilyClient
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                index = self._api_keys.index(api_key) if api_key in self._api_keys else len(self._clients)
+                session = get_http_session(f"tavily#{index}")
+                try:
+                    client = TavilyClient(api_key=api_key, session=session)
+                except TypeError:
+                    logger.debug("[Tavily] 当前 tavily-python 版本不支持 session 参数，不使用共享连接池")
+                    client = TavilyClient(api_key=api_key)
+                self._clients[api_key] = client
+            return client
     
     def _do_search(self, query: str, api_key: str, max_results: int) -> SearchResponse:
         """执行 Tavily 搜索"""
         try:
-            from tavily import TavilyClient
+            import tavily  # noqa: F401
         except ImportError:
             return SearchResponse(
                 query=query,
@@ -201,7 +326,7 @@ class TavilySearchProvider(BaseSearchProvider):
             )
         
         try:
-            client = TavilyClient(api_key=api_key)
+            client = self._get_client(api_key)
             
             # 执行搜索（优化：使用advanced深度、限制最近7天）
             response = client.search(
@@ -273,22 +398,13 @@ class SerpAPISearchProvider(BaseSearchProvider):
     文档：https://serpapi.com/baidu-search-api?utm_source=github_daily_stock_analysis
     """
     
+    API_URL = "https://serpapi.com/search.json"
+    
     def __init__(self, api_keys: List[str]):
         super().__init__(api_keys, "SerpAPI")
     
     def _do_search(self, query: str, api_key: str, max_results: int) -> SearchResponse:
-        """执行 SerpAPI 搜索"""
-        try:
-            from serpapi import GoogleSearch
-        except ImportError:
-            return SearchResponse(
-                query=query,
-                results=[],
-                provider=self.name,
-                success=False,
-                error_message="google-search-results 未安装，请运行: pip install google-search-results"
-            )
-        
+        """执行 SerpAPI 搜索（直接调用 REST 接口，复用共享连接池）"""
         try:
             # 使用百度搜索（对中文股票新闻更友好）
             params = {
@@ -297,8 +413,10 @@ class SerpAPISearchProvider(BaseSearchProvider):
                 "api_key": api_key,
             }
             
-            search = GoogleSearch(params)
-            response = search.get_dict()
+            http_response = get_http_session('search').get(self.API_URL, params=params, timeout=30)
+            response = http_response.json()
+            if http_response.status_code != 200 or 'error' in response:
+                raise ValueError(response.get('error') or f"HTTP {http_response.status_code}")
             
             # 记录原始响应到日志
             logger.debug(f"[SerpAPI] 原始响应 keys: {response.keys()}")
@@ -360,136 +478,115 @@ class BochaSearchProvider(BaseSearchProvider):
     def __init__(self, api_keys: List[str]):
         super().__init__(api_keys, "Bocha")
     
+    # API 端点
+    API_URL = "https://api.bocha.cn/v1/web-search"
+    
+    def _build_request(self, query: str, api_key: str, max_results: int) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """构建请求头和请求参数（严格按照API文档）"""
+        headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+        payload = {
+            "query": query,
+            "freshness": "oneMonth",  # 搜索近一个月，适合捕获财报、公告等信息
+            "summary": True,  # 启用AI摘要
+            "count": min(max_results, 50)  # 最大50条
+        }
+        return headers, payload
+    
+    def _failed(self, query: str, error_msg: str) -> SearchResponse:
+        return SearchResponse(
+            query=query,
+            results=[],
+            provider=self.name,
+            success=False,
+            error_message=error_msg
+        )
+    
     def _do_search(self, query: str, api_key: str, max_results: int) -> SearchResponse:
         """执行博查搜索"""
         try:
             import requests
         except ImportError:
-            return SearchResponse(
-                query=query,
-                results=[],
-                provider=self.name,
-                success=False,
-                error_message="requests 未安装，请运行: pip install requests"
-            )
+            return self._failed(query, "requests 未安装，请运行: pip install requests")
         
         try:
-            # API 端点
-            url = "https://api.bocha.cn/v1/web-search"
-            
-            # 请求头
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 请求参数（严格按照API文档）
-            payload = {
-                "query": query,
-                "freshness": "oneMonth",  # 搜索近一个月，适合捕获财报、公告等信息
-                "summary": True,  # 启用AI摘要
-                "count": min(max_results, 50)  # 最大50条
-            }
+            headers, payload = self._build_request(query, api_key, max_results)
             
             # 执行搜索
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = get_http_session('search').post(self.API_URL, headers=headers, json=payload, timeout=10)
+            return self._handle_response(query, response, max_results)
             
-            # 检查HTTP状态码
-            if response.status_code != 200:
-                # 尝试解析错误信息
-                try:
-                    if response.headers.get('content-type', '').startswith('application/json'):
-                        error_data = response.json()
-                        error_message = error_data.get('message', response.text)
-                    else:
-                        error_message = response.text
-                except:
-                    error_message = response.text
-                
-                # 根据错误码处理
-                if response.status_code == 403:
-                    error_msg = f"余额不足: {error_message}"
-                elif response.status_code == 401:
-                    error_msg = f"API KEY无效: {error_message}"
-                elif response.status_code == 400:
-                    error_msg = f"请求参数错误: {error_message}"
-                elif response.status_code == 429:
-                    error_msg = f"请求频率达到限制: {error_message}"
-                else:
-                    error_msg = f"HTTP {response.status_code}: {error_message}"
-                
-                logger.warning(f"[Bocha] 搜索失败: {error_msg}")
-                
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
+        except requests.exceptions.Timeout:
+            error_msg = "请求超时"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+        except Exception as e:
+            error_msg = f"未知错误: {str(e)}"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+    
+    async def _do_search_async(self, query: str, api_key: str, max_results: int) -> SearchResponse:
+        """执行博查搜索（httpx 异步请求）"""
+        try:
+            import httpx
+        except ImportError:
+            return await super()._do_search_async(query, api_key, max_results)
+        
+        try:
+            headers, payload = self._build_request(query, api_key, max_results)
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(self.API_URL, headers=headers, json=payload)
+            return self._handle_response(query, response, max_results)
             
-            # 解析响应
+        except httpx.TimeoutException:
+            error_msg = "请求超时"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+        except httpx.HTTPError as e:
+            error_msg = f"网络请求失败: {str(e)}"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+        except Exception as e:
+            error_msg = f"未知错误: {str(e)}"
+            logger.error(f"[Bocha] {error_msg}")
+            return self._failed(query, error_msg)
+    
+    def _handle_response(self, query: str, response: Any, max_results: int) -> SearchResponse:
+        """
+        解析 HTTP 响应（requests / httpx 的 Response 接口一致）
+        """
+        # 检查HTTP状态码
+        if response.status_code != 200:
+            # 尝试解析错误信息
             try:
-                data = response.json()
-            except ValueError as e:
-                error_msg = f"响应JSON解析失败: {str(e)}"
-                logger.error(f"[Bocha] {error_msg}")
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-            
-            # 检查响应code
-            if data.get('code') != 200:
-                error_msg = data.get('msg') or f"API返回错误码: {data.get('code')}"
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-            
-            # 记录原始响应到日志
-            logger.info(f"[Bocha] 搜索完成，query='{query}'")
-            logger.debug(f"[Bocha] 原始响应: {data}")
-            
-            # 解析搜索结果
-            results = []
-            web_pages = data.get('data', {}).get('webPages', {})
-            value_list = web_pages.get('value', [])
-            
-            for item in value_list[:max_results]:
-                # 优先使用summary（AI摘要），fallback到snippet
-                snippet = item.get('summary') or item.get('snippet', '')
-                
-                # 截取摘要长度
-                if snippet:
-                    snippet = snippet[:500]
-                
-                results.append(SearchResult(
-                    title=item.get('name', ''),
-                    snippet=snippet,
-                    url=item.get('url', ''),
-                    source=item.get('siteName') or self._extract_domain(item.get('url', '')),
-                    published_date=item.get('datePublished'),  # UTC+8格式，无需转换
-                ))
+                if response.headers.get('content-type', '').startswith('application/json'):
+                    error_data = response.json()
+                    error_message = error_data.get('message', response.text)
+                else:
+                    error_message = response.text
+            except:
+                error_message = response.text
             
-            logger.info(f"[Bocha] 成功解析 {len(results)} 条结果")
+            # 根据错误码处理
+            if response.status_code == 403:
+                error_msg = f"余额不足: {error_message}"
+            elif response.status_code == 401:
+                error_msg = f"API KEY无效: {error_message}"
+            elif response.status_code == 400:
+                error_msg = f"请求参数错误: {error_message}"
+            elif response.status_code == 429:
+                error_msg = f"请求频率达到限制: {error_message}"
+            else:
+                error_msg = f"HTTP {response.status_code}: {error_message}"
             
-            return SearchResponse(
-                query=query,
-                results=results,
-                provider=self.name,
-                success=True,
-            )
+            logger.warning(f"[Bocha] 搜索失败: {error_msg}")
             
-        except requests.exceptions.Timeout:
-            error_msg = "请求超时"
-            logger.error(f"[Bocha] {error_msg}")
             return SearchResponse(
                 query=query,
                 results=[],
@@ -497,8 +594,12 @@ class BochaSearchProvider(BaseSearchProvider):
                 success=False,
                 error_message=error_msg
             )
-        except requests.exceptions.RequestException as e:
-            error_msg = f"网络请求失败: {str(e)}"
+        
+        # 解析响应
+        try:
+            data = response.json()
+        except ValueError as e:
+            error_msg = f"响应JSON解析失败: {str(e)}"
             logger.error(f"[Bocha] {error_msg}")
             return SearchResponse(
                 query=query,
@@ -507,9 +608,10 @@ class BochaSearchProvider(BaseSearchProvider):
                 success=False,
                 error_message=error_msg
             )
-        except Exception as e:
-            error_msg = f"未知错误: {str(e)}"
-            logger.error(f"[Bocha] {error_msg}")
+        
+        # 检查响应code
+        if data.get('code') != 200:
+            error_msg = data.get('msg') or f"API返回错误码: {data.get('code')}"
             return SearchResponse(
                 query=query,
                 results=[],
@@ -517,6 +619,40 @@ class BochaSearchProvider(BaseSearchProvider):
                 success=False,
                 error_message=error_msg
             )
+        
+        # 记录原始响应到日志
+        logger.info(f"[Bocha] 搜索完成，query='{query}'")
+        logger.debug(f"[Bocha] 原始响应: {data}")
+        
+        # 解析搜索结果
+        results = []
+        web_pages = data.get('data', {}).get('webPages', {})
+        value_list = web_pages.get('value', [])
+        
+        for item in value_list[:max_results]:
+            # 优先使用summary（AI摘要），fallback到snippet
+            snippet = item.get('summary') or item.get('snippet', '')
+            
+            # 截取摘要长度
+            if snippet:
+                snippet = snippet[:500]
+            
+            results.append(SearchResult(
+                title=item.get('name', ''),
+                snippet=snippet,
+                url=item.get('url', ''),
+                source=item.get('siteName') or self._extract_domain(item.get('url', '')),
+                published_date=item.get('datePublished'),  # UTC+8格式，无需转换
+            ))
+        
+        logger.info(f"[Bocha] 成功解析 {len(results)} 条结果")
+        
+        return SearchResponse(
+            query=query,
+            results=results,
+            provider=self.name,
+            success=True,
+        )
     
     @staticmethod
     def _extract_domain(url: str) -> str:
@@ -550,6 +686,18 @@ class SearchService:
         "{name} {code} 涨跌 成交量",
     ]
     
+    # 情报搜索各维度的查询缓存时间（秒），可通过 SEARCH_CACHE_TTL_OVERRIDES 覆盖
+    INTEL_CACHE_TTL = {
+        'latest_news': 2 * 3600,
+        'market_analysis': 12 * 3600,
+        'risk_check': 24 * 3600,
+        'earnings': 24 * 3600,
+        'industry': 3 * 24 * 3600,
+    }
+    
+    # 搜索引擎默认并发请求数，可通过 SEARCH_PROVIDER_CONCURRENCY 按名称覆盖
+    DEFAULT_PROVIDER_CONCURRENCY = 2
+    
     def __init__(
         self,
         bocha_keys: Optional[List[str]] = None,
@@ -584,6 +732,26 @@ class SearchService:
         
         if not self._providers:
             logger.warning("未配置任何搜索引擎 API Key，新闻搜索功能将不可用")
+        
+        # 并发与查询缓存配置
+        concurrency: Dict[str, int] = {}
+        self._cache_enabled = True
+        self._cache_ttl = dict(self.INTEL_CACHE_TTL)
+        try:
+            from src.config import get_config
+            config = get_config()
+            concurrency = {k.lower(): v for k, v in config.search_provider_concurrency.items()}
+            self._cache_enabled = config.search_cache_enabled
+            self._cache_ttl.update(config.search_cache_ttl_overrides)
+        except Exception as e:
+            logger.debug(f"读取搜索配置失败，使用默认值: {e}")
+        for provider in self._providers:
+            provider.set_max_concurrency(concurrency.get(provider.name.lower(), self.DEFAULT_PROVIDER_CONCURRENCY))
+        
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_pruned = False
     
     @property
     def is_available(self) -> bool:
@@ -715,8 +883,133 @@ class SearchService:
         Returns:
             {维度名称: SearchResponse} 字典
         """
-        results = {}
-        search_count = 0
+        plan = self._plan_intel_searches(stock_code, stock_name, max_searches)
+        if not plan:
+            return {}
+        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})，共 {len(plan)} 个维度")
+        
+        # 各维度并发执行，单个搜索引擎的并发数由其信号量限制
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="intel") as executor:
+            futures = [executor.submit(self._search_intel_dimension, dim, provider) for dim, provider in plan]
+            responses = [future.result() for future in futures]
+        
+        results = {dim['name']: response for (dim, _), response in zip(plan, responses)}
+        self._log_intel_summary(stock_name, results, time.time() - start_time)
+        return results
+    
+    async def search_comprehensive_intel_async(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 3
+    ) -> Dict[str, SearchResponse]:
+        """
+        多维度情报搜索（异步版本，维度与引擎分配同 search_comprehensive_intel）
+        """
+        plan = self._plan_intel_searches(stock_code, stock_name, max_searches)
+        if not plan:
+            return {}
+        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})，共 {len(plan)} 个维度")
+        
+        start_time = time.time()
+        responses = await asyncio.gather(
+            *(self._search_intel_dimension_async(dim, provider) for dim, provider in plan)
+        )
+        
+        results = {dim['name']: response for (dim, _), response in zip(plan, responses)}
+        self._log_intel_summary(stock_name, results, time.time() - start_time)
+        return results
+    
+    def _search_intel_dimension(self, dim: Dict[str, str], provider: BaseSearchProvider) -> SearchResponse:
+        """搜索单个情报维度（先查缓存）"""
+        ttl = self._cache_ttl.get(dim['name'], 0)
+        response = self._load_cached_response(dim['query'], 3, ttl)
+        if response is None:
+            logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
+            response = provider.search(dim['query'], max_results=3)
+            self._save_cached_response(dim['query'], 3, ttl, response)
+        self._log_intel_response(dim, response)
+        return response
+    
+    async def _search_intel_dimension_async(self, dim: Dict[str, str], provider: BaseSearchProvider) -> SearchResponse:
+        """搜索单个情报维度（异步版本，缓存读写放到线程池）"""
+        ttl = self._cache_ttl.get(dim['name'], 0)
+        response = await asyncio.to_thread(self._load_cached_response, dim['query'], 3, ttl)
+        if response is None:
+            logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
+            response = await provider.search_async(dim['query'], max_results=3)
+            await asyncio.to_thread(self._save_cached_response, dim['query'], 3, ttl, response)
+        self._log_intel_response(dim, response)
+        return response
+    
+    @staticmethod
+    def _query_cache_key(query: str, max_results: int) -> str:
+        """查询缓存键：规范化查询词（小写、合并空白）+ 返回条数"""
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha256(f"{normalized}|{max_results}".encode('utf-8')).hexdigest()
+    
+    def _load_cached_response(self, query: str, max_results: int, ttl: float) -> Optional[SearchResponse]:
+        """读取查询缓存，未命中、已禁用或读取失败返回 None"""
+        if not self._cache_enabled or ttl <= 0:
+            return None
+        try:
+            from src.storage import get_db
+            payload = get_db().get_search_cache(self._query_cache_key(query, max_results), ttl)
+        except Exception as e:
+            logger.debug(f"[搜索缓存] 读取失败: {e}")
+            payload = None
+        with self._cache_lock:
+            if payload is None:
+                self._cache_misses += 1
+                return None
+            self._cache_hits += 1
+        response = SearchResponse.from_dict(payload)
+        response.from_cache = True
+        return response
+    
+    def _save_cached_response(self, query: str, max_results: int, ttl: float, response: SearchResponse) -> None:
+        """写入查询缓存（仅缓存有结果的成功响应）"""
+        if not self._cache_enabled or ttl <= 0 or not response.success or not response.results:
+            return
+        try:
+            from src.storage import get_db
+            db = get_db()
+            db.save_search_cache(
+                self._query_cache_key(query, max_results), query, response.provider, response.to_dict()
+            )
+            # 每个实例首次写入时清理超过最长 TTL 的旧记录
+            if not self._cache_pruned:
+                self._cache_pruned = True
+                db.prune_search_cache(max(self._cache_ttl.values()))
+        except Exception as e:
+            logger.debug(f"[搜索缓存] 写入失败: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """查询缓存命中统计"""
+        with self._cache_lock:
+            return {'hits': self._cache_hits, 'misses': self._cache_misses}
+    
+    @staticmethod
+    def _log_intel_summary(stock_name: str, results: Dict[str, SearchResponse], elapsed: float) -> None:
+        cached = sum(1 for r in results.values() if r.from_cache)
+        logger.info(f"[情报搜索] {stock_name} 完成 {len(results)} 个维度（缓存命中 {cached}），耗时 {elapsed:.2f}s")
+    
+    def _plan_intel_searches(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int
+    ) -> List[Tuple[Dict[str, str], BaseSearchProvider]]:
+        """
+        确定情报搜索的维度和对应搜索引擎（轮流使用不同的搜索引擎）
+        
+        Returns:
+            [(维度定义, 搜索引擎)]，最多 max_searches 项
+        """
+        available_providers = [p for p in self._providers if p.is_available]
+        if not available_providers:
+            return []
         
         # 定义搜索维度
         search_dimensions = [
@@ -747,38 +1040,19 @@ class SearchService:
             },
         ]
         
-        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})")
-        
-        # 轮流使用不同的搜索引擎
-        provider_index = 0
-        
-        for dim in search_dimensions:
-            if search_count >= max_searches:
-                break
-            
-            # 选择搜索引擎（轮流使用）
-            available_providers = [p for p in self._providers if p.is_available]
-            if not available_providers:
-                break
-            
-            provider = available_providers[provider_index % len(available_providers)]
-            provider_index += 1
-            
-            logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
-            
-            response = provider.search(dim['query'], max_results=3)
-            results[dim['name']] = response
-            search_count += 1
-            
-            if response.success:
-                logger.info(f"[情报搜索] {dim['desc']}: 获取 {len(response.results)} 条结果")
-            else:
-                logger.warning(f"[情报搜索] {dim['desc']}: 搜索失败 - {response.error_message}")
-            
-            # 短暂延迟避免请求过快
-            time.sleep(0.5)
-        
-        return results
+        plan = []
+        for index, dim in enumerate(search_dimensions[:max_searches]):
+            plan.append((dim, available_providers[index % len(available_providers)]))
+        return plan
+    
+    @staticmethod
+    def _log_intel_response(dim: Dict[str, str], response: SearchResponse) -> None:
+        if response.from_cache:
+            logger.info(f"[情报搜索] {dim['desc']}: 命中缓存，{len(response.results)} 条结果")
+        elif response.success:
+            logger.info(f"[情报搜索] {dim['desc']}: 获取 {len(response.results)} 条结果")
+        else:
+            logger.warning(f"[情报搜索] {dim['desc']}: 搜索失败 - {response.error_message}")
     
     def format_intel_report(self, intel_results: Dict[str, SearchResponse], stock_name: str) -> str:
         """
@@ -17,6 +17,8 @@
 """
 
 import logging
+import warnings
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
@@ -166,6 +168,36 @@ class TrendAnalysisResult:
         }
 
 
+@dataclass
+class IndicatorSnapshot:
+    """
+    单只股票最新交易日的指标快照
+
+    趋势判断只依赖最近几根 K 线的指标值，单股模式从 DataFrame 中提取，
+    面板模式直接从二维矩阵中按列切出，两条路径共用同一套判断逻辑。
+    """
+    bars: int                        # 有效 K 线数量
+    close: float
+    prev_close: float
+    high_20d: float                  # 近 20 日最高价
+    volume: float
+    volume_5d_avg: float             # 前 5 日平均成交量（不含当日）
+    ma5: float
+    ma10: float
+    ma20: float
+    ma60: float
+    prev_ma5: float                  # 5 根 K 线前的 MA5
+    prev_ma20: float                 # 5 根 K 线前的 MA20
+    macd_dif: float
+    macd_dea: float
+    macd_bar: float
+    prev_macd_dif: float
+    prev_macd_dea: float
+    rsi_6: float
+    rsi_12: float
+    rsi_24: float
+
+
 class StockTrendAnalyzer:
     """
     股票趋势分析器
@@ -219,50 +251,78 @@ class StockTrendAnalyzer:
             result.risk_factors.append("数据不足，无法完成分析")
             return result
         
-        # 确保数据按日期排序
+        # 确保数据按日期排序（sort_values 已返回新对象，后续指标直接原地写入）
         df = df.sort_values('date').reset_index(drop=True)
         
         # 计算均线
-        df = self._calculate_mas(df)
+        self._calculate_mas(df)
 
         # 计算 MACD 和 RSI
-        df = self._calculate_macd(df)
-        df = self._calculate_rsi(df)
+        self._calculate_macd(df)
+        self._calculate_rsi(df)
 
-        # 获取最新数据
+        self._evaluate(result, self._snapshot_from_frame(df))
+        return result
+
+    def _snapshot_from_frame(self, df: pd.DataFrame) -> IndicatorSnapshot:
+        """从已计算指标的单股 DataFrame 中提取最新快照"""
         latest = df.iloc[-1]
-        result.current_price = float(latest['close'])
-        result.ma5 = float(latest['MA5'])
-        result.ma10 = float(latest['MA10'])
-        result.ma20 = float(latest['MA20'])
-        result.ma60 = float(latest.get('MA60', 0))
+        prev = df.iloc[-2]
+        prev5 = df.iloc[-5] if len(df) >= 5 else latest
+        return IndicatorSnapshot(
+            bars=len(df),
+            close=float(latest['close']),
+            prev_close=float(prev['close']),
+            high_20d=float(df['high'].iloc[-20:].max()),
+            volume=float(latest['volume']),
+            volume_5d_avg=float(df['volume'].iloc[-6:-1].mean()),
+            ma5=float(latest['MA5']),
+            ma10=float(latest['MA10']),
+            ma20=float(latest['MA20']),
+            ma60=float(latest.get('MA60', 0)),
+            prev_ma5=float(prev5['MA5']),
+            prev_ma20=float(prev5['MA20']),
+            macd_dif=float(latest['MACD_DIF']),
+            macd_dea=float(latest['MACD_DEA']),
+            macd_bar=float(latest['MACD_BAR']),
+            prev_macd_dif=float(prev['MACD_DIF']),
+            prev_macd_dea=float(prev['MACD_DEA']),
+            rsi_6=float(latest[f'RSI_{self.RSI_SHORT}']),
+            rsi_12=float(latest[f'RSI_{self.RSI_MID}']),
+            rsi_24=float(latest[f'RSI_{self.RSI_LONG}']),
+        )
+
+    def _evaluate(self, result: TrendAnalysisResult, snap: IndicatorSnapshot) -> None:
+        """基于指标快照完成全部判断并生成信号"""
+        result.current_price = snap.close
+        result.ma5 = snap.ma5
+        result.ma10 = snap.ma10
+        result.ma20 = snap.ma20
+        result.ma60 = snap.ma60
 
         # 1. 趋势判断
-        self._analyze_trend(df, result)
+        self._analyze_trend(snap, result)
 
         # 2. 乖离率计算
         self._calculate_bias(result)
 
         # 3. 量能分析
-        self._analyze_volume(df, result)
+        self._analyze_volume(snap, result)
 
         # 4. 支撑压力分析
-        self._analyze_support_resistance(df, result)
+        self._analyze_support_resistance(snap, result)
 
         # 5. MACD 分析
-        self._analyze_macd(df, result)
+        self._analyze_macd(snap, result)
 
         # 6. RSI 分析
-        self._analyze_rsi(df, result)
+        self._analyze_rsi(snap, result)
 
         # 7. 生成买入信号
         self._generate_signal(result)
-
-        return result
     
     def _calculate_mas(self, df: pd.DataFrame) -> pd.DataFrame:
-        """计算均线"""
-        df = df.copy()
+        """计算均线（原地写入）"""
         df['MA5'] = df['close'].rolling(window=5).mean()
         df['MA10'] = df['close'].rolling(window=10).mean()
         df['MA20'] = df['close'].rolling(window=20).mean()
@@ -283,7 +343,6 @@ class StockTrendAnalyzer:
         - DEA = EMA(DIF, 9)
         - MACD = (DIF - DEA) * 2
         """
-        df = df.copy()
 
         # 计算快慢线 EMA
         ema_fast = df['close'].ewm(span=self.MACD_FAST, adjust=False).mean()
@@ -308,16 +367,12 @@ class StockTrendAnalyzer:
         - RS = 平均上涨幅度 / 平均下跌幅度
         - RSI = 100 - (100 / (1 + RS))
         """
-        df = df.copy()
+        # 价格变化与周期无关，只算一次
+        delta = df['close'].diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
 
         for period in [self.RSI_SHORT, self.RSI_MID, self.RSI_LONG]:
-            # 计算价格变化
-            delta = df['close'].diff()
-
-            # 分离上涨和下跌
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-
             # 计算平均涨跌幅
             avg_gain = gain.rolling(window=period).mean()
             avg_loss = loss.rolling(window=period).mean()
@@ -335,7 +390,190 @@ class StockTrendAnalyzer:
 
         return df
     
-    def _analyze_trend(self, df: pd.DataFrame, result: TrendAnalysisResult) -> None:
+    def analyze_state(self, state: 'IndicatorState', code: str) -> TrendAnalysisResult:
+        """
+        基于增量指标状态分析趋势（盘中轮询用，无需回放历史）
+
+        Args:
+            state: 已推进到最新价格的 IndicatorState
+            code: 股票代码
+
+        Returns:
+            TrendAnalysisResult 分析结果
+        """
+        result = TrendAnalysisResult(code=code)
+        if state.bars < 20:
+            logger.warning(f"{code} 数据不足，无法进行趋势分析")
+            result.risk_factors.append("数据不足，无法完成分析")
+            return result
+        self._evaluate(result, state.snapshot())
+        return result
+
+    # ------------------------------------------------------------------
+    # 面板模式：整个自选股池一次性向量化计算
+    # ------------------------------------------------------------------
+
+    def analyze_panel(self, df: pd.DataFrame) -> Dict[str, TrendAnalysisResult]:
+        """
+        批量分析多只股票趋势（面板模式）
+
+        将长表 (code, date) 按股票右对齐展开为二维矩阵后，
+        一次性计算全部股票的 MA / MACD / RSI，结果与逐只调用 analyze() 一致。
+
+        Args:
+            df: 长表格式 DataFrame，至少包含 code, date, close, high, volume 列
+
+        Returns:
+            {股票代码: TrendAnalysisResult}
+        """
+        if df is None or df.empty:
+            return {}
+
+        df = df.sort_values(['code', 'date'], kind='stable')
+        code_values = df['code'].astype(str).to_numpy()
+        # 已按代码排序，直接按相邻变化切分分组，避免再排序一次
+        starts = np.flatnonzero(np.r_[True, code_values[1:] != code_values[:-1]])
+        codes = code_values[starts]
+        group_sizes = np.diff(np.r_[starts, len(code_values)])
+        n_bars = int(group_sizes.max())
+
+        # 每只股票的最后一根 K 线落在最后一列，历史不足的在左侧补 NaN
+        rows = np.repeat(np.arange(len(codes)), group_sizes)
+        offsets = np.repeat(np.cumsum(group_sizes) - group_sizes, group_sizes)
+        cols = np.arange(len(df)) - offsets + np.repeat(n_bars - group_sizes, group_sizes)
+
+        blocks = {}
+        for column in ('close', 'high', 'volume'):
+            block = np.full((len(codes), n_bars), np.nan)
+            block[rows, cols] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+            blocks[column] = block
+
+        return self.analyze_block(
+            codes.tolist(), blocks['close'], blocks['high'], blocks['volume']
+        )
+
+    def analyze_block(
+        self,
+        codes: List[str],
+        close: np.ndarray,
+        high: np.ndarray,
+        volume: np.ndarray,
+    ) -> Dict[str, TrendAnalysisResult]:
+        """
+        基于二维矩阵批量分析（面板模式核心）
+
+        Args:
+            codes: 股票代码列表，与矩阵的行一一对应
+            close/high/volume: 形状为 (股票数, K 线数) 的矩阵，按日期升序，
+                每行右对齐，历史不足的位置为 NaN
+
+        Returns:
+            {股票代码: TrendAnalysisResult}
+        """
+        # 判断只用到最近 5 根 K 线的指标
+        indicators = self.calculate_indicators_block(close, tail=5)
+        bars = np.sum(~np.isnan(close), axis=1)
+
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            high_20d = np.nanmax(high[:, -20:], axis=1)
+            volume_5d_avg = np.nanmean(volume[:, -6:-1], axis=1)
+
+        # 只取最新几列，并统一转成 Python float，避免逐元素的 numpy 标量开销
+        def col(values: np.ndarray, offset: int) -> List[float]:
+            if values.shape[1] < offset:
+                return [float('nan')] * len(codes)
+            return values[:, -offset].tolist()
+
+        columns = {
+            'bars': bars.tolist(),
+            'close': col(close, 1),
+            'prev_close': col(close, 2),
+            'high_20d': high_20d.tolist(),
+            'volume': col(volume, 1),
+            'volume_5d_avg': volume_5d_avg.tolist(),
+            'ma5': col(indicators['MA5'], 1),
+            'ma10': col(indicators['MA10'], 1),
+            'ma20': col(indicators['MA20'], 1),
+            'ma60': col(indicators['MA60'], 1),
+            'prev_ma5': col(indicators['MA5'], 5),
+            'prev_ma20': col(indicators['MA20'], 5),
+            'macd_dif': col(indicators['MACD_DIF'], 1),
+            'macd_dea': col(indicators['MACD_DEA'], 1),
+            'macd_bar': col(indicators['MACD_BAR'], 1),
+            'prev_macd_dif': col(indicators['MACD_DIF'], 2),
+            'prev_macd_dea': col(indicators['MACD_DEA'], 2),
+            'rsi_6': col(indicators[f'RSI_{self.RSI_SHORT}'], 1),
+            'rsi_12': col(indicators[f'RSI_{self.RSI_MID}'], 1),
+            'rsi_24': col(indicators[f'RSI_{self.RSI_LONG}'], 1),
+        }
+
+        results: Dict[str, TrendAnalysisResult] = {}
+        insufficient = 0
+        for i, code in enumerate(codes):
+            result = TrendAnalysisResult(code=code)
+            results[code] = result
+            if columns['bars'][i] < 20:
+                insufficient += 1
+                result.risk_factors.append("数据不足，无法完成分析")
+                continue
+            snap = IndicatorSnapshot(**{name: values[i] for name, values in columns.items()})
+            self._evaluate(result, snap)
+
+        if insufficient:
+            logger.warning(f"面板趋势分析: {insufficient}/{len(codes)} 只股票数据不足，已跳过")
+        return results
+
+    def calculate_indicators_block(
+        self,
+        close: np.ndarray,
+        tail: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        按行向量化计算 MA / MACD / RSI
+
+        Args:
+            close: 形状为 (股票数, K 线数) 的收盘价矩阵，右对齐、左侧补 NaN
+            tail: 只返回最后 tail 列（均线和 RSI 只在尾部窗口上计算，
+                EMA 仍需从头递推）；None 表示返回全部列
+
+        Returns:
+            指标名 -> 矩阵，列名与单股模式的 DataFrame 列一致
+        """
+        close = np.asarray(close, dtype=float)
+        valid = ~np.isnan(close)
+        bars = valid.sum(axis=1)
+
+        out = {
+            'MA5': _rolling_mean(close, 5, tail),
+            'MA10': _rolling_mean(close, 10, tail),
+            'MA20': _rolling_mean(close, 20, tail),
+        }
+        # 数据不足 60 根时使用 MA20 替代
+        out['MA60'] = np.where((bars >= 60)[:, None], _rolling_mean(close, 60, tail), out['MA20'])
+
+        dif = _ewm_mean(close, self.MACD_FAST) - _ewm_mean(close, self.MACD_SLOW)
+        dea = _ewm_mean(dif, self.MACD_SIGNAL)
+        if tail is not None:
+            dif, dea = dif[:, -tail:], dea[:, -tail:]
+        out['MACD_DIF'] = dif
+        out['MACD_DEA'] = dea
+        out['MACD_BAR'] = (dif - dea) * 2
+
+        delta = np.full_like(close, np.nan)
+        delta[:, 1:] = np.diff(close, axis=1)
+        # 与 Series.where 一致：首根 K 线的涨跌记为 0，补齐位置保持 NaN
+        gain = np.where(valid, np.where(delta > 0, delta, 0.0), np.nan)
+        loss = np.where(valid, np.where(delta < 0, -delta, 0.0), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for period in [self.RSI_SHORT, self.RSI_MID, self.RSI_LONG]:
+                rs = _rolling_mean(gain, period, tail) / _rolling_mean(loss, period, tail)
+                rsi = 100 - (100 / (1 + rs))
+                out[f'RSI_{period}'] = np.where(np.isnan(rsi), 50.0, rsi)
+
+        return out
+
+    def _analyze_trend(self, snap: IndicatorSnapshot, result: TrendAnalysisResult) -> None:
         """
         分析趋势状态
         
@@ -346,8 +584,7 @@ class StockTrendAnalyzer:
         # 判断均线排列
         if ma5 > ma10 > ma20:
             # 检查间距是否在扩大（强势）
-            prev = df.iloc[-5] if len(df) >= 5 else df.iloc[-1]
-            prev_spread = (prev['MA5'] - prev['MA20']) / prev['MA20'] * 100 if prev['MA20'] > 0 else 0
+            prev_spread = (snap.prev_ma5 - snap.prev_ma20) / snap.prev_ma20 * 100 if snap.prev_ma20 > 0 else 0
             curr_spread = (ma5 - ma20) / ma20 * 100 if ma20 > 0 else 0
             
             if curr_spread > prev_spread and curr_spread > 5:
@@ -365,8 +602,7 @@ class StockTrendAnalyzer:
             result.trend_strength = 55
             
         elif ma5 < ma10 < ma20:
-            prev = df.iloc[-5] if len(df) >= 5 else df.iloc[-1]
-            prev_spread = (prev['MA20'] - prev['MA5']) / prev['MA5'] * 100 if prev['MA5'] > 0 else 0
+            prev_spread = (snap.prev_ma20 - snap.prev_ma5) / snap.prev_ma5 * 100 if snap.prev_ma5 > 0 else 0
             curr_spread = (ma20 - ma5) / ma5 * 100 if ma5 > 0 else 0
             
             if curr_spread > prev_spread and curr_spread > 5:
@@ -405,24 +641,20 @@ class StockTrendAnalyzer:
         if result.ma20 > 0:
             result.bias_ma20 = (price - result.ma20) / result.ma20 * 100
     
-    def _analyze_volume(self, df: pd.DataFrame, result: TrendAnalysisResult) -> None:
+    def _analyze_volume(self, snap: IndicatorSnapshot, result: TrendAnalysisResult) -> None:
         """
         分析量能
         
         偏好：缩量回调 > 放量上涨 > 缩量上涨 > 放量下跌
         """
-        if len(df) < 5:
+        if snap.bars < 5:
             return
         
-        latest = df.iloc[-1]
-        vol_5d_avg = df['volume'].iloc[-6:-1].mean()
-        
-        if vol_5d_avg > 0:
-            result.volume_ratio_5d = float(latest['volume']) / vol_5d_avg
+        if snap.volume_5d_avg > 0:
+            result.volume_ratio_5d = snap.volume / snap.volume_5d_avg
         
         # 判断价格变化
-        prev_close = df.iloc[-2]['close']
-        price_change = (latest['close'] - prev_close) / prev_close * 100
+        price_change = (snap.close - snap.prev_close) / snap.prev_close * 100
         
         # 量能状态判断
         if result.volume_ratio_5d >= self.VOLUME_HEAVY_RATIO:
@@ -443,7 +675,7 @@ class StockTrendAnalyzer:
             result.volume_status = VolumeStatus.NORMAL
             result.volume_trend = "量能正常"
     
-    def _analyze_support_resistance(self, df: pd.DataFrame, result: TrendAnalysisResult) -> None:
+    def _analyze_support_resistance(self, snap: IndicatorSnapshot, result: TrendAnalysisResult) -> None:
         """
         分析支撑压力位
         
@@ -471,12 +703,12 @@ class StockTrendAnalyzer:
             result.support_levels.append(result.ma20)
         
         # 近期高点作为压力
-        if len(df) >= 20:
-            recent_high = df['high'].iloc[-20:].max()
+        if snap.bars >= 20:
+            recent_high = snap.high_20d
             if recent_high > price:
                 result.resistance_levels.append(recent_high)
 
-    def _analyze_macd(self, df: pd.DataFrame, result: TrendAnalysisResult) -> None:
+    def _analyze_macd(self, snap: IndicatorSnapshot, result: TrendAnalysisResult) -> None:
         """
         分析 MACD 指标
 
@@ -485,20 +717,17 @@ class StockTrendAnalyzer:
         - 金叉：DIF 上穿 DEA
         - 死叉：DIF 下穿 DEA
         """
-        if len(df) < self.MACD_SLOW:
+        if snap.bars < self.MACD_SLOW:
             result.macd_signal = "数据不足"
             return
 
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-
         # 获取 MACD 数据
-        result.macd_dif = float(latest['MACD_DIF'])
-        result.macd_dea = float(latest['MACD_DEA'])
-        result.macd_bar = float(latest['MACD_BAR'])
+        result.macd_dif = snap.macd_dif
+        result.macd_dea = snap.macd_dea
+        result.macd_bar = snap.macd_bar
 
         # 判断金叉死叉
-        prev_dif_dea = prev['MACD_DIF'] - prev['MACD_DEA']
+        prev_dif_dea = snap.prev_macd_dif - snap.prev_macd_dea
         curr_dif_dea = result.macd_dif - result.macd_dea
 
         # 金叉：DIF 上穿 DEA
@@ -508,7 +737,7 @@ class StockTrendAnalyzer:
         is_death_cross = prev_dif_dea >= 0 and curr_dif_dea < 0
 
         # 零轴穿越
-        prev_zero = prev['MACD_DIF']
+        prev_zero = snap.prev_macd_dif
         curr_zero = result.macd_dif
         is_crossing_up = prev_zero <= 0 and curr_zero > 0
         is_crossing_down = prev_zero >= 0 and curr_zero < 0
@@ -539,7 +768,7 @@ class StockTrendAnalyzer:
             result.macd_status = MACDStatus.BULLISH
             result.macd_signal = " MACD 中性区域"
 
-    def _analyze_rsi(self, df: pd.DataFrame, result: TrendAnalysisResult) -> None:
+    def _analyze_rsi(self, snap: IndicatorSnapshot, result: TrendAnalysisResult) -> None:
         """
         分析 RSI 指标
 
@@ -548,16 +777,14 @@ class StockTrendAnalyzer:
         - RSI < 30：超卖，关注反弹
         - 40-60：中性区域
         """
-        if len(df) < self.RSI_LONG:
+        if snap.bars < self.RSI_LONG:
             result.rsi_signal = "数据不足"
             return
 
-        latest = df.iloc[-1]
-
         # 获取 RSI 数据
-        result.rsi_6 = float(latest[f'RSI_{self.RSI_SHORT}'])
-        result.rsi_12 = float(latest[f'RSI_{self.RSI_MID}'])
-        result.rsi_24 = float(latest[f'RSI_{self.RSI_LONG}'])
+        result.rsi_6 = snap.rsi_6
+        result.rsi_12 = snap.rsi_12
+        result.rsi_24 = snap.rsi_24
 
         # 以中期 RSI(12) 为主进行判断
         rsi_mid = result.rsi_12
@@ -775,6 +1002,414 @@ class StockTrendAnalyzer:
         return "\n".join(lines)
 
 
+class _RollingMean:
+    """
+    固定窗口滚动均值累加器（O(1) 推进）
+
+    与 pandas rolling(window).mean() 的算法一致：增删分别做 Kahan 补偿求和，
+    窗口内数值完全相同时直接返回该值。保存追加前的状态，盘中修正最后一个值时可精确重放。
+    """
+
+    FIELDS = ('nobs', 'total', 'comp_add', 'comp_remove', 'same_run', 'prev_value')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.nobs = 0
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_run = 0
+        self.prev_value: Optional[float] = None
+        self._base: Optional[Tuple] = None
+
+    def push(self, value: float, leaving: Optional[float]) -> None:
+        """追加一个值；leaving 为移出窗口的值（窗口未满时为 None）"""
+        if leaving is not None:
+            self.nobs -= 1
+            y = -leaving - self.comp_remove
+            t = self.total + y
+            self.comp_remove = t - self.total - y
+            self.total = t
+        self._base = self._state()
+        self._add(value)
+
+    def revise(self, value: float) -> None:
+        """替换最后追加的值"""
+        self._restore(self._base)
+        self._add(value)
+
+    def mean(self) -> float:
+        if self.nobs < self.window:
+            return float('nan')
+        if self.same_run >= self.nobs:
+            return self.prev_value
+        return self.total / self.nobs
+
+    def _add(self, value: float) -> None:
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        self.same_run = self.same_run + 1 if value == self.prev_value else 1
+        self.prev_value = value
+
+    def _state(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def _restore(self, values: Tuple) -> None:
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    def to_list(self) -> List[Any]:
+        return [list(self._state()), list(self._base) if self._base is not None else None]
+
+    @classmethod
+    def from_list(cls, window: int, data: List[Any]) -> '_RollingMean':
+        rolling = cls(window)
+        rolling._restore(tuple(data[0]))
+        rolling._base = tuple(data[1]) if data[1] is not None else None
+        return rolling
+
+
+class IndicatorState:
+    """
+    单只股票的增量指标状态
+
+    保存 EMA 累加器、收盘价 / 最高价 / 成交量环形缓冲区以及各窗口的
+    滚动和、涨跌累计和，每推进一根 K 线（或同一交易日内的一次报价）只做
+    常数次运算，适合盘中高频轮询大量自选股。
+
+    - 新交易日的价格：追加一根 K 线
+    - 同一交易日的价格：修正最后一根 K 线（盘中 tick）
+
+    状态可通过 to_dict() / from_dict() 序列化，由 DatabaseManager 存入 SQLite。
+    """
+
+    MA_WINDOWS = (5, 10, 20, 60)
+    RSI_PERIODS = (
+        StockTrendAnalyzer.RSI_SHORT,
+        StockTrendAnalyzer.RSI_MID,
+        StockTrendAnalyzer.RSI_LONG,
+    )
+    HIGH_WINDOW = 20             # 近期高点窗口
+    VOLUME_WINDOW = 6            # 当日 + 前 5 日成交量
+    MA_HISTORY = 5               # 保留最近 5 根 K 线的 MA5/MA20，用于判断均线发散
+
+    def __init__(self):
+        self.last_date: Optional[str] = None
+        self.bars = 0
+        self.closes: deque = deque(maxlen=max(self.MA_WINDOWS))
+        self.highs: deque = deque(maxlen=self.HIGH_WINDOW)
+        self.volumes: deque = deque(maxlen=self.VOLUME_WINDOW)
+        self.gains: deque = deque(maxlen=max(self.RSI_PERIODS))
+        self.losses: deque = deque(maxlen=max(self.RSI_PERIODS))
+        self.close_means = {w: _RollingMean(w) for w in self.MA_WINDOWS}
+        self.gain_means = {p: _RollingMean(p) for p in self.RSI_PERIODS}
+        self.loss_means = {p: _RollingMean(p) for p in self.RSI_PERIODS}
+        # 当前 EMA 值，以及最后一根 K 线之前的 EMA 值（盘中修正时从这里重新推一步）
+        self.ema_fast: Optional[float] = None
+        self.ema_slow: Optional[float] = None
+        self.dea: Optional[float] = None
+        self.base_ema_fast: Optional[float] = None
+        self.base_ema_slow: Optional[float] = None
+        self.base_dea: Optional[float] = None
+        self.ma_history: deque = deque(maxlen=self.MA_HISTORY)
+
+    # ------------------------------------------------------------------
+    # 推进
+    # ------------------------------------------------------------------
+
+    def update(
+        self,
+        bar_date: Any,
+        close: float,
+        high: Optional[float] = None,
+        volume: Optional[float] = None,
+    ) -> bool:
+        """
+        推进一根 K 线或一次盘中报价
+
+        Args:
+            bar_date: 交易日（date / datetime / 'YYYY-MM-DD'）
+            close: 收盘价或最新价
+            high: 当日最高价（为空时按最新价维护）
+            volume: 当日累计成交量（为空时视为 0）
+
+        Returns:
+            是否被采纳；早于已有交易日的数据会被忽略
+        """
+        day = pd.Timestamp(bar_date).date().isoformat()
+        close = float(close)
+        volume = float(volume) if volume is not None else 0.0
+
+        if self.last_date is not None and day < self.last_date:
+            return False
+
+        if day == self.last_date:
+            high = float(high) if high is not None else max(self.highs[-1], close)
+            self._revise(close, high, volume)
+        else:
+            high = float(high) if high is not None else close
+            self._append(close, high, volume)
+            self.last_date = day
+        return True
+
+    def _append(self, close: float, high: float, volume: float) -> None:
+        """追加新 K 线"""
+        prev_close = self.closes[-1] if self.closes else None
+        gain, loss = self._gain_loss(prev_close, close)
+
+        _push_window(self.close_means, self.closes, close)
+        _push_window(self.gain_means, self.gains, gain)
+        _push_window(self.loss_means, self.losses, loss)
+        self.highs.append(high)
+        self.volumes.append(volume)
+
+        self.base_ema_fast, self.base_ema_slow, self.base_dea = self.ema_fast, self.ema_slow, self.dea
+        self._step_ema(close)
+
+        self.bars += 1
+        self.ma_history.append((self.ma(5), self.ma(20)))
+
+    def _revise(self, close: float, high: float, volume: float) -> None:
+        """用盘中最新价修正最后一根 K 线"""
+        prev_close = self.closes[-2] if len(self.closes) >= 2 else None
+        gain, loss = self._gain_loss(prev_close, close)
+
+        for values, means, value in (
+            (self.closes, self.close_means, close),
+            (self.gains, self.gain_means, gain),
+            (self.losses, self.loss_means, loss),
+        ):
+            values[-1] = value
+            for rolling in means.values():
+                rolling.revise(value)
+        self.highs[-1] = high
+        self.volumes[-1] = volume
+
+        self._step_ema(close)
+        self.ma_history[-1] = (self.ma(5), self.ma(20))
+
+    def _step_ema(self, close: float) -> None:
+        """基于上一根 K 线的 EMA 推进一步（adjust=False）"""
+        self.ema_fast = _ema_step(self.base_ema_fast, close, StockTrendAnalyzer.MACD_FAST)
+        self.ema_slow = _ema_step(self.base_ema_slow, close, StockTrendAnalyzer.MACD_SLOW)
+        self.dea = _ema_step(self.base_dea, self.ema_fast - self.ema_slow, StockTrendAnalyzer.MACD_SIGNAL)
+
+    @staticmethod
+    def _gain_loss(prev_close: Optional[float], close: float) -> Tuple[float, float]:
+        """单根 K 线的涨跌幅度；首根 K 线记为 0"""
+        if prev_close is None:
+            return 0.0, 0.0
+        delta = close - prev_close
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def ma(self, window: int) -> float:
+        """当前均线值，K 线不足时返回 NaN"""
+        return self.close_means[window].mean()
+
+    def rsi(self, period: int) -> float:
+        """当前 RSI 值，K 线不足或无涨跌时返回 50"""
+        avg_gain = self.gain_means[period].mean()
+        avg_loss = self.loss_means[period].mean()
+        if np.isnan(avg_gain) or np.isnan(avg_loss):
+            return 50.0
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def snapshot(self) -> IndicatorSnapshot:
+        """生成与单股模式一致的指标快照"""
+        nan = float('nan')
+        ma20 = self.ma(20)
+        dif = self.ema_fast - self.ema_slow
+        prev_dif = self.base_ema_fast - self.base_ema_slow if self.base_ema_fast is not None else nan
+        prev_ma5, prev_ma20 = self.ma_history[0]
+        volumes = list(self.volumes)
+        prior_volumes = volumes[:-1]
+        return IndicatorSnapshot(
+            bars=self.bars,
+            close=self.closes[-1],
+            prev_close=self.closes[-2] if len(self.closes) >= 2 else nan,
+            high_20d=max(self.highs),
+            volume=volumes[-1],
+            volume_5d_avg=sum(prior_volumes) / len(prior_volumes) if prior_volumes else nan,
+            ma5=self.ma(5),
+            ma10=self.ma(10),
+            ma20=ma20,
+            ma60=self.ma(60) if self.bars >= 60 else ma20,
+            prev_ma5=prev_ma5,
+            prev_ma20=prev_ma20,
+            macd_dif=dif,
+            macd_dea=self.dea,
+            macd_bar=(dif - self.dea) * 2,
+            prev_macd_dif=prev_dif,
+            prev_macd_dea=self.base_dea if self.base_dea is not None else nan,
+            rsi_6=self.rsi(StockTrendAnalyzer.RSI_SHORT),
+            rsi_12=self.rsi(StockTrendAnalyzer.RSI_MID),
+            rsi_24=self.rsi(StockTrendAnalyzer.RSI_LONG),
+        )
+
+    # ------------------------------------------------------------------
+    # 构建与序列化
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> 'IndicatorState':
+        """
+        用日线历史构建初始状态（只需执行一次，之后增量推进）
+
+        Args:
+            df: 包含 date, close 列的 DataFrame，high / volume 列可选
+        """
+        state = cls()
+        if df is None or df.empty:
+            return state
+        df = df.sort_values('date')
+        highs = df['high'] if 'high' in df.columns else df['close']
+        volumes = df['volume'] if 'volume' in df.columns else pd.Series(0.0, index=df.index)
+        for bar_date, close, high, volume in zip(df['date'], df['close'], highs, volumes):
+            if pd.isna(close):
+                continue
+            state.update(
+                bar_date,
+                close,
+                high=None if pd.isna(high) else high,
+                volume=None if pd.isna(volume) else volume,
+            )
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为 JSON 友好的字典"""
+        return {
+            'last_date': self.last_date,
+            'bars': self.bars,
+            'closes': list(self.closes),
+            'highs': list(self.highs),
+            'volumes': list(self.volumes),
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'close_means': {str(k): v.to_list() for k, v in self.close_means.items()},
+            'gain_means': {str(k): v.to_list() for k, v in self.gain_means.items()},
+            'loss_means': {str(k): v.to_list() for k, v in self.loss_means.items()},
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'dea': self.dea,
+            'base_ema_fast': self.base_ema_fast,
+            'base_ema_slow': self.base_ema_slow,
+            'base_dea': self.base_dea,
+            'ma_history': [list(item) for item in self.ma_history],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IndicatorState':
+        """从 to_dict() 的结果恢复状态"""
+        state = cls()
+        state.last_date = data.get('last_date')
+        state.bars = int(data.get('bars', 0))
+        state.closes.extend(data.get('closes', []))
+        state.highs.extend(data.get('highs', []))
+        state.volumes.extend(data.get('volumes', []))
+        state.gains.extend(data.get('gains', []))
+        state.losses.extend(data.get('losses', []))
+        for name in ('close_means', 'gain_means', 'loss_means'):
+            means = getattr(state, name)
+            for key, value in data.get(name, {}).items():
+                means[int(key)] = _RollingMean.from_list(int(key), value)
+        for name in ('ema_fast', 'ema_slow', 'dea', 'base_ema_fast', 'base_ema_slow', 'base_dea'):
+            setattr(state, name, data.get(name))
+        state.ma_history.extend(tuple(item) for item in data.get('ma_history', []))
+        return state
+
+def _rolling_mean(values: np.ndarray, window: int, tail: Optional[int] = None) -> np.ndarray:
+    """
+    按行计算滚动均值，结果与 rolling(window).mean() 逐位一致
+
+    与 _RollingMean 相同，沿用 pandas 的算法：增删分别做 Kahan 补偿求和，
+    窗口内数值完全相同时直接返回该值（停牌等平盘区间各均线严格相等），
+    NaN 不计入窗口，有效值不足 window 个时结果为 NaN。
+    补偿误差依赖完整历史，因此总是从第一列递推，tail 只裁剪输出。
+    """
+    n_rows, n_cols = values.shape
+    out_cols = n_cols if tail is None else min(tail, n_cols)
+    first_out = n_cols - out_cols
+    out = np.full((n_rows, out_cols), np.nan)
+
+    nobs = np.zeros(n_rows, dtype=np.int64)
+    neg_ct = np.zeros(n_rows, dtype=np.int64)
+    total = np.zeros(n_rows)
+    comp_add = np.zeros(n_rows)
+    comp_remove = np.zeros(n_rows)
+    same_run = np.zeros(n_rows, dtype=np.int64)
+    prev_value = np.full(n_rows, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for t in range(n_cols):
+            if t >= window:
+                x = values[:, t - window]
+                ok = ~np.isnan(x)
+                y = -x - comp_remove
+                s = total + y
+                comp_remove = np.where(ok, s - total - y, comp_remove)
+                total = np.where(ok, s, total)
+                nobs -= ok
+                neg_ct -= ok & np.signbit(x)
+
+            x = values[:, t]
+            ok = ~np.isnan(x)
+            y = x - comp_add
+            s = total + y
+            comp_add = np.where(ok, s - total - y, comp_add)
+            total = np.where(ok, s, total)
+            nobs += ok
+            neg_ct += ok & np.signbit(x)
+            same_run = np.where(ok, np.where(x == prev_value, same_run + 1, 1), same_run)
+            prev_value = np.where(ok, x, prev_value)
+
+            if t < first_out:
+                continue
+            mean = total / nobs
+            mean = np.where((neg_ct == 0) & (mean < 0), 0.0, mean)
+            mean = np.where((neg_ct == nobs) & (mean > 0), 0.0, mean)
+            mean = np.where(same_run >= nobs, prev_value, mean)
+            out[:, t - first_out] = np.where(nobs >= window, mean, np.nan)
+    return out
+
+
+def _ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """按行计算 EMA（adjust=False），从每行第一个有效值开始递推"""
+    alpha = 2.0 / (span + 1)
+    out = np.empty(values.shape)
+    prev = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        ema = (1 - alpha) * prev + alpha * x
+        ema = np.where(np.isnan(prev), x, ema)
+        prev = np.where(np.isnan(x), prev, ema)
+        out[:, t] = prev
+    return out
+
+
+def _push_window(means: Dict[int, _RollingMean], values: deque, value: float) -> None:
+    """向环形缓冲区追加一个值，并同步推进各窗口的滚动均值"""
+    for window, rolling in means.items():
+        rolling.push(value, values[-window] if len(values) >= window else None)
+    values.append(value)
+
+
+def _ema_step(prev: Optional[float], value: float, span: int) -> float:
+    """EMA 单步递推（adjust=False），首个值直接作为初始 EMA"""
+    if prev is None:
+        return value
+    alpha = 2.0 / (span + 1)
+    return (1 - alpha) * prev + alpha * value
+
+
 def analyze_stock(df: pd.DataFrame, code: str) -> TrendAnalysisResult:
     """
     便捷函数：分析单只股票
@@ -819,3 +1454,18 @@ if __name__ == "__main__":
     analyzer = StockTrendAnalyzer()
     result = analyzer.analyze(df, '000001')
     print(analyzer.format_analysis(result))
+
+    # 面板模式一致性：含停牌平盘区间时，analyze_panel() 与逐只 analyze() 结果应完全相同
+    flat_prices = prices[:30] + [prices[29]] * 25 + prices[30:35]
+    flat_df = df.assign(close=flat_prices, high=[p * 1.01 for p in flat_prices])
+    panel_input = pd.concat([
+        df.assign(code='000001'),
+        flat_df.assign(code='000002'),
+        flat_df.iloc[-45:].assign(code='000003'),
+    ])
+    panel = analyzer.analyze_panel(panel_input)
+    for code, frame in panel_input.groupby('code'):
+        expected = analyzer.analyze(frame.drop(columns='code').reset_index(drop=True), code).to_dict()
+        actual = panel[code].to_dict()
+        assert actual == expected, f"{code} 面板模式结果不一致: {actual} != {expected}"
+    print("面板模式与单股模式结果一致")
@@ -12,9 +12,10 @@ A股自选股智能分析系统 - 存储层
 """
 
 import atexit
+import json
 import logging
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
 import pandas as pd
@@ -26,18 +27,23 @@ from sqlalchemy import (
     Date,
     DateTime,
     Integer,
+    Text,
     Index,
     UniqueConstraint,
     select,
     and_,
+    or_,
     desc,
+    func,
+    bindparam,
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import (
     declarative_base,
     sessionmaker,
     Session,
 )
-from sqlalchemy.exc import IntegrityError
 
 from src.config import get_config
 
@@ -134,6 +140,188 @@ class StockDaily(Base):
         }
 
 
+class MarketDailyAbsenceRecord(Base):
+    """
+    全市场日线缺席记录
+
+    按交易日拉取全市场日线（Tushare daily(trade_date)）后，自选股中不在当日
+    行情里的代码（停牌、尚未上市、非 A 股个股等）记录于此，后续运行计算覆盖率时
+    视为已处理，避免每次都因这些代码重新拉取整段全市场数据。
+    """
+    __tablename__ = 'market_daily_absence'
+
+    code = Column(String(10), primary_key=True)
+    date = Column(Date, primary_key=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f"<MarketDailyAbsenceRecord(code={self.code}, date={self.date})>"
+
+
+class IndicatorStateRecord(Base):
+    """
+    增量指标状态模型
+
+    保存每只股票的 EMA 累加器、滚动窗口和涨跌累计和（JSON），
+    盘中轮询时从这里恢复状态，程序重启后无需回放全部历史。
+    """
+    __tablename__ = 'indicator_state'
+
+    code = Column(String(10), primary_key=True)
+    last_date = Column(Date)  # 状态已推进到的交易日
+    bars = Column(Integer, default=0)  # 已累计的 K 线数量
+    payload = Column(Text, nullable=False)  # IndicatorState.to_dict() 的 JSON
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<IndicatorStateRecord(code={self.code}, last_date={self.last_date}, bars={self.bars})>"
+
+
+class LLMCacheRecord(Base):
+    """
+    LLM 响应缓存模型
+
+    以 (模型, 生成参数, 系统提示词, Prompt) 的 SHA-256 作为键，
+    保存原始响应和解析后的 AnalysisResult（JSON），Prompt 完全相同时直接复用。
+    """
+    __tablename__ = 'llm_response_cache'
+
+    cache_key = Column(String(64), primary_key=True)
+    code = Column(String(10))
+    model = Column(String(100))
+    response = Column(Text, nullable=False)  # 模型原始响应
+    result = Column(Text, nullable=False)  # 解析后的 AnalysisResult（JSON）
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    last_hit_at = Column(DateTime, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheRecord(key={self.cache_key[:12]}, code={self.code}, model={self.model})>"
+
+
+class SearchCacheRecord(Base):
+    """
+    搜索结果缓存模型
+
+    以规范化后的查询词（+ 返回条数）的 SHA-256 作为键，保存 SearchResponse（JSON），
+    同一查询在 TTL 内不再重复请求搜索引擎。
+    """
+    __tablename__ = 'search_cache'
+
+    cache_key = Column(String(64), primary_key=True)
+    query = Column(String(500))
+    provider = Column(String(50))
+    payload = Column(Text, nullable=False)  # SearchResponse.to_dict() 的 JSON
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f"<SearchCacheRecord(query={self.query}, provider={self.provider})>"
+
+
+class ChipDistributionRecord(Base):
+    """
+    筹码分布模型
+
+    ak.stock_cyq_em 每次返回近几个月的逐日筹码数据，全部按 (code, date) 入库，
+    同一交易日或历史日期直接读库，无需再次请求。
+    """
+    __tablename__ = 'chip_distribution'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String(10), nullable=False)
+    date = Column(Date, nullable=False)
+    source = Column(String(20))
+
+    profit_ratio = Column(Float)  # 获利比例(0-1)
+    avg_cost = Column(Float)  # 平均成本
+    cost_90_low = Column(Float)
+    cost_90_high = Column(Float)
+    concentration_90 = Column(Float)
+    cost_70_low = Column(Float)
+    cost_70_high = Column(Float)
+    concentration_70 = Column(Float)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('code', 'date', name='uix_chip_code_date'),
+    )
+
+    def __repr__(self):
+        return f"<ChipDistributionRecord(code={self.code}, date={self.date}, profit_ratio={self.profit_ratio})>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 ChipDistribution 字段格式（日期为 YYYY-MM-DD 字符串）"""
+        return {
+            'code': self.code,
+            'date': self.date.isoformat() if self.date else '',
+            'source': self.source or '',
+            'profit_ratio': self.profit_ratio or 0.0,
+            'avg_cost': self.avg_cost or 0.0,
+            'cost_90_low': self.cost_90_low or 0.0,
+            'cost_90_high': self.cost_90_high or 0.0,
+            'concentration_90': self.concentration_90 or 0.0,
+            'cost_70_low': self.cost_70_low or 0.0,
+            'cost_70_high': self.cost_70_high or 0.0,
+            'concentration_70': self.concentration_70 or 0.0,
+        }
+
+
+class AnalysisResultRecord(Base):
+    """
+    AI 分析结果模型
+
+    每次运行结束时批量写入（同一股票同一天可有多条，按 id 区分先后），
+    WebUI / Bot / 报告重建可直接查询历史结果，无需重新分析。
+    """
+    __tablename__ = 'analysis_result'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    code = Column(String(10), nullable=False)
+    name = Column(String(50))
+    date = Column(Date, nullable=False)  # 分析日期
+    report_type = Column(String(20))  # simple / full
+
+    # 核心指标
+    sentiment_score = Column(Integer)
+    trend_prediction = Column(String(20))
+    operation_advice = Column(String(20))
+    confidence_level = Column(String(10))
+    success = Column(Integer, default=1)
+
+    payload = Column(Text, nullable=False)  # AnalysisResult 全部字段（JSON，不含原始响应）
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_analysis_code_date', 'code', 'date'),
+        Index('ix_analysis_date_score', 'date', 'sentiment_score'),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisResultRecord(code={self.code}, date={self.date}, score={self.sentiment_score})>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，'result' 为 AnalysisResult 字段字典"""
+        try:
+            result = json.loads(self.payload)
+        except (TypeError, ValueError):
+            result = {}
+        return {
+            'id': self.id,
+            'code': self.code,
+            'name': self.name,
+            'date': self.date.isoformat() if self.date else None,
+            'report_type': self.report_type,
+            'sentiment_score': self.sentiment_score,
+            'trend_prediction': self.trend_prediction,
+            'operation_advice': self.operation_advice,
+            'confidence_level': self.confidence_level,
+            'success': bool(self.success),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'result': result,
+        }
+
+
 class DatabaseManager:
     """
     数据库管理器 - 单例模式
@@ -343,18 +531,29 @@ class DatabaseManager:
             
             return list(results)
     
+    # 日线行情字段（每次写入均覆盖）
+    DAILY_PRICE_COLUMNS = (
+        'open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg',
+        'ma5', 'ma10', 'ma20', 'volume_ratio',
+    )
+    # daily_basic 补充字段（仅在有值时覆盖）
+    DAILY_BASIC_COLUMNS = (
+        'volume_ratio_basic', 'turnover_rate', 'pe', 'pb', 'total_mv', 'circ_mv',
+    )
+    
     def save_daily_data(
         self, 
         df: pd.DataFrame, 
         code: str,
         data_source: str = "Unknown"
-    ) -> int:
+    ) -> Tuple[int, int]:
         """
         保存日线数据到数据库
         
         策略：
         - 使用 UPSERT 逻辑（存在则更新，不存在则插入）
-        - 跳过已存在的数据，避免重复
+        - 单条 INSERT ... ON CONFLICT(code, date) DO UPDATE 批量执行
+        - daily_basic 字段仅在新值非空时覆盖
         
         Args:
             df: 包含日线数据的 DataFrame
@@ -362,110 +561,111 @@ class DatabaseManager:
             data_source: 数据来源名称
             
         Returns:
-            新增/更新的记录数
+            (新增记录数, 更新记录数)
         """
         if df is None or df.empty:
             logger.warning(f"保存数据为空，跳过 {code}")
-            return 0
+            return 0, 0
         
-        saved_count = 0
+        df = df.copy()
+        df['code'] = code
+        try:
+            inserted, updated = self._upsert_daily_frame(df, data_source)
+        except Exception as e:
+            logger.error(f"保存 {code} 数据失败: {e}")
+            raise
         
-        with self.get_session() as session:
-            try:
-                for _, row in df.iterrows():
-                    # 解析日期
-                    row_date = row.get('date')
-                    if isinstance(row_date, str):
-                        row_date = datetime.strptime(row_date, '%Y-%m-%d').date()
-                    elif isinstance(row_date, datetime):
-                        row_date = row_date.date()
-                    elif isinstance(row_date, pd.Timestamp):
-                        row_date = row_date.date()
-                    
-                    # 检查是否已存在
-                    existing = session.execute(
-                        select(StockDaily).where(
-                            and_(
-                                StockDaily.code == code,
-                                StockDaily.date == row_date
-                            )
-                        )
-                    ).scalar_one_or_none()
-                    
-                    if existing:
-                        # 更新现有记录
-                        existing.open = row.get('open')
-                        existing.high = row.get('high')
-                        existing.low = row.get('low')
-                        existing.close = row.get('close')
-                        existing.volume = row.get('volume')
-                        existing.amount = row.get('amount')
-                        existing.pct_chg = row.get('pct_chg')
-                        existing.ma5 = row.get('ma5')
-                        existing.ma10 = row.get('ma10')
-                        existing.ma20 = row.get('ma20')
-                        existing.volume_ratio = row.get('volume_ratio')
-                        # daily_basic 补充字段（仅在有值时更新）
-                        val = row.get('volume_ratio_basic')
-                        if val is not None and pd.notna(val):
-                            existing.volume_ratio_basic = val
-                        val = row.get('turnover_rate')
-                        if val is not None and pd.notna(val):
-                            existing.turnover_rate = val
-                        val = row.get('pe')
-                        if val is not None and pd.notna(val):
-                            existing.pe = val
-                        val = row.get('pb')
-                        if val is not None and pd.notna(val):
-                            existing.pb = val
-                        val = row.get('total_mv')
-                        if val is not None and pd.notna(val):
-                            existing.total_mv = val
-                        val = row.get('circ_mv')
-                        if val is not None and pd.notna(val):
-                            existing.circ_mv = val
-                        val = row.get('basic_fetched')
-                        if val is not None and pd.notna(val):
-                            existing.basic_fetched = int(bool(val))
-                        existing.data_source = data_source
-                        existing.updated_at = datetime.now()
-                    else:
-                        # 创建新记录
-                        record = StockDaily(
-                            code=code,
-                            date=row_date,
-                            open=row.get('open'),
-                            high=row.get('high'),
-                            low=row.get('low'),
-                            close=row.get('close'),
-                            volume=row.get('volume'),
-                            amount=row.get('amount'),
-                            pct_chg=row.get('pct_chg'),
-                            ma5=row.get('ma5'),
-                            ma10=row.get('ma10'),
-                            ma20=row.get('ma20'),
-                            volume_ratio=row.get('volume_ratio'),
-                            volume_ratio_basic=None if pd.isna(row.get('volume_ratio_basic')) else row.get('volume_ratio_basic'),
-                            turnover_rate=None if pd.isna(row.get('turnover_rate')) else row.get('turnover_rate'),
-                            pe=None if pd.isna(row.get('pe')) else row.get('pe'),
-                            pb=None if pd.isna(row.get('pb')) else row.get('pb'),
-                            total_mv=None if pd.isna(row.get('total_mv')) else row.get('total_mv'),
-                            circ_mv=None if pd.isna(row.get('circ_mv')) else row.get('circ_mv'),
-                            basic_fetched=int(bool(row.get('basic_fetched'))) if row.get('basic_fetched') is not None and pd.notna(row.get('basic_fetched')) else 0,
-                            data_source=data_source,
-                        )
-                        session.add(record)
-                        saved_count += 1
-                
-                session.commit()
-                logger.info(f"保存 {code} 数据成功，新增 {saved_count} 条")
-                
-            except Exception as e:
-                session.rollback()
-                logger.error(f"保存 {code} 数据失败: {e}")
-                raise
-        
-        return saved_count
+        logger.info(f"保存 {code} 数据成功，新增 {inserted} 条，更新 {updated} 条")
+        return inserted, updated
+    
+    def save_daily_frame(self, df: pd.DataFrame, data_source: str = "Unknown") -> Tuple[int, int]:
+        """
+        批量保存多只股票的日线数据（df 需包含 code 列）
+        
+        用于全市场按交易日入库等场景，与 save_daily_data 共用同一 UPSERT 逻辑
+        
+        Returns:
+            (新增记录数, 更新记录数)
+        """
+        if df is None or df.empty:
+            return 0, 0
+        
+        inserted, updated = self._upsert_daily_frame(df, data_source)
+        logger.info(f"批量保存日线数据成功（{df['code'].nunique()} 只），新增 {inserted} 条，更新 {updated} 条")
+        return inserted, updated
+    
+    def _upsert_daily_frame(self, df: pd.DataFrame, data_source: str) -> Tuple[int, int]:
+        """
+        批量 UPSERT 日线数据（df 需包含 code、date 列）
+        
+        在同一事务内先查询已存在的 (code, date)，用于精确统计新增/更新条数
+        
+        Returns:
+            (新增记录数, 更新记录数)
+        """
+        df = df.copy()
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        df['code'] = df['code'].astype(str)
+        # 同一 (code, date) 多次出现时以最后一条为准
+        df = df.drop_duplicates(subset=['code', 'date'], keep='last')
+        
+        columns: Dict[str, list] = {
+            'code': df['code'].tolist(),
+            'date': df['date'].tolist(),
+        }
+        for col in self.DAILY_PRICE_COLUMNS + self.DAILY_BASIC_COLUMNS:
+            if col in df.columns:
+                series = pd.to_numeric(df[col], errors='coerce')
+                columns[col] = series.astype(object).where(series.notna(), None).tolist()
+            else:
+                columns[col] = [None] * len(df)
+        if 'basic_fetched' in df.columns:
+            columns['basic_fetched_raw'] = [
+                int(bool(v)) if v is not None and pd.notna(v) else None
+                for v in df['basic_fetched'].tolist()
+            ]
+        else:
+            columns['basic_fetched_raw'] = [None] * len(df)
+        columns['data_source'] = [data_source] * len(df)
+        
+        names = list(columns)
+        params = [dict(zip(names, values)) for values in zip(*columns.values())]
+        
+        table = StockDaily.__table__
+        insert_values = {
+            col: bindparam(col)
+            for col in ('code', 'date', 'data_source') + self.DAILY_PRICE_COLUMNS + self.DAILY_BASIC_COLUMNS
+        }
+        insert_values['basic_fetched'] = func.coalesce(bindparam('basic_fetched_raw'), 0)
+        stmt = sqlite_insert(table).values(insert_values)
+        update_set = {col: stmt.excluded[col] for col in self.DAILY_PRICE_COLUMNS}
+        for col in self.DAILY_BASIC_COLUMNS:
+            update_set[col] = func.coalesce(stmt.excluded[col], table.c[col])
+        update_set['basic_fetched'] = func.coalesce(
+            bindparam('basic_fetched_raw'), table.c.basic_fetched
+        )
+        update_set['data_source'] = stmt.excluded.data_source
+        update_set['updated_at'] = datetime.now()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code', 'date'],
+            set_=update_set,
+        )
+        
+        codes = set(columns['code'])
+        dates = columns['date']
+        key_query = select(table.c.code, table.c.date).where(
+            table.c.date.between(min(dates), max(dates))
+        )
+        # 代码数量较少时按代码过滤，否则（全市场写入）只按日期范围过滤
+        if len(codes) <= 500:
+            key_query = key_query.where(table.c.code.in_(codes))
+        
+        with self._engine.begin() as conn:
+            existing = {(row[0], row[1]) for row in conn.execute(key_query)}
+            updated = sum(1 for key in zip(columns['code'], dates) if key in existing)
+            conn.execute(stmt, params)
+        
+        return len(params) - updated, updated
 
     def has_data_for_date(
         self,
@@ -502,19 +702,555 @@ class DatabaseManager:
             ]
             return any(getattr(record, f, None) is not None for f in basic_fields)
     
+    def get_last_dates(self, codes: List[str]) -> Dict[str, date]:
+        """
+        一次分组查询各股票已入库的最新日期
+        
+        Returns:
+            {股票代码: 最新日期}，无数据的股票不在结果中
+        """
+        if not codes:
+            return {}
+        with self.get_session() as session:
+            rows = session.execute(
+                select(StockDaily.code, func.max(StockDaily.date))
+                .where(StockDaily.code.in_(codes))
+                .group_by(StockDaily.code)
+            ).all()
+        return {code: last_date for code, last_date in rows}
+    
+    def get_indicator_states(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量读取增量指标状态
+        
+        Returns:
+            {股票代码: IndicatorState.to_dict() 格式的字典}，无记录的股票不在结果中
+        """
+        if not codes:
+            return {}
+        with self.get_session() as session:
+            rows = session.execute(
+                select(IndicatorStateRecord.code, IndicatorStateRecord.payload)
+                .where(IndicatorStateRecord.code.in_(codes))
+            ).all()
+        states = {}
+        for code, payload in rows:
+            try:
+                states[code] = json.loads(payload)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"{code} 指标状态解析失败，忽略: {e}")
+        return states
+
+    def save_indicator_states(self, states: Dict[str, Dict[str, Any]]) -> int:
+        """
+        批量保存增量指标状态（UPSERT）
+        
+        Args:
+            states: {股票代码: IndicatorState.to_dict() 格式的字典}
+            
+        Returns:
+            写入的记录数
+        """
+        if not states:
+            return 0
+        now = datetime.now()
+        rows = []
+        for code, state in states.items():
+            last_date = state.get('last_date')
+            rows.append({
+                'code': code,
+                'last_date': date.fromisoformat(last_date) if last_date else None,
+                'bars': int(state.get('bars', 0)),
+                'payload': json.dumps(state),
+                'updated_at': now,
+            })
+        stmt = sqlite_insert(IndicatorStateRecord)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code'],
+            set_={
+                'last_date': stmt.excluded.last_date,
+                'bars': stmt.excluded.bars,
+                'payload': stmt.excluded.payload,
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt, rows)
+        logger.debug(f"保存指标状态 {len(rows)} 条")
+        return len(rows)
+    
+    def get_chip_distribution(self, code: str, target_date: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """
+        读取已入库的筹码分布
+        
+        Args:
+            code: 股票代码
+            target_date: 指定交易日；None 表示最新一天
+            
+        Returns:
+            ChipDistribution 字段格式的字典，无记录返回 None
+        """
+        with self.get_session() as session:
+            query = select(ChipDistributionRecord).where(ChipDistributionRecord.code == code)
+            if target_date is not None:
+                query = query.where(ChipDistributionRecord.date == target_date)
+            record = session.execute(
+                query.order_by(desc(ChipDistributionRecord.date)).limit(1)
+            ).scalar_one_or_none()
+            return record.to_dict() if record else None
+
+    def save_chip_distributions(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        批量保存筹码分布（UPSERT，按 code + date 去重）
+        
+        Args:
+            rows: ChipDistribution.to_dict() 格式的字典列表，date 为 YYYY-MM-DD
+            
+        Returns:
+            写入的记录数
+        """
+        fields = (
+            'profit_ratio', 'avg_cost', 'cost_90_low', 'cost_90_high', 'concentration_90',
+            'cost_70_low', 'cost_70_high', 'concentration_70',
+        )
+        now = datetime.now()
+        records = {}
+        for row in rows:
+            try:
+                row_date = pd.Timestamp(row.get('date')).date()
+            except (TypeError, ValueError):
+                continue
+            if not row.get('code') or pd.isna(row_date):
+                continue
+            records[(row['code'], row_date)] = {
+                'code': row['code'],
+                'date': row_date,
+                'source': row.get('source'),
+                **{name: row.get(name) for name in fields},
+                'updated_at': now,
+            }
+        if not records:
+            return 0
+        stmt = sqlite_insert(ChipDistributionRecord)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code', 'date'],
+            set_={name: stmt.excluded[name] for name in ('source', *fields, 'updated_at')},
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt, list(records.values()))
+        logger.debug(f"保存筹码分布 {len(records)} 条")
+        return len(records)
+
+    def save_analysis_results(
+        self,
+        results: List[Dict[str, Any]],
+        analysis_date: Optional[date] = None,
+        report_type: Optional[str] = None,
+    ) -> int:
+        """
+        批量写入 AI 分析结果（单个事务）
+        
+        Args:
+            results: AnalysisResult 的字段字典列表（dataclasses.asdict）
+            analysis_date: 分析日期，默认今天
+            report_type: 报告类型（simple / full）
+            
+        Returns:
+            写入的记录数
+        """
+        if not results:
+            return 0
+        analysis_date = analysis_date or date.today()
+        now = datetime.now()
+        rows = []
+        for result in results:
+            payload = {k: v for k, v in result.items() if k != 'raw_response'}
+            rows.append({
+                'code': result.get('code'),
+                'name': result.get('name'),
+                'date': analysis_date,
+                'report_type': report_type,
+                'sentiment_score': result.get('sentiment_score'),
+                'trend_prediction': result.get('trend_prediction'),
+                'operation_advice': result.get('operation_advice'),
+                'confidence_level': result.get('confidence_level'),
+                'success': 1 if result.get('success', True) else 0,
+                'payload': json.dumps(payload, ensure_ascii=False, default=str),
+                'created_at': now,
+            })
+        with self._engine.begin() as conn:
+            conn.execute(AnalysisResultRecord.__table__.insert(), rows)
+        logger.info(f"保存分析结果 {len(rows)} 条（{analysis_date}）")
+        return len(rows)
+
+    def _latest_analysis_ids(self, codes: Optional[List[str]] = None, analysis_date: Optional[date] = None):
+        """每只股票最新一条分析结果的 id 子查询（id 自增，越大越新）"""
+        query = select(func.max(AnalysisResultRecord.id)).where(AnalysisResultRecord.success == 1)
+        if codes:
+            query = query.where(AnalysisResultRecord.code.in_(codes))
+        if analysis_date is not None:
+            query = query.where(AnalysisResultRecord.date == analysis_date)
+        return query.group_by(AnalysisResultRecord.code)
+
+    def get_latest_analysis(self, codes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取每只股票最新一次成功的分析结果
+        
+        Args:
+            codes: 股票代码列表，None 表示全部
+            
+        Returns:
+            {股票代码: AnalysisResultRecord.to_dict()}
+        """
+        with self.get_session() as session:
+            records = session.execute(
+                select(AnalysisResultRecord)
+                .where(AnalysisResultRecord.id.in_(self._latest_analysis_ids(codes)))
+            ).scalars().all()
+            return {record.code: record.to_dict() for record in records}
+
+    def get_analysis_ranking(
+        self,
+        analysis_date: Optional[date] = None,
+        limit: int = 10,
+        ascending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        按综合评分排序某日的分析结果（同一股票取当日最新一条）
+        
+        Args:
+            analysis_date: 分析日期，默认库中最近的分析日期
+            limit: 返回条数
+            ascending: True 为从低到高（看空榜）
+            
+        Returns:
+            AnalysisResultRecord.to_dict() 列表
+        """
+        with self.get_session() as session:
+            if analysis_date is None:
+                analysis_date = session.execute(select(func.max(AnalysisResultRecord.date))).scalar()
+                if analysis_date is None:
+                    return []
+            score = AnalysisResultRecord.sentiment_score
+            records = session.execute(
+                select(AnalysisResultRecord)
+                .where(
+                    AnalysisResultRecord.date == analysis_date,
+                    AnalysisResultRecord.id.in_(self._latest_analysis_ids(analysis_date=analysis_date)),
+                )
+                .order_by(score.asc() if ascending else score.desc())
+                .limit(limit)
+            ).scalars().all()
+            return [record.to_dict() for record in records]
+
+    def get_analysis_history(
+        self,
+        code: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        获取单只股票在日期区间内的分析结果（按日期、写入顺序升序）
+        
+        Args:
+            code: 股票代码
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+            limit: 只返回最近 limit 条
+            
+        Returns:
+            AnalysisResultRecord.to_dict() 列表
+        """
+        conditions = [AnalysisResultRecord.code == code]
+        if start_date is not None:
+            conditions.append(AnalysisResultRecord.date >= start_date)
+        if end_date is not None:
+            conditions.append(AnalysisResultRecord.date <= end_date)
+        query = (
+            select(AnalysisResultRecord)
+            .where(and_(*conditions))
+            .order_by(desc(AnalysisResultRecord.date), desc(AnalysisResultRecord.id))
+        )
+        if limit:
+            query = query.limit(limit)
+        with self.get_session() as session:
+            records = session.execute(query).scalars().all()
+            return [record.to_dict() for record in reversed(records)]
+
+    def get_llm_cache(self, cache_key: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        读取 LLM 响应缓存（过期记录视为未命中）
+        
+        Returns:
+            {'response': 原始响应, 'result': AnalysisResult 字段字典, 'model': 模型名}，未命中返回 None
+        """
+        now = datetime.now()
+        with self.get_session() as session:
+            record = session.get(LLMCacheRecord, cache_key)
+            if record is None:
+                return None
+            if ttl_seconds > 0 and record.created_at < now - timedelta(seconds=ttl_seconds):
+                return None
+            try:
+                result = json.loads(record.result)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"LLM 缓存 {cache_key[:12]} 解析失败，忽略: {e}")
+                return None
+            record.hits = (record.hits or 0) + 1
+            record.last_hit_at = now
+            entry = {'response': record.response, 'result': result, 'model': record.model}
+            session.commit()
+        return entry
+
+    def save_llm_cache(
+        self,
+        cache_key: str,
+        code: str,
+        model: str,
+        response: str,
+        result: Dict[str, Any],
+    ) -> None:
+        """保存 LLM 响应缓存（同键覆盖）"""
+        now = datetime.now()
+        stmt = sqlite_insert(LLMCacheRecord).values(
+            cache_key=cache_key,
+            code=code,
+            model=model,
+            response=response,
+            result=json.dumps(result, ensure_ascii=False, default=str),
+            hits=0,
+            created_at=now,
+            last_hit_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cache_key'],
+            set_={
+                'code': stmt.excluded.code,
+                'model': stmt.excluded.model,
+                'response': stmt.excluded.response,
+                'result': stmt.excluded.result,
+                'hits': 0,
+                'created_at': stmt.excluded.created_at,
+                'last_hit_at': stmt.excluded.last_hit_at,
+            },
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt)
+
+    def prune_llm_cache(self, ttl_seconds: float, max_entries: int) -> int:
+        """
+        淘汰 LLM 响应缓存
+        
+        1. 删除超过 TTL 的记录
+        2. 超出 max_entries 时按最近命中时间淘汰最旧的记录（LRU）
+        
+        Returns:
+            删除的记录数
+        """
+        removed = 0
+        with self.get_session() as session:
+            if ttl_seconds > 0:
+                cutoff = datetime.now() - timedelta(seconds=ttl_seconds)
+                removed += session.query(LLMCacheRecord).filter(
+                    LLMCacheRecord.created_at < cutoff
+                ).delete(synchronize_session=False)
+            if max_entries > 0:
+                total = session.execute(select(func.count()).select_from(LLMCacheRecord)).scalar() or 0
+                overflow = total - max_entries
+                if overflow > 0:
+                    stale_keys = select(LLMCacheRecord.cache_key).order_by(
+                        LLMCacheRecord.last_hit_at
+                    ).limit(overflow).scalar_subquery()
+                    removed += session.query(LLMCacheRecord).filter(
+                        LLMCacheRecord.cache_key.in_(stale_keys)
+                    ).delete(synchronize_session=False)
+            session.commit()
+        if removed:
+            logger.debug(f"LLM 缓存淘汰 {removed} 条")
+        return removed
+    
+    def get_search_cache(self, cache_key: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        读取搜索结果缓存
+        
+        Returns:
+            SearchResponse.to_dict() 格式的字典，未命中或已过期返回 None
+        """
+        with self.get_session() as session:
+            row = session.execute(
+                select(SearchCacheRecord.payload, SearchCacheRecord.created_at)
+                .where(SearchCacheRecord.cache_key == cache_key)
+            ).first()
+        if row is None:
+            return None
+        payload, created_at = row
+        if created_at < datetime.now() - timedelta(seconds=ttl_seconds):
+            return None
+        try:
+            return json.loads(payload)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"搜索缓存 {cache_key[:12]} 解析失败，忽略: {e}")
+            return None
+
+    def save_search_cache(self, cache_key: str, query: str, provider: str, payload: Dict[str, Any]) -> None:
+        """保存搜索结果缓存（同键覆盖）"""
+        stmt = sqlite_insert(SearchCacheRecord).values(
+            cache_key=cache_key,
+            query=query[:500],
+            provider=provider,
+            payload=json.dumps(payload, ensure_ascii=False),
+            created_at=datetime.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cache_key'],
+            set_={
+                'query': stmt.excluded.query,
+                'provider': stmt.excluded.provider,
+                'payload': stmt.excluded.payload,
+                'created_at': stmt.excluded.created_at,
+            },
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt)
+
+    def prune_search_cache(self, max_age_seconds: float) -> int:
+        """删除超过 max_age_seconds 的搜索缓存，返回删除条数"""
+        cutoff = datetime.now() - timedelta(seconds=max_age_seconds)
+        with self.get_session() as session:
+            removed = session.query(SearchCacheRecord).filter(
+                SearchCacheRecord.created_at < cutoff
+            ).delete(synchronize_session=False)
+            session.commit()
+        if removed:
+            logger.debug(f"搜索缓存清理 {removed} 条")
+        return removed
+    
+    def get_daily_coverage(
+        self,
+        codes: List[str],
+        start_date: date,
+        end_date: date,
+        require_basic: bool = False,
+    ) -> Dict[date, set]:
+        """
+        查询日期区间内每个交易日已入库的股票代码（单次查询）
+        
+        Args:
+            codes: 股票代码列表
+            start_date: 开始日期
+            end_date: 结束日期
+            require_basic: 是否要求 daily_basic 已获取
+            
+        Returns:
+            {日期: 已有数据的代码集合}
+        """
+        conditions = [
+            StockDaily.code.in_(codes),
+            StockDaily.date >= start_date,
+            StockDaily.date <= end_date,
+        ]
+        if require_basic:
+            conditions.append(or_(
+                StockDaily.basic_fetched == 1,
+                *[getattr(StockDaily, col).isnot(None) for col in self.DAILY_BASIC_COLUMNS],
+            ))
+        
+        coverage: Dict[date, set] = {}
+        with self.get_session() as session:
+            rows = session.execute(
+                select(StockDaily.date, StockDaily.code).where(and_(*conditions))
+            ).all()
+        for row_date, code in rows:
+            coverage.setdefault(row_date, set()).add(code)
+        return coverage
+    
+    def get_market_daily_absences(
+        self,
+        codes: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> Dict[date, set]:
+        """
+        查询日期区间内已确认不在全市场日线中的股票代码
+        
+        Returns:
+            {日期: 代码集合}，格式同 get_daily_coverage
+        """
+        absences: Dict[date, set] = {}
+        with self.get_session() as session:
+            rows = session.execute(
+                select(MarketDailyAbsenceRecord.date, MarketDailyAbsenceRecord.code).where(and_(
+                    MarketDailyAbsenceRecord.code.in_(codes),
+                    MarketDailyAbsenceRecord.date >= start_date,
+                    MarketDailyAbsenceRecord.date <= end_date,
+                ))
+            ).all()
+        for row_date, code in rows:
+            absences.setdefault(row_date, set()).add(code)
+        return absences
+    
+    def save_market_daily_absences(self, trade_date: date, codes: List[str]) -> int:
+        """
+        记录某交易日全市场日线中不存在的股票代码（已存在的记录忽略）
+        
+        Returns:
+            提交的记录数
+        """
+        if not codes:
+            return 0
+        now = datetime.now()
+        stmt = sqlite_insert(MarketDailyAbsenceRecord).on_conflict_do_nothing(
+            index_elements=['code', 'date']
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt, [{'code': code, 'date': trade_date, 'created_at': now} for code in codes])
+        return len(codes)
+    
+    def get_daily_frame(
+        self,
+        codes: List[str],
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """
+        一次查询多只股票的日线数据
+        
+        Returns:
+            DataFrame（code, date 及行情字段），按 code、date 升序
+        """
+        columns = ('code', 'date') + self.DAILY_PRICE_COLUMNS
+        with self.get_session() as session:
+            rows = session.execute(
+                select(*[getattr(StockDaily, col) for col in columns])
+                .where(
+                    and_(
+                        StockDaily.code.in_(codes),
+                        StockDaily.date >= start_date,
+                        StockDaily.date <= end_date,
+                    )
+                )
+                .order_by(StockDaily.code, StockDaily.date)
+            ).all()
+        return pd.DataFrame.from_records(rows, columns=list(columns))
+    
     def get_analysis_context(
         self, 
         code: str,
-        target_date: Optional[date] = None
+        target_date: Optional[date] = None,
+        history_days: int = 0
     ) -> Optional[Dict[str, Any]]:
         """
         获取分析所需的上下文数据
         
-        返回今日数据 + 昨日数据的对比信息
+        返回今日数据 + 昨日数据的对比信息；指定 history_days 时，
+        同一次查询附带最近 N 根日线（raw_data，按日期升序的 DataFrame），
+        供趋势分析直接使用，无需再次查询或请求网络
         
         Args:
             code: 股票代码
-            target_date: 目标日期（默认今天）
+            target_date: 目标日期（默认今天），仅取该日期及之前的数据
+            history_days: 附带的历史K线根数（0 表示不附带）
             
         Returns:
             包含今日数据、昨日对比等信息的字典
@@ -522,8 +1258,20 @@ class DatabaseManager:
         if target_date is None:
             target_date = date.today()
         
-        # 获取最近2天数据
-        recent_data = self.get_latest_data(code, days=2)
+        # 单次索引查询 (code, date)：最近 max(2, N) 条记录（按日期降序）
+        limit = max(2, history_days)
+        with self.get_session() as session:
+            recent_data = list(session.execute(
+                select(StockDaily)
+                .where(
+                    and_(
+                        StockDaily.code == code,
+                        StockDaily.date <= target_date
+                    )
+                )
+                .order_by(desc(StockDaily.date))
+                .limit(limit)
+            ).scalars().all())
         
         if not recent_data:
             logger.warning(f"未找到 {code} 的数据")
@@ -538,6 +1286,9 @@ class DatabaseManager:
             'today': today_data.to_dict(),
         }
         
+        if history_days > 0:
+            context['raw_data'] = self._to_history_frame(recent_data)
+        
         if yesterday_data:
             context['yesterday'] = yesterday_data.to_dict()
             
@@ -557,6 +1308,24 @@ class DatabaseManager:
         
         return context
     
+    # 趋势分析所需的历史K线列
+    HISTORY_COLUMNS = (
+        'date', 'open', 'high', 'low', 'close', 'volume', 'amount',
+        'pct_chg', 'ma5', 'ma10', 'ma20', 'volume_ratio',
+    )
+    
+    def _to_history_frame(self, records: List[StockDaily]) -> pd.DataFrame:
+        """
+        将日线记录（按日期降序）转换为按日期升序的 DataFrame
+        """
+        rows = [
+            tuple(getattr(r, col) for col in self.HISTORY_COLUMNS)
+            for r in reversed(records)
+        ]
+        df = pd.DataFrame.from_records(rows, columns=list(self.HISTORY_COLUMNS))
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+    
     def _analyze_ma_status(self, data: StockDaily) -> str:
         """
         分析均线形态
@@ -618,8 +1387,8 @@ if __name__ == "__main__":
         'volume_ratio': [1.2],
     })
     
-    saved = db.save_daily_data(test_df, '600519', 'TestSource')
-    print(f"保存测试数据: {saved} 条")
+    inserted, updated = db.save_daily_data(test_df, '600519', 'TestSource')
+    print(f"保存测试数据: 新增 {inserted} 条，更新 {updated} 条")
     
     # 测试获取上下文
     context = db.get_analysis_context('600519')
@@ -15,9 +15,11 @@ import os
 import re
 import logging
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
-from typing import Optional, Dict, Any, List, Union
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Union
 
 from src.enums import ReportType
 from bot.models import BotMessage
@@ -131,6 +133,25 @@ class ConfigService:
 # 分析任务服务
 # ============================================================
 
+# 合并键：(股票代码, 报告类型, 交易日)
+AnalysisKey = Tuple[str, str, str]
+
+
+def _current_trading_day() -> date:
+    """当前对应的交易日（周末归到上周五，不考虑节假日）"""
+    today = date.today()
+    if today.weekday() >= 5:
+        today -= timedelta(days=today.weekday() - 4)
+    return today
+
+
+@dataclass
+class _InflightAnalysis:
+    """进行中的分析：首个请求（leader）执行，后续相同请求（follower）挂靠等待结果"""
+    leader_task_id: str
+    followers: List[Tuple[str, Optional[BotMessage]]] = field(default_factory=list)
+
+
 class AnalysisService:
     """
     分析任务服务
@@ -139,16 +160,29 @@ class AnalysisService:
     1. 管理异步分析任务
     2. 执行股票分析
     3. 触发通知推送
+    4. 合并重复请求：同一 (股票, 报告类型, 交易日) 同时只执行一次分析，
+       后续请求挂靠到进行中的任务；完成后的结果在 ANALYSIS_RESULT_CACHE_TTL 内直接复用
+    
+    合并的请求只向各自的消息会话（如钉钉/飞书群）回复报告，
+    已配置的推送渠道只由执行分析的那次请求推送一次。
     """
     
     _instance: Optional['AnalysisService'] = None
     _lock = threading.Lock()
     
-    def __init__(self, max_workers: int = 3):
+    def __init__(self, max_workers: int = 3, result_cache_ttl: Optional[float] = None):
         self._executor: Optional[ThreadPoolExecutor] = None
         self._max_workers = max_workers
         self._tasks: Dict[str, Dict[str, Any]] = {}
         self._tasks_lock = threading.Lock()
+        
+        if result_cache_ttl is None:
+            from src.config import get_config
+            result_cache_ttl = getattr(get_config(), 'analysis_result_cache_ttl', 600)
+        self._result_cache_ttl = result_cache_ttl
+        # 进行中的分析与短期结果缓存（均受 _tasks_lock 保护）
+        self._inflight: Dict[AnalysisKey, _InflightAnalysis] = {}
+        self._result_cache: Dict[AnalysisKey, Tuple[float, Dict[str, Any], Any]] = {}
     
     @classmethod
     def get_instance(cls) -> 'AnalysisService':
@@ -178,32 +212,152 @@ class AnalysisService:
         """
         提交异步分析任务
         
+        相同 (股票, 报告类型, 交易日) 的分析正在进行时，挂靠到该任务；
+        结果缓存未过期时直接返回已完成的任务。
+        
         Args:
             code: 股票代码
             report_type: 报告类型枚举
+            source_message: 触发请求的机器人消息（用于回复到原会话）
             
         Returns:
-            任务信息字典
+            任务信息字典（合并的请求带 coalesced_with / from_cache 字段）
         """
         # 确保 report_type 是枚举类型
         if isinstance(report_type, str):
             report_type = ReportType.from_str(report_type)
         
         task_id = f"{code}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        key: AnalysisKey = (code, report_type.value, _current_trading_day().isoformat())
+        response = {
+            "success": True,
+            "message": "分析任务已提交，将异步执行并推送通知",
+            "code": code,
+            "task_id": task_id,
+            "report_type": report_type.value
+        }
+        
+        with self._tasks_lock:
+            cached = self._get_cached_result(key)
+            if cached is not None:
+                result_data, result = cached
+                self._tasks[task_id] = self._new_task(task_id, code, report_type, status="completed")
+                self._tasks[task_id].update(
+                    end_time=datetime.now().isoformat(), result=result_data, from_cache=True
+                )
+                inflight = None
+            else:
+                inflight = self._inflight.get(key)
+                if inflight is not None:
+                    inflight.followers.append((task_id, source_message))
+                    self._tasks[task_id] = self._new_task(task_id, code, report_type)
+                    self._tasks[task_id]["coalesced_with"] = inflight.leader_task_id
+                else:
+                    self._inflight[key] = _InflightAnalysis(leader_task_id=task_id)
+        
+        if cached is not None:
+            logger.info(f"[AnalysisService] {code} 命中结果缓存，直接返回, task_id={task_id}")
+            if source_message is not None:
+                self.executor.submit(self._reply_to_context, code, result, report_type, source_message)
+            response.update(message="已有最近的分析结果，直接返回", from_cache=True)
+            return response
+        
+        if inflight is not None:
+            logger.info(f"[AnalysisService] {code} 已有进行中的分析 {inflight.leader_task_id}，"
+                        f"合并请求 task_id={task_id}")
+            response.update(message="相同分析正在进行，完成后将一并返回结果", coalesced_with=inflight.leader_task_id)
+            return response
         
         # 提交到线程池
-        self.executor.submit(self._run_analysis, code, task_id, report_type, source_message)
+        self.executor.submit(self._run_analysis, code, task_id, report_type, source_message, key)
         
         logger.info(f"[AnalysisService] 已提交股票 {code} 的分析任务, task_id={task_id}, report_type={report_type.value}")
         
+        return response
+    
+    @staticmethod
+    def _new_task(task_id: str, code: str, report_type: ReportType, status: str = "running") -> Dict[str, Any]:
         return {
-            "success": True,
-            "message": "分析任务已提交，将异步执行并推送通知",
-            "code": code,
             "task_id": task_id,
+            "code": code,
+            "status": status,
+            "start_time": datetime.now().isoformat(),
+            "result": None,
+            "error": None,
             "report_type": report_type.value
         }
     
+    def _get_cached_result(self, key: AnalysisKey) -> Optional[Tuple[Dict[str, Any], Any]]:
+        """读取未过期的结果缓存（调用方需持有 _tasks_lock）"""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result_data, result = entry
+        if time.time() >= expires_at:
+            del self._result_cache[key]
+            return None
+        return result_data, result
+    
+    def _complete_inflight(
+        self,
+        key: Optional[AnalysisKey],
+        result: Any,
+        result_data: Optional[Dict[str, Any]],
+        error: Optional[str],
+        report_type: ReportType,
+    ) -> None:
+        """
+        leader 完成后：写入结果缓存，更新挂靠任务的状态并回复各自会话
+
+        result_data 为 None 表示分析失败（包括 AI 调用限流、超时等 success=False 的结果），
+        此时不写缓存，挂靠任务一并标记失败，下次请求重新分析。
+        """
+        if key is None:
+            return
+        with self._tasks_lock:
+            inflight = self._inflight.pop(key, None)
+            if result_data is not None and self._result_cache_ttl > 0:
+                self._result_cache[key] = (time.time() + self._result_cache_ttl, result_data, result)
+            followers = inflight.followers if inflight else []
+            for follower_id, _ in followers:
+                task = self._tasks.get(follower_id)
+                if task is None:
+                    continue
+                task.update(end_time=datetime.now().isoformat())
+                if result_data is not None:
+                    task.update(status="completed", result=result_data)
+                else:
+                    task.update(status="failed", error=error)
+        
+        if followers:
+            logger.info(f"[AnalysisService] {key[0]} 分析结果已共享给 {len(followers)} 个合并请求")
+        if result_data is None:
+            return
+        for _, message in followers:
+            if message is not None:
+                self._reply_to_context(key[0], result, report_type, message)
+    
+    def _reply_to_context(
+        self,
+        code: str,
+        result: Any,
+        report_type: ReportType,
+        source_message: BotMessage
+    ) -> None:
+        """将已有分析结果回复到请求方的消息会话"""
+        try:
+            from src.core.services import get_pipeline_services
+            
+            notifier = get_pipeline_services().create_notifier(source_message=source_message)
+            if report_type == ReportType.FULL:
+                content = notifier.generate_dashboard_report([result])
+            else:
+                content = notifier.generate_single_stock_report(result)
+            if not notifier.send_to_context(content):
+                logger.debug(f"[AnalysisService] {code} 请求方会话不支持回复，跳过")
+        except Exception as e:
+            logger.warning(f"[AnalysisService] {code} 回复合并请求失败: {e}")
+    
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """获取任务状态"""
         with self._tasks_lock:
@@ -222,7 +376,8 @@ class AnalysisService:
         code: str, 
         task_id: str, 
         report_type: ReportType = ReportType.SIMPLE,
-        source_message: Optional[BotMessage] = None
+        source_message: Optional[BotMessage] = None,
+        key: Optional[AnalysisKey] = None
     ) -> Dict[str, Any]:
         """
         执行单只股票分析
@@ -233,30 +388,24 @@ class AnalysisService:
             code: 股票代码
             task_id: 任务ID
             report_type: 报告类型枚举
+            source_message: 触发请求的机器人消息
+            key: 合并键，完成后通知挂靠的请求
         """
         # 初始化任务状态
         with self._tasks_lock:
-            self._tasks[task_id] = {
-                "task_id": task_id,
-                "code": code,
-                "status": "running",
-                "start_time": datetime.now().isoformat(),
-                "result": None,
-                "error": None,
-                "report_type": report_type.value
-            }
+            self._tasks[task_id] = self._new_task(task_id, code, report_type)
         
+        result = None
+        result_data = None
+        error_msg = None
         try:
             # 延迟导入避免循环依赖
-            from src.config import get_config
-            from main import StockAnalysisPipeline
+            from src.core.services import get_pipeline_services
             
             logger.info(f"[AnalysisService] 开始分析股票: {code}")
             
-            # 创建分析管道
-            config = get_config()
-            pipeline = StockAnalysisPipeline(
-                config=config,
+            # 创建分析管道（复用已初始化的数据源 / AI / 搜索服务）
+            pipeline = get_pipeline_services().create_pipeline(
                 max_workers=1,
                 source_message=source_message
             )
@@ -269,7 +418,18 @@ class AnalysisService:
                 report_type=report_type
             )
             
-            if result:
+            if result and not result.success:
+                error_msg = result.error_message or "AI 分析失败"
+                with self._tasks_lock:
+                    self._tasks[task_id].update({
+                        "status": "failed",
+                        "end_time": datetime.now().isoformat(),
+                        "error": error_msg
+                    })
+                
+                logger.warning(f"[AnalysisService] 股票 {code} 分析失败: {error_msg}")
+                return {"success": False, "task_id": task_id, "error": error_msg}
+            elif result:
                 result_data = {
                     "code": result.code,
                     "name": result.name,
@@ -289,15 +449,16 @@ class AnalysisService:
                 logger.info(f"[AnalysisService] 股票 {code} 分析完成: {result.operation_advice}")
                 return {"success": True, "task_id": task_id, "result": result_data}
             else:
+                error_msg = "分析返回空结果"
                 with self._tasks_lock:
                     self._tasks[task_id].update({
                         "status": "failed",
                         "end_time": datetime.now().isoformat(),
-                        "error": "分析返回空结果"
+                        "error": error_msg
                     })
                 
                 logger.warning(f"[AnalysisService] 股票 {code} 分析失败: 返回空结果")
-                return {"success": False, "task_id": task_id, "error": "分析返回空结果"}
+                return {"success": False, "task_id": task_id, "error": error_msg}
                 
         except Exception as e:
             error_msg = str(e)
@@ -311,6 +472,9 @@ class AnalysisService:
                 })
             
             return {"success": False, "task_id": task_id, "error": error_msg}
+        
+        finally:
+            self._complete_inflight(key, result, result_data, error_msg, report_type)
 
 
 # ============================================================